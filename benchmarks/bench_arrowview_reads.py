@@ -0,0 +1,54 @@
+"""
+Compares reading the values and molecules of an HDF5View with the memory-mapped reads of an ArrowView of the same
+data.
+
+A synthetic HDF5 view with an energy, gradient and molecule per entry is written to a temporary directory, as in
+``bench_hdf5view_reads.py``, and converted with ``ArrowView.write_view``.
+"""
+
+import pathlib
+import tempfile
+import time
+
+import numpy as np
+
+from bench_hdf5view_reads import build_view, n_entries, n_subset, read_batched
+from qcfractal.interface.collections import ArrowView, HDF5View
+
+if __name__ == "__main__":
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        hdf5_path = pathlib.Path(tmpdir, "view.hdf5")
+        arrow_path = pathlib.Path(tmpdir, "view.arrow")
+        print(f"Writing a view of {n_entries} entries...\n")
+        build_view(hdf5_path)
+
+        hdf5_view = HDF5View(hdf5_path)
+        arrow_view = ArrowView(arrow_path)
+        arrow_view.write_view(hdf5_view)
+        hdf5_view.get_index()
+        arrow_view.get_index()
+
+        for label, indexes in [
+            ("contiguous", np.arange(n_subset)),
+            ("sparse", np.sort(np.random.choice(n_entries, n_subset, replace=False))),
+            ("all", np.arange(n_entries)),
+        ]:
+            indexes = [int(i) for i in indexes]
+            names = [f"entry_{i}" for i in indexes]
+
+            start = time.time()
+            read_batched(hdf5_view, names, indexes)
+            hdf5 = time.time() - start
+
+            start = time.time()
+            read_batched(arrow_view, names, indexes)
+            arrow = time.time() - start
+
+            print(
+                f"{label:>10s} {len(indexes):7d} rows  hdf5={hdf5:8.3f}s  arrow={arrow:8.3f}s  "
+                f"speedup={hdf5 / arrow:7.1f}x"
+            )
+
+        hdf5_view.close()
+        arrow_view.close()
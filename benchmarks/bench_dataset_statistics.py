@@ -0,0 +1,41 @@
+"""
+Compares evaluating mean statistics of many methods against a benchmark one column at a time, as
+``wrap_statistics`` did before, with the batched evaluation over the whole values matrix.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from qcfractal.interface import statistics
+
+n_entries = 10000
+n_columns = 500
+n_bootstrap = 200
+
+
+if __name__ == "__main__":
+
+    index = [f"entry_{i}" for i in range(n_entries)]
+    bench = pd.Series(np.random.rand(n_entries), index=index)
+    value = pd.DataFrame(np.random.rand(n_entries, n_columns), index=index)
+    value = value.mask(np.random.rand(n_entries, n_columns) < 0.01)
+
+    for stype in ["ME", "MUE", "MURE"]:
+        start = time.time()
+        value.apply(lambda x: statistics._stats_dict[stype](x, bench))
+        per_column = time.time() - start
+
+        start = time.time()
+        statistics.batch_statistics(stype, value, bench)
+        batched = time.time() - start
+
+        print(
+            f"{stype:>5s} {n_columns} columns  per-column={per_column:8.3f}s  batched={batched:8.3f}s  "
+            f"speedup={per_column / batched:7.1f}x"
+        )
+
+    start = time.time()
+    statistics.statistics_table(value, bench, ["ME", "MUE", "MURE"], bootstrap=n_bootstrap)
+    print(f"Table of 3 statistics with {n_bootstrap} bootstrap resamples: {time.time() - start:8.3f}s")
@@ -0,0 +1,46 @@
+"""
+Compares adding value columns to the DataFrame cache Datasets used before, which was rebuilt as an object DataFrame
+over the union of all indexes and columns on every update, with the typed column cache of ``Dataset``.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from qcfractal.interface.collections.dataset import _ValueCache
+
+n_entries = 20000
+n_columns = 50
+
+
+def update_dataframe(df, new_data):
+    new_df = pd.DataFrame(index=set(df.index) | set(new_data.index), columns=set(df.columns) | set(new_data.columns))
+    new_df.update(new_data)
+    new_df.update(df)
+    return new_df
+
+
+if __name__ == "__main__":
+
+    index = [f"entry_{i}" for i in range(n_entries)]
+    columns = [pd.DataFrame({f"column_{i}": np.random.rand(n_entries)}, index=index) for i in range(n_columns)]
+
+    start = time.time()
+    df = pd.DataFrame()
+    for new_data in columns:
+        df = update_dataframe(df, new_data)
+        not df.loc[index, new_data.columns[0]].isna().any()
+    dataframe = time.time() - start
+
+    start = time.time()
+    cache = _ValueCache()
+    for new_data in columns:
+        cache.update(new_data)
+        cache.contains(new_data.columns[0], index)
+    typed = time.time() - start
+
+    print(
+        f"{n_columns} columns of {n_entries} entries  dataframe={dataframe:8.3f}s  typed={typed:8.3f}s  "
+        f"speedup={dataframe / typed:7.1f}x"
+    )
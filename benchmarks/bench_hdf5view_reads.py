@@ -0,0 +1,117 @@
+"""
+Compares reading the values and molecules of an HDF5View one row at a time with the batched reads of
+``HDF5View._read_rows``.
+
+A synthetic view with an energy, gradient and molecule per entry is written to a temporary directory. The per-row
+reads open the file for every call and read ``dataset[i]`` for each index, as views were read before.
+"""
+
+import pathlib
+import tempfile
+import time
+
+import h5py
+import numpy as np
+import qcelemental as qcel
+
+from qcfractal.interface.collections import HDF5View
+
+n_entries = 100000
+n_subset = 10000
+n_atoms = 12
+
+
+def build_view(path):
+
+    vlen_double_t = h5py.vlen_dtype(np.dtype("float64"))
+    utf8_t = h5py.string_dtype(encoding="utf-8")
+    bytes_t = h5py.vlen_dtype(np.dtype("uint8"))
+    dataset_kwargs = {"chunks": True, "fletcher32": True}
+
+    view = HDF5View(path)
+    molecule = qcel.models.Molecule(symbols=["He"] * n_atoms, geometry=np.random.rand(n_atoms, 3) * 10)
+    schema = view._serialize_data(molecule)
+
+    with view._write_file() as f:
+        f.attrs["history_keys"] = view._serialize_field(["driver", "program", "method", "basis", "keywords"])
+
+        entry_group = f.create_group("entry")
+        entry_group.attrs["model"] = "MoleculeEntry"
+        names = [f"entry_{i}" for i in range(n_entries)]
+        entry_group.create_dataset("entry", data=names, dtype=utf8_t, **dataset_kwargs)
+        entry_group.create_dataset("name", data=names, dtype=utf8_t, **dataset_kwargs)
+        entry_group.create_dataset("molecule_id", data=np.arange(n_entries), dtype=np.dtype("int64"), **dataset_kwargs)
+
+        mol_schema = f.create_group("molecule").create_dataset(
+            "schema", shape=(n_entries,), dtype=bytes_t, **dataset_kwargs
+        )
+        mol_schema[:] = [schema] * n_entries
+
+        value_group = f.create_group("value")
+        energy = value_group.create_dataset("energy", data=np.random.rand(n_entries), **dataset_kwargs)
+        gradient = value_group.create_dataset("gradient", shape=(n_entries,), dtype=vlen_double_t, **dataset_kwargs)
+        gradient[:] = [np.random.rand(3 * n_atoms) for _ in range(n_entries)]
+        for dataset, name in [(energy, "energy"), (gradient, "gradient")]:
+            dataset.attrs["units"] = view._serialize_field("hartree")
+            dataset.attrs["name"] = view._serialize_field(name)
+            for key, value in [("driver", name), ("program", "psi4"), ("method", "hf"), ("basis", "sto-3g")]:
+                dataset.attrs[key] = view._serialize_field(value)
+            dataset.attrs["keywords"] = view._serialize_field(None)
+        f.create_group("contributed_value")
+
+    view.close()
+
+
+def read_per_row(path, indexes):
+
+    with h5py.File(path, "r") as f:
+        energy = [f["value/energy"][i] for i in indexes]
+    with h5py.File(path, "r") as f:
+        gradient = [np.reshape(f["value/gradient"][i], (-1, 3)) for i in indexes]
+    with h5py.File(path, "r") as f:
+        molecules = [f["molecule/schema"][i].tobytes() for i in indexes]
+
+    return energy, gradient, molecules
+
+
+def read_batched(view, names, indexes):
+
+    queries = [{"name": name, "driver": name, "native": True} for name in ["energy", "gradient"]]
+    values, _ = view.get_values(queries, subset=names)
+    molecules = view.get_molecules(indexes, keep_serialized=True)
+
+    return values, molecules
+
+
+if __name__ == "__main__":
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir, "view.hdf5")
+        print(f"Writing a view of {n_entries} entries...\n")
+        build_view(path)
+
+        view = HDF5View(path)
+        view.get_index()
+
+        for label, indexes in [
+            ("contiguous", np.arange(n_subset)),
+            ("sparse", np.sort(np.random.choice(n_entries, n_subset, replace=False))),
+            ("all", np.arange(n_entries)),
+        ]:
+            indexes = [int(i) for i in indexes]
+            names = [f"entry_{i}" for i in indexes]
+
+            start = time.time()
+            read_per_row(path, indexes)
+            per_row = time.time() - start
+
+            start = time.time()
+            read_batched(view, names, indexes)
+            batched = time.time() - start
+
+            print(
+                f"{label:>10s} {len(indexes):7d} rows  per-row={per_row:8.3f}s  batched={batched:8.3f}s  "
+                f"speedup={per_row / batched:7.1f}x"
+            )
+
+        view.close()
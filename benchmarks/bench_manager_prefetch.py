@@ -0,0 +1,77 @@
+"""
+Measures the worker idle fraction of a QueueManager running short geometry optimizations of butane with RDKit
+and geomeTRIC, with and without the prefetch buffer.
+
+The manager runs its own loops through ``QueueManager.start`` in a background thread. The idle fraction is
+computed as ``1 - sum(worker time) / (workers * elapsed time)``, where the worker time of each task is measured by
+the pool adapter inside the worker process.
+"""
+
+import threading
+import time
+from multiprocessing import Pool
+
+import qcfractal.interface as ptl
+from qcfractal import FractalSnowflake, queue
+from qcfractal.cli.qcfractal_manager import _initialize_signals_process_pool
+
+n_workers = 2
+n_tasks = 40
+update_frequency = 1.0
+
+
+def run(server, prefetch_limit, offset):
+
+    client = server.client()
+
+    # Unique molecules so that every run computes new tasks, RDKit requires the connectivity butane comes with
+    base_molecule = ptl.data.get_molecule("butane.json")
+    molecules = [
+        base_molecule.copy(update={"geometry": base_molecule.geometry * (1 + 1.0e-4 * (i + offset))})
+        for i in range(n_tasks)
+    ]
+    options = {
+        "keywords": None,
+        "qc_spec": {"driver": "gradient", "method": "UFF", "basis": "", "keywords": None, "program": "rdkit"},
+    }
+    client.add_procedure("optimization", "geometric", options, molecules, tag="bench")
+
+    with Pool(processes=n_workers, initializer=_initialize_signals_process_pool) as adapter:
+        manager = queue.QueueManager(
+            client,
+            adapter,
+            queue_tag="bench",
+            max_tasks=n_workers,
+            cores_per_task=1,
+            update_frequency=update_frequency,
+            prefetch_limit=prefetch_limit,
+            verbose=False,
+        )
+        manager.logger.setLevel("WARNING")
+
+        thread = threading.Thread(target=manager.start, daemon=True)
+        start = time.time()
+        thread.start()
+
+        while manager.statistics.total_completed_tasks < n_tasks:
+            time.sleep(0.05)
+
+        elapsed = time.time() - start
+        busy = manager.queue_adapter.total_task_time
+        failed = manager.statistics.total_failed_tasks
+
+        manager.stop()
+        thread.join()
+
+    return elapsed, 1 - busy / (n_workers * elapsed), failed
+
+
+if __name__ == "__main__":
+
+    with FractalSnowflake(max_workers=0, logging=False) as server:
+        for n, prefetch_limit in enumerate([0, 16 * n_workers]):
+            elapsed, idle, failed = run(server, prefetch_limit, n * n_tasks)
+            print(
+                f"prefetch_limit={prefetch_limit:3d}  elapsed={elapsed:7.2f}s  tasks/s={n_tasks / elapsed:7.2f}  "
+                f"failed={failed}  worker idle fraction={idle:.2%}"
+            )
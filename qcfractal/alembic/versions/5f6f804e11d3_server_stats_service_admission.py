@@ -0,0 +1,24 @@
+"""Add service admission information to the server stats log
+
+Revision ID: 5f6f804e11d3
+Revises: 038ffd952a00
+Create Date: 2026-10-19 10:12:41.220351
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5f6f804e11d3"
+down_revision = "038ffd952a00"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("server_stats_log", sa.Column("service_admission", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("server_stats_log", "service_admission")
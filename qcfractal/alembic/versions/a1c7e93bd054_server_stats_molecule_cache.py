@@ -0,0 +1,24 @@
+"""Add molecule cache statistics to the server stats log
+
+Revision ID: a1c7e93bd054
+Revises: 5f6f804e11d3
+Create Date: 2026-10-19 11:03:17.582914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a1c7e93bd054"
+down_revision = "5f6f804e11d3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("server_stats_log", sa.Column("molecule_cache", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("server_stats_log", "molecule_cache")
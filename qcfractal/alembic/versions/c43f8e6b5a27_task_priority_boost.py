@@ -0,0 +1,24 @@
+"""Add the priority boost of the task priority policy to the task queue
+
+Revision ID: c43f8e6b5a27
+Revises: a1c7e93bd054
+Create Date: 2026-10-19 15:42:08.316502
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c43f8e6b5a27"
+down_revision = "a1c7e93bd054"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("task_queue", sa.Column("priority_boost", sa.Integer(), server_default="0", nullable=False))
+
+
+def downgrade():
+    op.drop_column("task_queue", "priority_boost")
@@ -0,0 +1,24 @@
+"""Add the expected resources of a task to the task queue
+
+Revision ID: d5a2f3b81c09
+Revises: c43f8e6b5a27
+Create Date: 2026-10-19 17:05:31.624118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d5a2f3b81c09"
+down_revision = "c43f8e6b5a27"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("task_queue", sa.Column("resources", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("task_queue", "resources")
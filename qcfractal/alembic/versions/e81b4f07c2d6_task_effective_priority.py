@@ -0,0 +1,29 @@
+"""Store the effective priority of tasks so that waiting tasks are handed out through an index
+
+Revision ID: e81b4f07c2d6
+Revises: d5a2f3b81c09
+Create Date: 2026-10-19 18:12:47.903215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e81b4f07c2d6"
+down_revision = "d5a2f3b81c09"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("task_queue", sa.Column("effective_priority", sa.Integer(), server_default="1", nullable=False))
+
+    # Tasks are aged again by the next update of the server
+    op.execute("UPDATE task_queue SET effective_priority = COALESCE(priority, 1) + priority_boost")
+    op.execute("Create Index ix_task_effective_sort on task_queue (effective_priority desc, created_on)")
+
+
+def downgrade():
+    op.execute("Drop Index ix_task_effective_sort")
+    op.drop_column("task_queue", "effective_priority")
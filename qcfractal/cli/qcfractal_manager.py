@@ -8,6 +8,7 @@ import logging
 import os
 import signal
 from enum import Enum
+from functools import partial
 from math import ceil
 from typing import List, Optional, Union
 
@@ -39,6 +40,13 @@ def _initialize_signals_process_pool():
         signal.signal(getattr(signal, signame), stop)
 
 
+def _initialize_warm_process_pool(programs):
+    from ..queue.executor_adapter import _initialize_warm_worker
+
+    _initialize_signals_process_pool()
+    _initialize_warm_worker(programs)
+
+
 class SettingsCommonConfig:
     env_prefix = "QCA_"
     case_insensitive = True
@@ -125,6 +133,20 @@ class CommonManagerSettings(AutodocBaseSettings):
         description="The number of cores per MPI rank for MPI-parallel applications. Only relevant for node-parallel"
         " codes and the most relevant to codes that with hybrid MPI+OpenMP parallelism (e.g., NWChem).",
     )
+    warm_workers: bool = Field(
+        False,
+        description="Load QCEngine and all quantum chemistry programs it finds once in each worker process when it "
+        "starts, rather than when the process runs its first task. Recommended for many short tasks (e.g. force "
+        "fields or semi-empirical methods). Used by the pool and dask adapters.",
+    )
+    resource_packing: bool = Field(
+        False,
+        description="Pack tasks onto the cores_per_worker and memory_per_worker of the Worker by the cores and memory "
+        "each task is expected to need, rather than running tasks_per_worker tasks of equal size. The expected "
+        "resources are estimated by the server from the molecule, method and basis of each task, or given on "
+        "submission. Tasks without expected resources use cores_per_worker/tasks_per_worker. Only supported by the "
+        "pool adapter.",
+    )
 
     class Config(SettingsCommonConfig):
         pass
@@ -190,6 +212,34 @@ class QueueManagerSettings(AutodocBaseSettings):
         "itself down to maintain integrity between it and the Fractal Server. Units of seconds",
         gt=0,
     )
+    min_update_frequency: Optional[float] = Field(
+        None,
+        description="Shortest time between checks for new tasks. While the Fractal Server reports more waiting tasks "
+        "than this Manager took, it checks again after this time so that free workers are refilled quickly. If not "
+        "set, update_frequency is used. Units of seconds",
+        gt=0,
+    )
+    max_update_frequency: Optional[float] = Field(
+        None,
+        description="Longest time between checks for new tasks. Every check which finds no tasks doubles the time to "
+        "the next one, up to this value, to cut the load on the Fractal Server of idle Managers. The Fractal Server "
+        "may also ask for a longer wait. If not set, update_frequency is used. Units of seconds",
+        gt=0,
+    )
+    long_poll: float = Field(
+        0,
+        description="Time the Fractal Server may hold a check for new tasks which finds none, answering as soon as "
+        "tasks this Manager can run are submitted. This replaces repeated checks of idle Managers by a single held "
+        "request, up to a limit set by the Fractal Server. Set to 0 to disable. Units of seconds",
+        ge=0,
+    )
+    metrics_port: Optional[int] = Field(
+        None,
+        description="Port on which this Manager serves its statistics, queue depths and the latency of each stage "
+        "tasks go through (acquired, submitted, complete and uploaded) at /metrics, in the Prometheus text format. "
+        "If not set, no metrics are served.",
+        ge=0,
+    )
     test: bool = Field(
         False,
         description="Turn on testing mode for this Manager. The Manager will not connect to any Fractal Server, and "
@@ -217,6 +267,47 @@ class QueueManagerSettings(AutodocBaseSettings):
         "fill your maximum throughput with a buffer (assuming the queue has them).",
         gt=0,
     )
+    prefetch_limit: int = Field(
+        0,
+        description="Maximum number of tasks to acquire from the Fractal Server ahead of demand. Prefetched tasks are "
+        "held locally and handed to workers as soon as slots free up, rather than waiting for the next "
+        "update. The number of prefetched tasks follows the observed task completion rate up to this limit. "
+        "Set to 0 to disable prefetching.",
+        ge=0,
+    )
+    prefetch_lease: float = Field(
+        600,
+        description="Time a prefetched task may be held locally before it is returned to the Fractal Server. Units of "
+        "seconds.",
+        gt=0,
+    )
+    outbox_path: Optional[str] = Field(
+        None,
+        description="Full path to a file in which complete results are journaled from the moment they finish until "
+        "the Fractal Server has received them. Results survive server outages and Manager restarts: results left "
+        "in this file by a previous Manager are sent along with every upload until the Fractal Server receives "
+        "them, and those it gave up on as stale are retried once the file is opened again. If not provided, a "
+        "temporary file is used which is removed when the Manager exits.",
+    )
+    upload_batch_size: int = Field(
+        100,
+        description="Maximum number of complete tasks sent to the Fractal Server in a single request. Larger uploads "
+        "are split into several requests which are each retried on their own.",
+        gt=0,
+    )
+    upload_batch_bytes: int = Field(
+        32 * 1048576,
+        description="Maximum size of the complete tasks sent to the Fractal Server in a single request. A single task "
+        "larger than this is sent on its own. Units of bytes.",
+        gt=0,
+    )
+    harvest_threshold: int = Field(
+        0,
+        description="Number of complete tasks which immediately trigger their collection and the hand-off of waiting "
+        "tasks to the freed workers, rather than waiting for the next scheduled collection. Only supported by the "
+        "pool and dask adapters. Set to 0 to disable.",
+        ge=0,
+    )
 
 
 class SchedulerEnum(str, Enum):
@@ -749,6 +840,9 @@ def main(args=None):
     if cores_per_task < 1:
         raise ValueError("Cores per task must be larger than one!")
 
+    if settings.common.resource_packing and settings.common.adapter != "pool":
+        raise ValueError("Resource packing is only supported with the pool adapter")
+
     if settings.common.adapter == "pool":
         from multiprocessing import Pool, set_start_method
 
@@ -757,7 +851,16 @@ def main(args=None):
         # Error if the number of nodes per jobs is more than 1
         if settings.common.nodes_per_job > 1:
             raise ValueError("Pool adapters only run on a single local node")
-        queue_client = Pool(processes=settings.common.tasks_per_worker, initializer=_initialize_signals_process_pool)
+        if settings.common.warm_workers:
+            initializer, initargs = _initialize_warm_process_pool, (qcng.list_available_programs(),)
+        else:
+            initializer, initargs = _initialize_signals_process_pool, ()
+        # Packed tasks take at least one core each
+        if settings.common.resource_packing:
+            processes = settings.common.cores_per_worker
+        else:
+            processes = settings.common.tasks_per_worker
+        queue_client = Pool(processes=processes, initializer=initializer, initargs=initargs)
 
     elif settings.common.adapter == "dask":
 
@@ -830,6 +933,12 @@ def main(args=None):
             cluster.scale(workers)
 
         queue_client = Client(cluster)
+        if settings.common.warm_workers:
+            from ..queue.executor_adapter import _initialize_warm_worker
+
+            queue_client.register_worker_callbacks(
+                setup=partial(_initialize_warm_worker, qcng.list_available_programs())
+            )
 
     elif settings.common.adapter == "parsl":
 
@@ -977,7 +1086,12 @@ def main(args=None):
     # Build out the manager itself
     # Compute max tasks
     max_concurrent_tasks = settings.common.tasks_per_worker * settings.common.max_workers
-    if settings.manager.max_queued_tasks is None:
+    total_cores = total_memory = None
+    if settings.common.resource_packing:
+        # Packed tasks wait in the manager until they fit, so they are never queued beyond the running ones
+        max_concurrent_tasks = max_queued_tasks = settings.common.cores_per_worker
+        total_cores, total_memory = settings.common.cores_per_worker, settings.common.memory_per_worker
+    elif settings.manager.max_queued_tasks is None:
         # Tasks * jobs * buffer + 1
         max_queued_tasks = ceil(max_concurrent_tasks * 2.00) + 1
     else:
@@ -991,6 +1105,10 @@ def main(args=None):
         queue_tag=settings.manager.queue_tag,
         manager_name=settings.manager.manager_name,
         update_frequency=settings.manager.update_frequency,
+        min_update_frequency=settings.manager.min_update_frequency,
+        max_update_frequency=settings.manager.max_update_frequency,
+        long_poll=settings.manager.long_poll,
+        metrics_port=settings.manager.metrics_port,
         cores_per_task=cores_per_task,
         memory_per_task=memory_per_task,
         nodes_per_task=settings.common.nodes_per_task,
@@ -999,6 +1117,14 @@ def main(args=None):
         verbose=settings.common.verbose,
         cores_per_rank=settings.common.cores_per_rank,
         configuration=settings,
+        prefetch_limit=settings.manager.prefetch_limit,
+        prefetch_lease=settings.manager.prefetch_lease,
+        outbox_path=settings.manager.outbox_path,
+        upload_batch_size=settings.manager.upload_batch_size,
+        upload_batch_bytes=settings.manager.upload_batch_bytes,
+        harvest_threshold=settings.manager.harvest_threshold,
+        total_cores=total_cores,
+        total_memory=total_memory,
     )
 
     # Set stats correctly since we buffer the max tasks a bit
@@ -389,6 +389,10 @@ def server_start(args, config):
             # Collection views
             view_enabled=config.view.enable,
             view_path=config.view_path,
+            view_cache_size=config.view.cache_size,
+            view_update_frequency=config.view.update_frequency,
+            view_max_builds=config.view.max_builds,
+            view_update_budget=config.view.update_budget,
             # Log options
             logfile_prefix=logfile,
             loglevel=config.fractal.loglevel,
@@ -397,7 +401,15 @@ def server_start(args, config):
             # Queue options
             service_frequency=config.fractal.service_frequency,
             heartbeat_frequency=config.fractal.heartbeat_frequency,
+            manager_idle_backoff=config.fractal.manager_idle_backoff,
+            manager_long_poll_limit=config.fractal.manager_long_poll_limit,
             max_active_services=config.fractal.max_active_services,
+            task_priority_policy=config.fractal.task_priority_policy,
+            critical_path_tasks=config.fractal.critical_path_tasks,
+            priority_aging_time=config.fractal.priority_aging_time,
+            service_admission=config.fractal.service_admission,
+            admission_low_watermark=config.fractal.admission_low_watermark,
+            admission_high_watermark=config.fractal.admission_high_watermark,
             queue_socket=adapter,
         )
 
@@ -85,6 +85,22 @@ class ViewSettings(ConfigSettings):
 
     enable: bool = Field(True, description="Enable frozen-views.")
     directory: str = Field(None, description="Location of frozen-view data. If None, defaults to base_folder/views.")
+    cache_size: int = Field(
+        128,
+        description="Number of serialized view responses kept in memory, so that identical requests for a view are "
+        "not read and serialized again until the view is regenerated. Set to 0 to disable.",
+    )
+    update_frequency: int = Field(
+        0,
+        description="The frequency (in seconds) to check for collections whose views are missing or out of date, "
+        "which are then written from the database in the background. Set to 0 to disable.",
+    )
+    max_builds: int = Field(1, description="The maximum number of views written at the same time.")
+    update_budget: int = Field(
+        600,
+        description="The time (in seconds) spent writing views per check, views which are not started within it "
+        "are written by the next check. Set to 0 to write all views on every check.",
+    )
 
 
 class FractalServerSettings(ConfigSettings):
@@ -115,7 +131,50 @@ class FractalServerSettings(ConfigSettings):
     )
     service_frequency: int = Field(60, description="The frequency to update the QCFractal services.")
     max_active_services: int = Field(20, description="The maximum number of concurrent active services.")
+    task_priority_policy: str = Field(
+        "fixed",
+        description="The policy used to prioritize tasks. 'fixed' hands out tasks by their submitted priority while "
+        "'critical_path' also boosts tasks which gate the next iteration of a service and ages waiting tasks. The "
+        "submitted priority is kept in either case.",
+    )
+    critical_path_tasks: int = Field(
+        2,
+        description="Services with at most this many outstanding tasks have them boosted under the 'critical_path' "
+        "task priority policy.",
+    )
+    priority_aging_time: int = Field(
+        3600,
+        description="The time (in seconds) a waiting task must wait to be raised by a single priority level under the "
+        "'critical_path' task priority policy. Tasks are aged every service_frequency seconds.",
+    )
+    service_admission: str = Field(
+        "fixed",
+        description="The policy used to start waiting services. 'fixed' starts services up to max_active_services while "
+        "'adaptive' starts services based on the waiting task depth, manager capacity and task throughput.",
+    )
+    admission_low_watermark: int = Field(
+        1,
+        description="Waiting tasks per active manager task slot below which new services are started under the "
+        "'adaptive' service admission policy.",
+    )
+    admission_high_watermark: int = Field(
+        4,
+        description="Waiting tasks per active manager task slot new services are started to reach under the "
+        "'adaptive' service admission policy.",
+    )
     heartbeat_frequency: int = Field(1800, description="The frequency (in seconds) to check the heartbeat of workers.")
+    manager_idle_backoff: int = Field(
+        0,
+        description="The time (in seconds) a manager which found no tasks is asked to wait before asking again. "
+        "Cuts the load of idle managers on large fleets, set to 0 to let managers poll at their own frequency.",
+        ge=0,
+    )
+    manager_long_poll_limit: int = Field(
+        60,
+        description="The longest time (in seconds) a manager's request for tasks is held open until tasks it can run "
+        "are submitted, for managers which ask to wait. Set to 0 to always answer immediately.",
+        ge=0,
+    )
     log_apis: bool = Field(
         False,
         description="True or False. Store API access in the Database. This is an advanced "
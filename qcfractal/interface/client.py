@@ -6,14 +6,17 @@ import re
 from collections import defaultdict
 from typing import TYPE_CHECKING, Any, DefaultDict, Dict, List, Optional, Tuple, Union
 
+import msgpack
 import pandas as pd
 import requests
 from pydantic import ValidationError
+from qcelemental.util import msgpackext_dumps
 
 from .collections import collection_factory, collections_name_map
 from .models import build_procedure
 from .models.task_models import PriorityEnum
-from .models.rest_models import rest_model
+from .models.rest_models import ResponseGETMeta, rest_model
+from .record_cache import RecordCache
 
 if TYPE_CHECKING:  # pragma: no cover
     from qcfractal import FractalServer
@@ -51,6 +54,9 @@ _ssl_error_msg = (
 )
 _connection_error_msg = "\n\nCould not connect to server {}, please check the address and try again."
 
+# Endpoints whose objects may be kept in the record cache
+_cached_endpoints = {"molecule", "keyword", "result", "procedure"}
+
 ### Helper functions
 
 
@@ -65,6 +71,31 @@ def _version_list(version):
     return [int(x) for x in version.split(".")]
 
 
+def _query_by_id(payload: Any) -> bool:
+    """Checks if a GET payload only asks for objects by id, the status is ignored by the server for these queries"""
+
+    data = payload.data.dict()
+    if data.pop("id", None) is None:
+        return False
+    data.pop("status", None)
+
+    meta = payload.meta.dict()
+    if meta.get("skip"):
+        return False
+
+    return all(v is None for v in data.values()) and all(meta.get(k) is None for k in ["limit", "include", "exclude"])
+
+
+def _is_immutable(obj: Any) -> bool:
+    """Molecules and KeywordSets never change, records only once they are COMPLETE"""
+
+    if isinstance(obj, dict):
+        status = obj.get("status", "COMPLETE")
+    else:
+        status = getattr(obj, "status", "COMPLETE")
+    return status == "COMPLETE"
+
+
 ### Fractal Client
 
 
@@ -75,6 +106,8 @@ class FractalClient(object):
         username: Optional[str] = None,
         password: Optional[str] = None,
         verify: bool = True,
+        cache_dir: Optional[str] = None,
+        cache_max_size: int = 2 ** 30,
     ) -> None:
         """Initializes a FractalClient instance from an address and verification information.
 
@@ -91,6 +124,12 @@ class FractalClient(object):
             Verifies the SSL connection with a third party server. This may be False if a
             FractalServer was not provided a SSL certificate and defaults back to self-signed
             SSL keys.
+        cache_dir : Optional[str], optional
+            A directory, such as "~/.qca/cache", to keep Molecules, KeywordSets and COMPLETE records in
+            between sessions. Queries by id are then answered from the cache and only the missing ids are
+            pulled from the server. None disables the cache.
+        cache_max_size : int, optional
+            The maximum size of the cache in bytes, the least recently used objects are evicted beyond it.
         """
 
         if hasattr(address, "get_address"):
@@ -134,6 +173,10 @@ class FractalClient(object):
 
         self._request_counter: DefaultDict[Tuple[str, str], int] = defaultdict(int)
 
+        self.record_cache: Optional[RecordCache] = None
+        if cache_dir is not None:
+            self.record_cache = RecordCache(cache_dir, max_size=cache_max_size)
+
         ### Define all attributes before this line
 
         # Try to connect and pull general data
@@ -208,10 +251,17 @@ class FractalClient(object):
         data: Optional[str] = None,
         noraise: bool = False,
         timeout: Optional[int] = None,
+        etag: Optional[str] = None,
+        encoding: Optional[str] = None,
     ) -> requests.Response:
 
         addr = self.address + service
-        kwargs = {"data": data, "timeout": timeout, "headers": self._headers, "verify": self._verify}
+        headers = self._headers
+        if etag is not None:
+            headers = {**headers, "If-None-Match": etag}
+        if encoding is not None:
+            headers = {**headers, "Content-Type": f"application/{encoding}"}
+        kwargs = {"data": data, "timeout": timeout, "headers": headers, "verify": self._verify}
 
         if self._mock_network_error:
             raise requests.exceptions.RequestException("mock_network_error is on, failing by design!")
@@ -232,13 +282,20 @@ class FractalClient(object):
         except requests.exceptions.ConnectionError:
             raise ConnectionRefusedError(_connection_error_msg.format(self.address)) from None
 
-        if (r.status_code != 200) and (not noraise):
+        not_modified = (r.status_code == 304) and (etag is not None)
+        if (r.status_code != 200) and (not not_modified) and (not noraise):
             raise IOError("Server communication failure. Reason: {}".format(r.reason))
 
         return r
 
     def _automodel_request(
-        self, name: str, rest: str, payload: Dict[str, Any], full_return: bool = False, timeout: int = None
+        self,
+        name: str,
+        rest: str,
+        payload: Dict[str, Any],
+        full_return: bool = False,
+        timeout: int = None,
+        etag: Optional[str] = None,
     ) -> Any:
         """Automatic model request profiling and creation using rest_models
 
@@ -254,11 +311,13 @@ class FractalClient(object):
             Returns the full server response if True that contains additional metadata.
         timeout : int, optional
             Timeout time
+        etag : Optional[str], optional
+            The ETag of a previous response, if the response is unchanged the server does not send it again
 
         Returns
         -------
         Any
-            The REST response object
+            The REST response object, or None if the response matches the ETag
         """
         sname = name.strip("/")
         self._request_counter[(sname, rest)] += 1
@@ -271,9 +330,125 @@ class FractalClient(object):
         except ValidationError as exc:
             raise TypeError(str(exc))
 
-        r = self._request(rest, name, data=payload.serialize(self.encoding), timeout=timeout)
+        if (
+            (self.record_cache is not None)
+            and (rest == "get")
+            and (sname in _cached_endpoints)
+            and (etag is None)
+            and _query_by_id(payload)
+        ):
+            response = self._cached_request(sname, payload, response_model, timeout)
+        else:
+            response = self._send_request(rest, name, payload, response_model, timeout, etag)
+            if response is None:
+                return None
+
+        if full_return:
+            return response
+        else:
+            return response.data
+
+    def _send_request(
+        self, rest: str, name: str, payload: Any, response_model: Any, timeout: int = None, etag: Optional[str] = None
+    ) -> Any:
+        """Sends a validated payload and parses the response, None if the response matches the ETag"""
+
+        r = self._request(rest, name, data=payload.serialize(self.encoding), timeout=timeout, etag=etag)
+        if r.status_code == 304:
+            return None
+
         encoding = r.headers["Content-Type"].split("/")[1]
-        response = response_model.parse_raw(r.content, encoding=encoding)
+        return response_model.parse_raw(r.content, encoding=encoding)
+
+    def _cached_request(self, name: str, payload: Any, response_model: Any, timeout: int = None) -> Any:
+        """Answers a GET by id from the record cache, only the ids which are not cached are pulled from the server
+        and the immutable objects among them are added to the cache.
+        """
+
+        ids = payload.data.id if isinstance(payload.data.id, list) else [payload.data.id]
+        ids = list(dict.fromkeys(str(x) for x in ids))
+
+        found = self.record_cache.get(self.address, name, ids)
+        missing = [x for x in ids if x not in found]
+
+        meta = {"errors": [], "success": True, "error_description": False, "missing": []}
+
+        # The server does not return the ids of KeywordSets, so those are pulled one at a time to match them up
+        if name == "keyword":
+            chunks = [[x] for x in missing]
+        else:
+            chunks = [missing] if missing else []
+
+        fetched = {}
+        for chunk in chunks:
+            query = payload.copy(update={"data": payload.data.copy(update={"id": chunk})})
+            response = self._send_request("get", name, query, response_model, timeout)
+            meta["errors"].extend(response.meta.errors)
+            meta["missing"].extend(response.meta.missing)
+
+            if name == "keyword":
+                fetched.update(zip(chunk, response.data))
+            else:
+                fetched.update({str(x["id"] if isinstance(x, dict) else x.id): x for x in response.data})
+
+        if fetched:
+            found.update(fetched)
+            self.record_cache.put(self.address, name, {k: v for k, v in fetched.items() if _is_immutable(v)})
+
+        data = [found[x] for x in ids if x in found]
+        meta["n_found"] = len(data)
+        return response_model.construct(meta=ResponseGETMeta(**meta), data=data)
+
+    def post_serialized(
+        self, name: str, meta: Dict[str, Any], data: bytes, full_return: bool = False, timeout: int = None
+    ) -> Any:
+        """Posts a request whose data is already serialized with msgpack-ext, the data is sent as it is
+
+        This spares decoding and serializing large payloads again, such as the results a queue manager journals
+        before posting them. The request is sent as msgpack-ext whatever the encoding of the client.
+
+        Parameters
+        ----------
+        name : str
+            The name of the REST endpoint
+        meta : Dict[str, Any]
+            The metadata of the request, it is validated against the body of the endpoint
+        data : bytes
+            The data of the request serialized with msgpack-ext
+        full_return : bool, optional
+            Returns the full server response if True that contains additional metadata.
+        timeout : int, optional
+            Timeout time
+
+        Returns
+        -------
+        Any
+            The REST response object
+        """
+        sname = name.strip("/")
+        self._request_counter[(sname, "post")] += 1
+
+        body_model, response_model = rest_model(sname, "post")
+
+        # Provide a reasonable traceback
+        try:
+            meta = body_model.__fields__["meta"].type_(**meta)
+        except ValidationError as exc:
+            raise TypeError(str(exc))
+
+        # A map of the meta and data, the data is appended as it is
+        body = b"".join(
+            [
+                msgpack.Packer().pack_map_header(2),
+                msgpackext_dumps("meta"),
+                msgpackext_dumps(meta.dict()),
+                msgpackext_dumps("data"),
+                data,
+            ]
+        )
+
+        r = self._request("post", name, data=body, timeout=timeout, encoding="msgpack-ext")
+        response = response_model.parse_raw(r.content, encoding=r.headers["Content-Type"].split("/")[1])
 
         if full_return:
             return response
@@ -808,6 +983,7 @@ class FractalClient(object):
         priority: Optional[str] = None,
         protocols: Optional[Dict[str, Any]] = None,
         tag: Optional[str] = None,
+        resources: Optional[Dict[str, Any]] = None,
         full_return: bool = False,
     ) -> "ComputeResponse":
         """
@@ -837,6 +1013,9 @@ class FractalClient(object):
             based off the string tags. These tags are arbitrary, but several examples are to
             use "large", "medium", "small" to denote the size of the job or "project1", "project2"
             to denote different projects.
+        resources : Optional[Dict[str, Any]], optional
+            The cores (``ncores``) and memory in GiB (``memory``) each task is expected to need. Managers packing
+            tasks of different sizes use these in place of the estimate made by the server.
         full_return : bool, optional
             Returns the full server response if True that contains additional metadata.
 
@@ -882,6 +1061,7 @@ class FractalClient(object):
                 "protocols": protocols,
                 "tag": tag,
                 "priority": priority,
+                "resources": resources,
             },
             "data": molecule,
         }
@@ -896,6 +1076,7 @@ class FractalClient(object):
         molecule: Union["ObjectId", "Molecule", List[Union[str, "Molecule"]]],
         priority: Optional[str] = None,
         tag: Optional[str] = None,
+        resources: Optional[Dict[str, Any]] = None,
         full_return: bool = False,
     ) -> "ComputeResponse":
         """
@@ -918,6 +1099,9 @@ class FractalClient(object):
             based off the string tags. These tags are arbitrary, but several examples are to
             use "large", "medium", "small" to denote the size of the job or "project1", "project2"
             to denote different projects.
+        resources : Optional[Dict[str, Any]], optional
+            The cores (``ncores``) and memory in GiB (``memory``) each task is expected to need. Managers packing
+            tasks of different sizes use these in place of the estimate made by the server.
         full_return : bool, optional
             Returns the full server response if True that contains additional metadata.
 
@@ -936,7 +1120,13 @@ class FractalClient(object):
             molecule = [molecule]
 
         payload = {
-            "meta": {"procedure": procedure, "program": program, "tag": tag, "priority": priority},
+            "meta": {
+                "procedure": procedure,
+                "program": program,
+                "tag": tag,
+                "priority": priority,
+                "resources": resources,
+            },
             "data": molecule,
         }
         payload["meta"].update(program_options)
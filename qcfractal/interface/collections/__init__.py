@@ -4,7 +4,7 @@ Python init for QCPortal collections
 
 from .collection_utils import collection_factory, collections_name_map, list_known_collections, register_collection
 from .dataset import Dataset
-from .dataset_view import DatasetView, HDF5View, PlainTextView, RemoteView
+from .dataset_view import ArrowView, DatasetView, HDF5View, PlainTextView, RemoteView
 from .generic import Generic
 from .gridoptimization_dataset import GridOptimizationDataset
 from .optimization_dataset import OptimizationDataset
@@ -18,6 +18,11 @@ if TYPE_CHECKING:  # pragma: no cover
     from ..models import ObjectId
 
 
+def _is_client(client: Any) -> bool:
+    """Checks for a FractalClient or a subclass of it, by name to avoid importing the client"""
+    return any(cls.__name__ == "FractalClient" for cls in type(client).__mro__)
+
+
 class Collection(abc.ABC):
     def __init__(self, name: str, client: Optional["FractalClient"] = None, **kwargs: Any):
         """
@@ -37,7 +42,7 @@ class Collection(abc.ABC):
         """
 
         self.client = client
-        if (self.client is not None) and not (self.client.__class__.__name__ == "FractalClient"):
+        if (self.client is not None) and not _is_client(self.client):
             raise TypeError("Expected FractalClient as `client` kwarg, found {}.".format(type(self.client)))
 
         if "collection" not in kwargs:
@@ -136,7 +141,7 @@ class Collection(abc.ABC):
 
         """
 
-        if not (client.__class__.__name__ == "FractalClient"):
+        if not _is_client(client):
             raise TypeError("Expected a FractalClient as first argument, found {}.".format(type(client)))
 
         class_name = cls.__name__.lower()
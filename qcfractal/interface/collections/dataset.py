@@ -1,22 +1,21 @@
 """
 QCPortal Database ODM
 """
-import gzip
+import os
+import shutil
 import tempfile
 import warnings
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 import numpy as np
 import pandas as pd
-import requests
 from pydantic import Field, validator
 from qcelemental import constants
 from qcelemental.models.types import Array
-from tqdm import tqdm
 
 from ..models import Citation, ComputeResponse, ObjectId, ProtoModel
-from ..statistics import wrap_statistics
+from ..statistics import statistics_table, wrap_statistics
 from ..visualization import bar_plot, violin_plot
 from .collection import Collection
 from .collection_utils import composition_planner, register_collection
@@ -64,6 +63,100 @@ class ContributedValues(ProtoModel):
         return v
 
 
+class _ValueCache:
+    """
+    The cached value columns of a Dataset, stored as one array per column aligned to a shared entry index.
+
+    Entries keep their position in the index once added, so columns are written and read by vectorized position
+    lookups. Columns of numbers are stored as float64 arrays, others (for example gradients) as object arrays. Each
+    column has a mask of the entries it holds a value for, missing values are NaN and are not cached.
+    """
+
+    def __init__(self) -> None:
+        self._index = pd.Index([], dtype=object)
+        self._columns: Dict[str, np.ndarray] = {}
+        self._present: Dict[str, np.ndarray] = {}
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def __contains__(self, column: str) -> bool:
+        return column in self._columns
+
+    def contains(self, column: str, subset: List[str]) -> bool:
+        """Checks if a column holds values for all entries of a subset"""
+        if column not in self._columns:
+            return False
+        positions = self._index.get_indexer(subset)
+        return bool((positions >= 0).all() and self._present[column][positions].all())
+
+    def update(self, new_data: pd.DataFrame) -> None:
+        """Writes the values of new_data into the cache, missing values do not replace cached values"""
+        self._extend(new_data.index)
+        positions = self._index.get_indexer(new_data.index)
+
+        for column, series in new_data.items():
+            if pd.api.types.infer_dtype(series, skipna=True) in {"floating", "integer", "mixed-integer-float", "empty"}:
+                values = series.to_numpy(dtype=np.float64)
+            else:
+                values = series.to_numpy(dtype=object)
+            present = ~pd.isna(values)
+
+            stored = self._columns.get(column)
+            if stored is None:
+                stored = self._empty(len(self._index), values.dtype)
+                self._present[column] = np.zeros(len(self._index), dtype=bool)
+            elif stored.dtype != values.dtype:
+                stored = stored.astype(object)
+
+            stored[positions[present]] = values[present]
+            self._columns[column] = stored
+            self._present[column][positions[present]] = True
+
+    def scale(self, column: str, factor: float) -> None:
+        """Multiplies a column in place, for example to convert its units"""
+        self._columns[column] = self._columns[column] * factor
+
+    def frame(self, subset: Optional[List[str]] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Returns the values of a subset of entries and columns as a DataFrame"""
+        if columns is None:
+            columns = self.columns
+        if subset is None:
+            index = self._index
+            data = {column: self._column(column, slice(None)) for column in columns}
+        else:
+            index = pd.Index(list(subset))
+            positions = self._index.get_indexer(index)
+            found = positions >= 0
+            data = {}
+            for column in columns:
+                values = self._empty(len(index), self._columns[column].dtype if column in self else object)
+                values[found] = self._column(column, positions[found])
+                data[column] = values
+
+        return pd.DataFrame(data, index=index, columns=columns)
+
+    def _column(self, column: str, positions: Any) -> np.ndarray:
+        if column not in self._columns:
+            return self._empty(len(self._index), object)[positions]
+        return self._columns[column][positions]
+
+    def _extend(self, names: pd.Index) -> None:
+        new_names = names[self._index.get_indexer(names) < 0].unique()
+        if len(new_names) == 0:
+            return
+
+        self._index = self._index.append(pd.Index(new_names, dtype=object))
+        for column, values in self._columns.items():
+            self._columns[column] = np.concatenate([values, self._empty(len(new_names), values.dtype)])
+            self._present[column] = np.concatenate([self._present[column], np.zeros(len(new_names), dtype=bool)])
+
+    @staticmethod
+    def _empty(n: int, dtype: Any) -> np.ndarray:
+        return np.full(n, np.nan, dtype=dtype)
+
+
 class Dataset(Collection):
     """
     The Dataset class for homogeneous computations on many molecules.
@@ -75,7 +168,7 @@ class Dataset(Collection):
     data : dict
         JSON representation of the database backbone
     df : pd.DataFrame
-        The underlying dataframe for the Dataset object
+        The cached values of the Dataset object, as a dataframe
     """
 
     def __init__(self, name: str, client: Optional["FractalClient"] = None, **kwargs: Any) -> None:
@@ -111,10 +204,13 @@ class Dataset(Collection):
         self._disable_view: bool = False  # for debugging and testing
         self._disable_query_limit: bool = False  # for debugging and testing
 
-        # Initialize internal data frames and load in contrib
-        self.df = pd.DataFrame()
+        # Initialize internal value cache and load in contrib
+        self._cache = _ValueCache()
         self._column_metadata: Dict[str, Any] = {}
 
+        # Listings of records and contributed values, with the state of the dataset they were built from
+        self._listings: Dict[str, Tuple[Any, pd.DataFrame]] = {}
+
         # If this is a brand new dataset, initialize the records and cv fields
         if self.data.id == "local":
             if self.data.records is None:
@@ -148,14 +244,19 @@ class Dataset(Collection):
         Parameters
         ----------
         path: Union[str, Path]
-            path to an hdf5 file representing a view for this dataset
+            path to an hdf5 or arrow file representing a view for this dataset
         """
-        from . import HDF5View
+        from .dataset_view import open_view
 
-        self._view = HDF5View(path)
+        self._view = open_view(path)
 
     def download(
-        self, local_path: Optional[Union[str, Path]] = None, verify: bool = True, progress_bar: bool = True
+        self,
+        local_path: Optional[Union[str, Path]] = None,
+        verify: bool = True,
+        progress_bar: bool = True,
+        n_connections: int = 4,
+        cache_dir: Optional[Union[str, Path]] = "~/.qca/views",
     ) -> None:
         """
         Download a remote view if available. The dataset will use this view to avoid server queries for calls to:
@@ -164,62 +265,78 @@ class Dataset(Collection):
         - get_values
         - list_values
 
+        Views are downloaded in parallel byte ranges if the server supports them, and interrupted downloads resume
+        where they stopped when downloaded again. Views which match the checksum of the dataset are kept in a cache,
+        so that the same view is not downloaded twice.
+
         Parameters
         ----------
         local_path: Optional[Union[str, Path]], optional
-            Local path the store downloaded view. If None, the view will be stored in a temporary file and deleted on exit.
+            Local path the store downloaded view. If None, the view will be stored in the cache, or in a temporary file
+            which is deleted on exit if the cache is disabled.
         verify: bool, optional
             Verify download checksum. Default: True.
         progress_bar: bool, optional
             Display a download progress bar. Default: True
+        n_connections: int, optional
+            The number of byte ranges downloaded at the same time. Default: 4
+        cache_dir: Optional[Union[str, Path]], optional
+            Directory of the cache of downloaded views, by checksum. None disables the cache. Default: ~/.qca/views
         """
-        chunk_size = 8192
         if self.data.view_url_hdf5 is None:
             raise ValueError("A view for this dataset is not available on the server")
 
-        if local_path is not None:
-            local_path = Path(local_path)
-        else:
-            self._view_tempfile = tempfile.NamedTemporaryFile()  # keep temp file alive until self is destroyed
-            local_path = self._view_tempfile.name
+        from .dataset_view import download_view
 
-        r = requests.get(self.data.view_url_hdf5, stream=True)
-        pbar = None
-        if progress_bar:
-            try:
-                file_length = int(r.headers.get("content-length"))
-                pbar = tqdm(total=file_length, initial=0, unit="B", unit_scale=True)
-            except Exception:
-                warnings.warn("Failed to create download progress bar", RuntimeWarning)
-
-        with open(local_path, "wb") as fd:
-            for chunk in r.iter_content(chunk_size=chunk_size):
-                fd.write(chunk)
-                if pbar is not None:
-                    pbar.update(chunk_size)
-
-        with open(local_path, "rb") as f:
-            magic = f.read(2)
-            gzipped = magic == b"\x1f\x8b"
-        if gzipped:
-            extract_tempfile = tempfile.NamedTemporaryFile()  # keep temp file alive until self is destroyed
-            with gzip.open(local_path, "rb") as fgz:
-                with open(extract_tempfile.name, "wb") as f:
-                    f.write(fgz.read())
-            self._view_tempfile = extract_tempfile
-            local_path = self._view_tempfile.name
-
-        if verify:
-            remote_checksum = self.data.view_metadata["blake2b_checksum"]
-            from . import HDF5View
+        remote_checksum = (self.data.view_metadata or {}).get("blake2b_checksum")
+        cache_path = None
+        if (cache_dir is not None) and isinstance(remote_checksum, str) and remote_checksum.isalnum():
+            cache_dir = Path(cache_dir).expanduser()
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_path = cache_dir / f"{remote_checksum}.view"
 
-            local_checksum = HDF5View(local_path).hash()
-            if remote_checksum != local_checksum:
-                raise ValueError(f"Checksum verification failed. Expected: {remote_checksum}, Got: {local_checksum}")
+        if cache_path is not None and cache_path.is_file():
+            if local_path is None:
+                local_path = cache_path
+            else:
+                shutil.copyfile(cache_path, local_path)
+            self.set_view(local_path)
+            return
 
-        self.set_view(local_path)
+        # Views for the cache are downloaded aside, so that partial downloads are resumed but never used
+        if local_path is not None:
+            download_path = Path(local_path)
+        elif cache_path is not None:
+            download_path = cache_path.with_suffix(".download")
+        else:
+            self._view_tempfile = tempfile.NamedTemporaryFile()  # keep temp file alive until self is destroyed
+            download_path = Path(self._view_tempfile.name)
 
-    def to_file(self, path: Union[str, Path], encoding: str) -> None:
+        local_checksum = download_view(
+            self.data.view_url_hdf5, download_path, n_connections=n_connections, progress_bar=progress_bar
+        )
+        if verify and remote_checksum != local_checksum:
+            download_path.unlink()
+            raise ValueError(f"Checksum verification failed. Expected: {remote_checksum}, Got: {local_checksum}")
+
+        if cache_path is not None and remote_checksum == local_checksum:
+            if local_path is None:
+                os.replace(download_path, cache_path)
+                download_path = cache_path
+            else:
+                try:
+                    os.link(download_path, cache_path)
+                except OSError:
+                    shutil.copyfile(download_path, cache_path)
+        elif local_path is None and cache_path is not None:
+            # Unverified views which do not match their checksum are not cached
+            self._view_tempfile = tempfile.NamedTemporaryFile()
+            os.replace(download_path, self._view_tempfile.name)
+            download_path = Path(self._view_tempfile.name)
+
+        self.set_view(download_path)
+
+    def to_file(self, path: Union[str, Path], encoding: str, incremental: bool = False) -> None:
         """
         Writes a view of the dataset to a file
 
@@ -228,7 +345,10 @@ class Dataset(Collection):
         path: Union[str, Path]
             Where to write the file
         encoding: str
-            Options: plaintext, hdf5
+            Options: plaintext, hdf5, arrow
+        incremental: bool, optional
+            Only add the entries, molecules and value columns missing from an existing hdf5 view, see
+            HDF5View.update
         """
         if encoding.lower() == "plaintext":
             from . import PlainTextView
@@ -237,7 +357,16 @@ class Dataset(Collection):
         elif encoding.lower() in ["hdf5", "h5"]:
             from . import HDF5View
 
-            HDF5View(path).write(self)
+            if incremental:
+                HDF5View(path).update(self)
+            else:
+                HDF5View(path).write(self)
+        elif encoding.lower() == "arrow":
+            from . import ArrowView
+
+            if incremental:
+                raise NotImplementedError("Arrow views can not be updated incrementally, write a new view instead")
+            ArrowView(path).write(self)
         else:
             raise NotImplementedError(f"Unsupported encoding: {encoding}")
 
@@ -519,11 +648,34 @@ class Dataset(Collection):
             Record specifications matching **search.
 
         """
-        show_dftd3 = dftd3
+        key = (
+            frozenset(self.data.history),
+            self.data.default_program,
+            tuple(sorted(self.data.default_keywords.items())),
+        )
+        ret = self._listing("records", key, self._build_record_listing)
+
+        if dftd3 is False:
+            ret = ret[ret["program"] != "dftd3"]
+
+        return ret
+
+    def _listing(self, kind: str, key: Any, build: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Returns a copy of a listing, which is only built again once the key of the dataset state changes"""
+
+        listing = self._listings.get(kind)
+        if (listing is None) or (listing[0] != key):
+            listing = (key, build())
+            self._listings[kind] = listing
+
+        return listing[1].copy()
+
+    def _build_record_listing(self) -> pd.DataFrame:
+        """Lists the specifications of the history, including the dftd3 records and the DFT-D3 composites"""
 
         history = pd.DataFrame(list(self.data.history), columns=self.data.history_keys)
 
-        # Short circuit because merge and apply below require data
+        # Short circuit because merge below requires data
         if history.shape[0] == 0:
             ret = history.copy()
             ret["name"] = None
@@ -531,40 +683,21 @@ class Dataset(Collection):
 
         # Build out -D3 combos
         dftd3 = history[history["program"] == "dftd3"].copy()
-        dftd3["base"] = [x.split("-d3")[0] for x in dftd3["method"]]
+        dftd3["base"] = dftd3["method"].str.split("-d3").str[0]
 
         nondftd3 = history[history["program"] != "dftd3"]
         dftd3combo = nondftd3.merge(dftd3[["method", "base"]], left_on="method", right_on="base")
         dftd3combo["method"] = dftd3combo["method_y"]
         dftd3combo.drop(["method_x", "method_y", "base"], axis=1, inplace=True)
 
-        history = pd.concat([history, dftd3combo], sort=False)
-        history = history.reset_index()
-        history.drop("index", axis=1, inplace=True)
+        history = pd.concat([history, dftd3combo], sort=False, ignore_index=True)
 
         # Drop duplicates due to stoich in some instances, this could be handled with multiple merges
         # Simpler to do it this way.
         history.drop_duplicates(inplace=True)
 
-        # Find the returned subset
-        ret = history.copy()
-
-        # Add name column
-        ret["name"] = ret.apply(
-            lambda row: self._canonical_name(
-                program=row["program"],
-                method=row["method"],
-                basis=row["basis"],
-                keywords=row["keywords"],
-                stoich=row.get("stoichiometry", None),
-                driver=row["driver"],
-            ),
-            axis=1,
-        )
-        if show_dftd3 is False:
-            ret = ret[ret["program"] != "dftd3"]
-
-        return ret
+        history["name"] = self._canonical_names(history)
+        return history
 
     def get_values(
         self,
@@ -744,8 +877,8 @@ class Dataset(Collection):
             new_data[qname] *= constants.conversion_factor(units[qname], self.units)
             self._column_metadata[qname].update({"native": True, "units": self.units})
 
-        self._update_cache(new_data)
-        return self.df.loc[subset, names]
+        self._cache.update(new_data)
+        return self._cache.frame(subset, names)
 
     def _form_queries(
         self,
@@ -1003,6 +1136,37 @@ class Dataset(Collection):
 
         return name
 
+    def _canonical_names(self, specs: pd.DataFrame) -> pd.Series:
+        """
+        Builds the canonical names of a DataFrame of specifications at once, see `_canonical_name`
+        """
+
+        def column(key: str) -> pd.Series:
+            if key not in specs.columns:
+                return pd.Series("", index=specs.index)
+            return specs[key].fillna("").astype(str)
+
+        method, basis, keywords, program = (column(k) for k in ["method", "basis", "keywords", "program"])
+        stoich = column("stoichiometry").str.lower()
+
+        name = method.str.upper()
+
+        has_basis = basis != ""
+        name = name.where(~has_basis, (name + "/").where(name != "", "") + basis.str.lower())
+
+        default_keywords = program.map(lambda x: self.data.default_keywords.get(x or None, None))
+        name = name.where(~((keywords != "") & (keywords != default_keywords)), name + "-" + keywords)
+
+        has_program = (program != "") & (program.str.lower() != self.data.default_program)
+        name = name.where(~has_program, name + "-" + program.str.title())
+
+        has_stoich = stoich != ""
+        named = name != ""
+        name = name.where(~(has_stoich & ~named), stoich)
+        name = name.where(~(has_stoich & named & (stoich != "default")), stoich + "-" + name)
+
+        return name
+
     def _default_parameters(
         self,
         program: Optional[str],
@@ -1246,9 +1410,9 @@ class Dataset(Collection):
 
     @units.setter
     def units(self, value):
-        for column in self.df.columns:
+        for column in self._cache.columns:
             try:
-                self.df[column] *= constants.conversion_factor(self._column_metadata[column]["units"], value)
+                self._cache.scale(column, constants.conversion_factor(self._column_metadata[column]["units"], value))
 
                 # Cast units to quantities so that `kcal / mol` == `kilocalorie / mole`
                 metadata_quantity = constants.Quantity(self._column_metadata[column]["units"])
@@ -1434,39 +1598,34 @@ class Dataset(Collection):
             Contributed value specifications.
         """
         self._ensure_contributed_values()
-        ret = pd.DataFrame(columns=self.data.history_keys + tuple(["name"]))
 
-        cvs = (
-            (cv_data.name, cv_data.theory_level_details) for (cv_name, cv_data) in self.data.contributed_values.items()
-        )
+        key = tuple((cv_name, id(cv_data)) for cv_name, cv_data in self.data.contributed_values.items())
+        return self._listing("contributed_values", key, self._build_contributed_listing)
+
+    def _build_contributed_listing(self) -> pd.DataFrame:
+        """Lists the specifications of the contributed values"""
 
-        for cv_name, theory_level_details in cvs:
-            spec = {"name": cv_name}
+        specs = []
+        for cv_data in self.data.contributed_values.values():
+            spec = {"name": cv_data.name}
             for k in self.data.history_keys:
                 spec[k] = "Unknown"
             # ReactionDataset uses "default" as a default value for stoich,
             # but many contributed datasets lack a stoich field
             if "stoichiometry" in self.data.history_keys:
                 spec["stoichiometry"] = "default"
-            if isinstance(theory_level_details, dict):
-                spec.update(**theory_level_details)
-            ret = ret.append(spec, ignore_index=True)
+            if isinstance(cv_data.theory_level_details, dict):
+                spec.update(**cv_data.theory_level_details)
+            specs.append(spec)
 
-        return ret
+        columns = list(self.data.history_keys) + ["name"]
+        ret = pd.DataFrame(specs)
+        ret = ret.reindex(columns=columns + [column for column in ret.columns if column not in columns])
 
-    def _subset_in_cache(self, column_name: str, subset: Set[str]) -> bool:
-        try:
-            return not self.df.loc[subset, column_name].isna().any()
-        except KeyError:
-            return False
+        return ret.astype(object)
 
-    def _update_cache(self, new_data: pd.DataFrame) -> None:
-        new_df = pd.DataFrame(
-            index=set(self.df.index) | set(new_data.index), columns=set(self.df.columns) | set(new_data.columns)
-        )
-        new_df.update(new_data)
-        new_df.update(self.df)
-        self.df = new_df
+    def _subset_in_cache(self, column_name: str, subset: Set[str]) -> bool:
+        return self._cache.contains(column_name, list(subset))
 
     def _get_contributed_values(self, subset: Set[str], force: bool = False, **spec) -> pd.DataFrame:
 
@@ -1530,8 +1689,8 @@ class Dataset(Collection):
                     raise
             self._column_metadata[column_name].update(metadata)
 
-        self._update_cache(new_data)
-        return self.df.loc[subset, column_names]
+        self._cache.update(new_data)
+        return self._cache.frame(subset, column_names)
 
     def get_molecules(
         self, subset: Optional[Union[str, Set[str]]] = None, force: bool = False
@@ -1736,15 +1895,76 @@ class Dataset(Collection):
 
         return wrap_statistics(stype.upper(), self, value, bench, **kwargs)
 
+    def statistics_table(
+        self,
+        value: Union[str, List[str], pd.DataFrame],
+        stype: Union[str, List[str]] = ("ME", "MUE", "MURE"),
+        bench: Optional[str] = None,
+        groups: Optional[Dict[str, List[str]]] = None,
+        bootstrap: int = 0,
+        confidence: float = 0.95,
+        seed: Optional[int] = None,
+        **kwargs: Dict[str, Any],
+    ) -> pd.DataFrame:
+        """Provides mean statistics of many columns against a benchmark at once as a tidy dataframe.
+
+        Parameters
+        ----------
+        value : Union[str, List[str], pd.DataFrame]
+            The method strings to compare, or a dataframe of their values
+        stype : Union[str, List[str]], optional
+            The statistics to compute, any of ME, MUE, MURE or RMSE
+        bench : str, optional
+            The benchmark method for the comparison, defaults to `default_benchmark`.
+        groups : Optional[Dict[str, List[str]]], optional
+            Subsets of the entries to compute the statistics over by group name, all entries if None
+        bootstrap : int, optional
+            The number of bootstrap resamples for confidence intervals, no intervals are computed if 0
+        confidence : float, optional
+            The confidence level of the intervals
+        seed : Optional[int], optional
+            The seed of the bootstrap resampling
+        kwargs: Dict[str, Any]
+            Additional kwargs to pass to the statistics functions
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per group, column and statistic with the columns group, column, statistic and value, and
+            lower and upper with bootstrap
+        """
+
+        if bench is None:
+            bench = self.data.default_benchmark
+
+        if bench is None:
+            raise KeyError("No benchmark provided and default_benchmark is None!")
+
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, pd.DataFrame):
+            value = self.get_values(name=list(value))
+
+        rbench = self.get_values(name=bench)[bench]
+        return statistics_table(
+            value, rbench, stype, groups=groups, bootstrap=bootstrap, confidence=confidence, seed=seed, **kwargs
+        )
+
     def _use_view(self, force: bool = False) -> bool:
         """Helper function to decide whether to use a locally available HDF5 view"""
         return (force is False) and (self._view is not None) and (self._disable_view is False)
 
     def _clear_cache(self) -> None:
-        self.df = pd.DataFrame()
+        self._cache = _ValueCache()
+        self._listings = {}
         self.data.__dict__["records"] = None
         self.data.__dict__["contributed_values"] = None
 
+    @property
+    def df(self) -> pd.DataFrame:
+        """The cached values of the dataset, as a dataframe of entries by value columns"""
+        return self._cache.frame()
+
     # Getters
     def __getitem__(self, args: str) -> pd.Series:
         """A wrapped to the underlying pd.DataFrame to access columnar data
@@ -1,18 +1,26 @@
 import abc
 import distutils
 import hashlib
+import json
+import os
 import pathlib
 import shutil
 import tarfile
 import tempfile
+import threading
 import warnings
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from typing import TYPE_CHECKING, Any, Dict, Iterator, List, NoReturn, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 import h5py
+import requests
 from qcelemental.util.serialization import deserialize, serialize
+from tqdm import tqdm
 
 from ..models import Molecule, ObjectId
 from ..util import normalize_filename
@@ -107,27 +115,45 @@ class DatasetView(abc.ABC):
 
 
 class HDF5View(DatasetView):
-    def __init__(self, path: Union[str, pathlib.Path]) -> None:
+    # Variable length columns are read in contiguous slices spanning at most this many rows
+    _vlen_chunk_rows = 4096
+
+    def __init__(self, path: Union[str, pathlib.Path], swmr: bool = False) -> None:
         """
         Parameters
         ----------
         path: Union[str, pathlib.Path]
             File path of view
+        swmr: bool, optional
+            Open the view in single-writer multiple-reader mode, so that it can be read while it is written.
+            Views are then written in the latest HDF5 file format, which SWMR requires.
         """
         path = pathlib.Path(path)
         self._path = path
+        self._swmr = swmr
         self._entries: pd.DataFrame = None
         self._index: pd.DataFrame = None
 
+        # A single read-only handle is kept open, and reopened when the file is replaced
+        self._file: Optional["h5py.File"] = None
+        self._file_stat: Optional[Tuple[int, int]] = None
+
+    def close(self) -> None:
+        """Closes the file handle of the view, it is reopened by the next read"""
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._file_stat = None
+
     def list_values(self) -> pd.DataFrame:
         with self._read_file() as f:
             history_keys = self._deserialize_field(f.attrs["history_keys"])
-            df = pd.DataFrame(columns=history_keys + ["name", "native"])
+            rows = []
             for dataset in f["value"].values():
                 row = {k: self._deserialize_field(dataset.attrs[k]) for k in history_keys}
                 row["name"] = self._deserialize_field(dataset.attrs["name"])
                 row["native"] = True
-                df = df.append(row, ignore_index=True)
+                rows.append(row)
             for dataset in f["contributed_value"].values():
                 row = dict()
                 row["name"] = self._deserialize_field(dataset.attrs["name"])
@@ -141,8 +167,11 @@ class HDF5View(DatasetView):
                     if isinstance(theory_level_details, dict):
                         row.update(**theory_level_details)
                 row["native"] = False
-                df = df.append(row, ignore_index=True)
-        # for some reason, pandas makes native a float column
+                rows.append(row)
+
+        columns = history_keys + ["name", "native"]
+        df = pd.DataFrame(rows)
+        df = df.reindex(columns=columns + [column for column in df.columns if column not in columns])
         return df.astype({"native": bool})
 
     def get_values(
@@ -168,26 +197,26 @@ class HDF5View(DatasetView):
                 driver = query["driver"]
 
                 dataset = f[dataset_name]
+                rows = self._read_rows(dataset, indexes)
                 if not h5py.check_dtype(vlen=dataset.dtype):
-                    data = [dataset[i] for i in indexes]
+                    data = list(rows)
                 else:
                     if driver.lower() == "gradient":
-                        data = [np.reshape(dataset[i], (-1, 3)) for i in indexes]
+                        data = [np.reshape(row, (-1, 3)) for row in rows]
                     elif driver.lower() == "hessian":
                         data = []
-                        for i in indexes:
-                            n2 = len(dataset[i])
-                            n = int(round(np.sqrt(n2)))
-                            data.append(np.reshape(dataset[i], (n, n)))
+                        for row in rows:
+                            n = int(round(np.sqrt(len(row))))
+                            data.append(np.reshape(row, (n, n)))
                     else:
                         warnings.warn(
                             f"Variable length data type not understood, returning flat array " f"(driver = {driver}).",
                             RuntimeWarning,
                         )
                         try:
-                            data = [np.array(dataset[i]) for i in indexes]
+                            data = [np.array(row) for row in rows]
                         except ValueError:
-                            data = [dataset[i] for i in indexes]
+                            data = list(rows)
                 column_name = query["name"]
                 column_units = self._deserialize_field(dataset.attrs["units"])
                 ret[column_name] = data
@@ -197,16 +226,11 @@ class HDF5View(DatasetView):
 
     def get_molecules(self, indexes: List[Union[ObjectId, int]], keep_serialized: bool = False) -> pd.Series:
         with self._read_file() as f:
-            mol_schema = f["molecule/schema"]
+            rows = self._read_rows(f["molecule/schema"], [int(i) for i in indexes])
             if not keep_serialized:
-                mols = [
-                    Molecule(
-                        **self._deserialize_data(mol_schema[int(i) if isinstance(i, ObjectId) else i]), validate=False
-                    )
-                    for i in indexes
-                ]
+                mols = [Molecule(**self._deserialize_data(row), validate=False) for row in rows]
             else:
-                mols = [mol_schema[int(i) if isinstance(i, ObjectId) else i].tobytes() for i in indexes]
+                mols = [row.tobytes() for row in rows]
         return pd.Series(mols, index=indexes)
 
     def get_index(self, subset: Optional[List[str]] = None) -> pd.DataFrame:
@@ -257,43 +281,7 @@ class HDF5View(DatasetView):
         n_records = len(ds.data.records)
         default_shape = (n_records,)
 
-        if h5py.__version__ >= distutils.version.StrictVersion("2.10.0"):
-            vlen_double_t = h5py.vlen_dtype(np.dtype("float64"))
-            utf8_t = h5py.string_dtype(encoding="utf-8")
-            bytes_t = h5py.vlen_dtype(np.dtype("uint8"))
-            vlen_utf8_t = h5py.vlen_dtype(utf8_t)
-        else:
-            vlen_double_t = h5py.special_dtype(vlen=np.dtype("float64"))
-            utf8_t = h5py.special_dtype(vlen=str)
-            bytes_t = h5py.special_dtype(vlen=np.dtype("uint8"))
-            vlen_utf8_t = h5py.special_dtype(vlen=utf8_t)
-
-        driver_dataspec = {
-            "energy": {"dtype": np.dtype("float64"), "shape": default_shape},
-            "gradient": {"dtype": vlen_double_t, "shape": default_shape},
-            "hessian": {"dtype": vlen_double_t, "shape": default_shape},
-            "dipole": {"dtype": np.dtype("float64"), "shape": (n_records, 3)},
-        }
-
-        def _write_dataset(dataset, column, entry_dset):
-            assert column.shape[1] == 1
-            for i, name in enumerate(entry_dset):
-
-                if isinstance(name, bytes):
-                    name = name.decode("utf-8")
-
-                element = column.loc[name][0]
-                if not h5py.check_dtype(vlen=dataset.dtype):
-                    dataset[i] = element
-                # Variable length datatypes require flattening of the array and special handling of missing values
-                else:
-                    try:
-                        dataset[i] = element.ravel()
-                    except AttributeError:
-                        if np.isnan(element):
-                            pass
-                        else:
-                            raise
+        vlen_double_t, utf8_t, bytes_t, vlen_utf8_t = self._dtypes()
 
         with self._write_file() as f:
             # Collection attributes
@@ -320,130 +308,303 @@ class HDF5View(DatasetView):
                 molecules = ds.get_molecules(stoich=list(ds.valid_stoich(force=True)), force=True)
             else:
                 molecules = ds.get_molecules(force=True)
+
+            # Datasets can be resized by update, and molecules keep their server id so that new ones can be found
             mol_shape = (len(molecules),)
-            mol_geometry = molecule_group.create_dataset(
-                "geometry", shape=mol_shape, dtype=vlen_double_t, **dataset_kwargs
-            )
-            mol_symbols = molecule_group.create_dataset("symbols", shape=mol_shape, dtype=vlen_utf8_t, **dataset_kwargs)
-            mol_schema = molecule_group.create_dataset("schema", shape=mol_shape, dtype=bytes_t, **dataset_kwargs)
-            mol_charge = molecule_group.create_dataset(
-                "charge", shape=mol_shape, dtype=np.dtype("float64"), **dataset_kwargs
-            )
-            mol_spin = molecule_group.create_dataset(
-                "multiplicity", shape=mol_shape, dtype=np.dtype("int32"), **dataset_kwargs
-            )
+            molecule_kwargs = {"shape": mol_shape, "maxshape": (None,), **dataset_kwargs}
+            molecule_group.create_dataset("geometry", dtype=vlen_double_t, **molecule_kwargs)
+            molecule_group.create_dataset("symbols", dtype=vlen_utf8_t, **molecule_kwargs)
+            molecule_group.create_dataset("schema", dtype=bytes_t, **molecule_kwargs)
+            molecule_group.create_dataset("charge", dtype=np.dtype("float64"), **molecule_kwargs)
+            molecule_group.create_dataset("multiplicity", dtype=np.dtype("int32"), **molecule_kwargs)
+            molecule_group.create_dataset("id", dtype=utf8_t, **molecule_kwargs)
             mol_id_server_view = {}
             for i, mol_row in enumerate(molecules.to_dict("records")):
                 molecule = mol_row["molecule"]
-                mol_geometry[i] = molecule.geometry.ravel()
-                mol_schema[i] = self._serialize_data(molecule)
-                mol_symbols[i] = molecule.symbols
-                mol_charge[i] = molecule.molecular_charge
-                mol_spin[i] = molecule.molecular_multiplicity
+                self._write_molecule(molecule_group, i, molecule)
                 mol_id_server_view[molecule.id] = i
 
             # Export entries
             entry_group = f.create_group("entry")
-            entry_dset = entry_group.create_dataset("entry", shape=default_shape, dtype=utf8_t, **dataset_kwargs)
+            entry_dset = entry_group.create_dataset(
+                "entry", shape=default_shape, maxshape=(None,), dtype=utf8_t, **dataset_kwargs
+            )
             entry_dset[:] = ds.get_index(force=True)
 
             entries = ds.get_entries(force=True)
             if isinstance(ds.data.records[0], MoleculeEntry):
                 entry_group.attrs["model"] = "MoleculeEntry"
-                entries["hdf5_molecule_id"] = entries["molecule_id"].map(mol_id_server_view)
-                entry_group.create_dataset("name", data=entries["name"], dtype=utf8_t, **dataset_kwargs)
-                entry_group.create_dataset(
-                    "molecule_id", data=entries["hdf5_molecule_id"], dtype=np.dtype("int64"), **dataset_kwargs
-                )
             elif isinstance(ds.data.records[0], ReactionEntry):
                 entry_group.attrs["model"] = "ReactionEntry"
-                entries["hdf5_molecule_id"] = entries["molecule"].map(mol_id_server_view)
-                entry_group.create_dataset("name", data=entries["name"], dtype=utf8_t, **dataset_kwargs)
-                entry_group.create_dataset(
-                    "stoichiometry", data=entries["stoichiometry"], dtype=utf8_t, **dataset_kwargs
-                )
-                entry_group.create_dataset(
-                    "molecule", data=entries["hdf5_molecule_id"], dtype=np.dtype("int64"), **dataset_kwargs
-                )
-                entry_group.create_dataset(
-                    "coefficient", data=entries["coefficient"], dtype=np.dtype("float64"), **dataset_kwargs
-                )
             else:
                 raise ValueError(f"Unknown entry class ({type(ds.data.records[0])}) while writing HDF5 entries.")
+            for field, (data, dtype) in self._entry_columns(entry_group, entries, mol_id_server_view).items():
+                entry_group.create_dataset(field, data=data, dtype=dtype, maxshape=(None,), **dataset_kwargs)
 
             # Export native data columns
             value_group = f.create_group("value")
             history = ds.list_values(native=True, force=True).reset_index().to_dict("records")
             for specification in history:
-                gv_spec = specification.copy()
-                name = gv_spec.pop("name")
-                if "stoichiometry" in gv_spec:
-                    gv_spec["stoich"] = gv_spec.pop("stoichiometry")
-                dataset_name = self._normalize_hdf5_name(name)
-                df = ds.get_values(name=name, force=True, native=True)
-                assert df.shape[1] == 1
-
-                driver = specification["driver"]
-                dataspec = driver_dataspec[driver]
-                dataset = value_group.create_dataset(dataset_name, **dataspec, **dataset_kwargs)
-
-                for key in specification:
-                    dataset.attrs[key] = self._serialize_field(specification[key])
-                dataset.attrs["units"] = self._serialize_field(ds.units)
-
-                _write_dataset(dataset, df, entry_dset)
+                self._write_native_column(value_group, ds, specification, entry_dset)
 
             # Export contributed data columns
             contributed_group = f.create_group("contributed_value")
             for cv_name in ds.list_values(force=True, native=False)["name"]:
-                cv_df = ds.get_values(name=cv_name, force=True, native=False)
-                cv_model = ds.data.contributed_values[cv_name.lower()]
+                self._write_contributed_column(contributed_group, ds, cv_name, entry_dset)
+
+        # Clean up any caches
+        self._entries = None
+        self._index = None
+
+    def update(self, ds: Dataset) -> str:
+        """
+        Adds the entries, molecules and value columns of a dataset which are missing from the view, without
+        pulling or rewriting the data already in the view.
+
+        New entries and value columns are found by comparing the entry index and the value history of the view
+        with those of the dataset. Values already in the view are not refreshed. The view is written in full if it
+        does not exist, if it was written before views could be updated, or if entries were removed or reordered.
+
+        Parameters
+        ----------
+        ds: Dataset
+            The dataset the view was written from
+
+        Returns
+        -------
+        str
+            The Blake2b hash of the updated view, for the view metadata of the dataset
+        """
+
+        index = list(ds.get_index(force=True))
+        if not self._updatable(index):
+            self.write(ds)
+            return self.hash()
+
+        n_view = len(self.get_index())
+        new_index = index[n_view:]
+
+        entries = ds.get_entries(force=True)
+        new_entries = entries[entries["name"].isin(new_index)]
+        history = ds.list_values(native=True, force=True).reset_index().to_dict("records")
+        cv_names = list(ds.list_values(force=True, native=False)["name"])
+
+        with self._write_file(mode="a") as f:
+            entry_group = f["entry"]
+            id_column = "molecule_id" if entry_group.attrs["model"] == "MoleculeEntry" else "molecule"
+
+            # Molecules of the new entries which are not in the view yet
+            molecule_group = f["molecule"]
+            mol_id_server_view = {
+                self._decode(mol_id): i for i, mol_id in enumerate(molecule_group["id"][()])
+            }
+            new_ids = [mol_id for mol_id in pd.unique(new_entries[id_column]) if mol_id not in mol_id_server_view]
+            if new_ids:
+                molecules = ds._get_molecules({mol_id: mol_id for mol_id in new_ids}, force=True)["molecule"]
+                n_molecules = len(mol_id_server_view)
+                for dataset in molecule_group.values():
+                    dataset.resize((n_molecules + len(new_ids),))
+                for i, mol_id in enumerate(new_ids, n_molecules):
+                    self._write_molecule(molecule_group, i, molecules.loc[mol_id])
+                    mol_id_server_view[mol_id] = i
+
+            entry_dset = entry_group["entry"]
+            self._append(entry_dset, new_index)
+            for field, (data, dtype) in self._entry_columns(entry_group, new_entries, mol_id_server_view).items():
+                self._append(entry_group[field], data)
+
+            # Existing columns are extended by the values of the new entries, new columns are written in full
+            value_group = f["value"]
+            stored = {self._deserialize_field(dataset.attrs["name"]): dataset for dataset in value_group.values()}
+            for specification in history:
+                name = specification["name"]
+                if name not in stored:
+                    self._write_native_column(value_group, ds, specification, entry_dset)
+                elif new_index:
+                    df = ds.get_values(name=name, force=True, native=True, subset=new_index)
+                    self._extend_column(stored[name], df, new_index)
+
+            contributed_group = f["contributed_value"]
+            stored = {
+                self._deserialize_field(dataset.attrs["name"]): dataset for dataset in contributed_group.values()
+            }
+            for cv_name in cv_names:
+                if cv_name not in stored:
+                    self._write_contributed_column(contributed_group, ds, cv_name, entry_dset)
+                elif new_index:
+                    df = ds.get_values(name=cv_name, force=True, native=False, subset=new_index)
+                    self._extend_column(stored[cv_name], df, new_index)
+
+        self._entries = None
+        self._index = None
 
+        return self.hash()
+
+    def _updatable(self, index: List[str]) -> bool:
+        """Checks that a view can be updated to the entry index of a dataset"""
+
+        if not self._path.exists():
+            return False
+
+        with self._read_file() as f:
+            if "id" not in f["molecule"] or f["entry/entry"].maxshape[0] is not None:
+                return False
+
+        view_index = list(self.get_index()["index"])
+        return index[: len(view_index)] == view_index
+
+    @staticmethod
+    def _dtypes() -> Tuple[Any, Any, Any, Any]:
+        """Returns the variable length double, UTF-8 string, bytes and list of UTF-8 strings types"""
+        if h5py.__version__ >= distutils.version.StrictVersion("2.10.0"):
+            vlen_double_t = h5py.vlen_dtype(np.dtype("float64"))
+            utf8_t = h5py.string_dtype(encoding="utf-8")
+            bytes_t = h5py.vlen_dtype(np.dtype("uint8"))
+            vlen_utf8_t = h5py.vlen_dtype(utf8_t)
+        else:
+            vlen_double_t = h5py.special_dtype(vlen=np.dtype("float64"))
+            utf8_t = h5py.special_dtype(vlen=str)
+            bytes_t = h5py.special_dtype(vlen=np.dtype("uint8"))
+            vlen_utf8_t = h5py.special_dtype(vlen=utf8_t)
+        return vlen_double_t, utf8_t, bytes_t, vlen_utf8_t
+
+    def _driver_dataspec(self, n_records: int) -> Dict[str, Dict[str, Any]]:
+        vlen_double_t = self._dtypes()[0]
+        return {
+            "energy": {"dtype": np.dtype("float64"), "shape": (n_records,), "maxshape": (None,)},
+            "gradient": {"dtype": vlen_double_t, "shape": (n_records,), "maxshape": (None,)},
+            "hessian": {"dtype": vlen_double_t, "shape": (n_records,), "maxshape": (None,)},
+            "dipole": {"dtype": np.dtype("float64"), "shape": (n_records, 3), "maxshape": (None, 3)},
+        }
+
+    def _write_molecule(self, molecule_group: "h5py.Group", i: int, molecule: Molecule) -> None:
+        molecule_group["geometry"][i] = molecule.geometry.ravel()
+        molecule_group["schema"][i] = self._serialize_data(molecule)
+        molecule_group["symbols"][i] = molecule.symbols
+        molecule_group["charge"][i] = molecule.molecular_charge
+        molecule_group["multiplicity"][i] = molecule.molecular_multiplicity
+        molecule_group["id"][i] = molecule.id
+
+    def _entry_columns(
+        self, entry_group: "h5py.Group", entries: pd.DataFrame, mol_id_server_view: Dict[str, int]
+    ) -> Dict[str, Tuple[Any, Any]]:
+        """Returns the entry fields of a view as name: (data, dtype), with molecules mapped to their view index"""
+        utf8_t = self._dtypes()[1]
+        if entry_group.attrs["model"] == "MoleculeEntry":
+            return {
+                "name": (entries["name"], utf8_t),
+                "molecule_id": (entries["molecule_id"].map(mol_id_server_view), np.dtype("int64")),
+            }
+        else:
+            return {
+                "name": (entries["name"], utf8_t),
+                "stoichiometry": (entries["stoichiometry"], utf8_t),
+                "molecule": (entries["molecule"].map(mol_id_server_view), np.dtype("int64")),
+                "coefficient": (entries["coefficient"], np.dtype("float64")),
+            }
+
+    def _write_native_column(
+        self, value_group: "h5py.Group", ds: Dataset, specification: Dict[str, Any], entry_dset: "h5py.Dataset"
+    ) -> None:
+        gv_spec = specification.copy()
+        name = gv_spec.pop("name")
+        if "stoichiometry" in gv_spec:
+            gv_spec["stoich"] = gv_spec.pop("stoichiometry")
+        dataset_name = self._normalize_hdf5_name(name)
+        df = ds.get_values(name=name, force=True, native=True)
+        assert df.shape[1] == 1
+
+        driver = specification["driver"]
+        dataspec = self._driver_dataspec(len(entry_dset))[driver]
+        dataset = value_group.create_dataset(dataset_name, **dataspec, chunks=True, fletcher32=True)
+
+        for key in specification:
+            dataset.attrs[key] = self._serialize_field(specification[key])
+        dataset.attrs["units"] = self._serialize_field(ds.units)
+
+        self._write_dataset(dataset, df, entry_dset)
+
+    def _write_contributed_column(
+        self, contributed_group: "h5py.Group", ds: Dataset, cv_name: str, entry_dset: "h5py.Dataset"
+    ) -> None:
+        cv_df = ds.get_values(name=cv_name, force=True, native=False)
+        cv_model = ds.data.contributed_values[cv_name.lower()]
+
+        n_records = len(entry_dset)
+        try:
+            dataspec = self._driver_dataspec(n_records)[cv_model.theory_level_details["driver"]]
+        except (KeyError, TypeError):
+            if isinstance(cv_df[cv_name][0], float):
+                dataspec = {"dtype": np.dtype("float64"), "shape": (n_records,), "maxshape": (None,)}
+            elif isinstance(cv_df[cv_name][0], np.ndarray):
+                dataspec = {"dtype": self._dtypes()[0], "shape": (n_records,), "maxshape": (None,)}
+            else:
+                raise ValueError(f"Unable to guess data specification for contributed value column named {cv_name}.")
+            warnings.warn(
+                f"Contributed values column {cv_name} does not provide driver in theory_level_details. "
+                f"Inferred {dataspec}."
+            )
+
+        dataset = contributed_group.create_dataset(
+            self._normalize_hdf5_name(cv_name), **dataspec, chunks=True, fletcher32=True
+        )
+        for field in [
+            "name",
+            "values_structure",
+            "theory_level",
+            "units",
+            "doi",
+            "external_url",
+            "citations",
+            "comments",
+            "theory_level",
+            "theory_level_details",
+        ]:
+            dataset.attrs[field] = self._serialize_field(getattr(cv_model, field))
+
+        self._write_dataset(dataset, cv_df, entry_dset)
+
+    def _extend_column(self, dataset: "h5py.Dataset", column: pd.DataFrame, names: List[str]) -> None:
+        """Writes the values of new entries at the end of a column"""
+        start = len(dataset)
+        dataset.resize((start + len(names),) + dataset.shape[1:])
+        self._write_dataset(dataset, column, names, start=start)
+
+    @staticmethod
+    def _write_dataset(dataset: "h5py.Dataset", column: pd.DataFrame, entry_dset: Any, start: int = 0) -> None:
+        assert column.shape[1] == 1
+        for i, name in enumerate(entry_dset, start):
+
+            if isinstance(name, bytes):
+                name = name.decode("utf-8")
+
+            element = column.loc[name][0]
+            if not h5py.check_dtype(vlen=dataset.dtype):
+                dataset[i] = element
+            # Variable length datatypes require flattening of the array and special handling of missing values
+            else:
                 try:
-                    dataspec = driver_dataspec[cv_model.theory_level_details["driver"]]
-                except (KeyError, TypeError):
-                    if isinstance(cv_df[cv_name][0], float):
-                        dataspec = {"dtype": np.dtype("float64"), "shape": default_shape}
-                    elif isinstance(cv_df[cv_name][0], np.ndarray):
-                        dataspec = {"dtype": vlen_double_t, "shape": default_shape}
+                    dataset[i] = element.ravel()
+                except AttributeError:
+                    if np.isnan(element):
+                        pass
                     else:
-                        raise ValueError(
-                            f"Unable to guess data specification for contributed value column named {cv_name}."
-                        )
-                    warnings.warn(
-                        f"Contributed values column {cv_name} does not provide driver in theory_level_details. "
-                        f"Inferred {dataspec}."
-                    )
+                        raise
 
-                dataset = contributed_group.create_dataset(
-                    self._normalize_hdf5_name(cv_name), **dataspec, **dataset_kwargs
-                )
-                for field in [
-                    "name",
-                    "values_structure",
-                    "theory_level",
-                    "units",
-                    "doi",
-                    "external_url",
-                    "citations",
-                    "comments",
-                    "theory_level",
-                    "theory_level_details",
-                ]:
-                    dataset.attrs[field] = self._serialize_field(getattr(cv_model, field))
-
-                _write_dataset(dataset, cv_df, entry_dset)
+    @staticmethod
+    def _append(dataset: "h5py.Dataset", data: Any) -> None:
+        start = len(dataset)
+        if len(data) > 0:
+            dataset.resize((start + len(data),))
+            dataset[start:] = list(data)
 
-        # Clean up any caches
-        self._entries = None
+    @staticmethod
+    def _decode(value: Union[str, bytes]) -> str:
+        return value.decode("utf-8") if isinstance(value, bytes) else value
 
     def hash(self) -> str:
         """Returns the Blake2b hash of the view"""
-        b2b = hashlib.blake2b()
-        with open(self._path, "rb") as f:
-            for chunk in iter(lambda: f.read(8192), b""):
-                b2b.update(chunk)
-        return b2b.hexdigest()
+        return _file_hash(self._path)
 
     @staticmethod
     def _normalize_hdf5_name(name: str) -> str:
@@ -452,13 +613,57 @@ class HDF5View(DatasetView):
             raise ValueError("':' not allowed in names")
         return name.replace("/", ":")
 
+    def _read_rows(self, dataset: "h5py.Dataset", indexes: List[int]) -> np.ndarray:
+        """
+        Reads the rows of a dataset at the given indexes, in the order of the indexes.
+
+        Each row is read once and rows are read in increasing order, instead of one read per index. Fixed width
+        columns are read with a single slice, or a single fancy-index read when the rows are sparse. Variable
+        length columns are read in contiguous slices of at most ``_vlen_chunk_rows`` rows.
+        """
+        rows, inverse = np.unique(np.asarray(indexes, dtype=np.int64), return_inverse=True)
+        if len(rows) == 0:
+            return dataset[0:0]
+
+        if not h5py.check_dtype(vlen=dataset.dtype):
+            first, last = rows[0], rows[-1]
+            if last - first + 1 <= 2 * len(rows):
+                data = dataset[first : last + 1][rows - first]
+            else:
+                data = dataset[rows]
+        else:
+            data = np.empty(len(rows), dtype=object)
+            start = 0
+            while start < len(rows):
+                first = rows[start]
+                stop = np.searchsorted(rows, first + self._vlen_chunk_rows)
+                chunk = dataset[first : rows[stop - 1] + 1]
+                data[start:stop] = chunk[rows[start:stop] - first]
+                start = stop
+
+        return data[inverse]
+
     @contextmanager
     def _read_file(self) -> Iterator["h5py.File"]:
-        yield h5py.File(self._path, "r")
+        stat = os.stat(self._path)
+        file_stat = (stat.st_ino, stat.st_mtime_ns)
+        if self._file is None or not self._file or file_stat != self._file_stat:
+            self.close()
+            self._entries = None
+            self._index = None
+            self._file = h5py.File(self._path, "r", swmr=self._swmr)
+            self._file_stat = file_stat
+
+        yield self._file
 
     @contextmanager
-    def _write_file(self) -> Iterator["h5py.File"]:
-        yield h5py.File(self._path, "w")
+    def _write_file(self, mode: str = "w") -> Iterator["h5py.File"]:
+        # HDF5 does not allow writing to a file which is open for reading
+        self.close()
+
+        libver = "latest" if self._swmr else None
+        with h5py.File(self._path, mode, libver=libver) as f:
+            yield f
 
     # Methods for serializing to strings for storage in HDF5 metadata fields ("attrs")
     @staticmethod
@@ -481,7 +686,622 @@ class HDF5View(DatasetView):
         return deserialize(data.tobytes(), "msgpack-ext")
 
 
+class ArrowView(DatasetView):
+    """
+    A view stored as a single Arrow IPC file, which is memory-mapped so that columns are read without copies.
+
+    The entry index, the entries, the molecules and the value columns are stored side by side in one table, as
+    columns prefixed by "index:", "entry:", "molecule:" and "value:". Each is padded with nulls to the longest of them,
+    their lengths, the value history and the units of each column are kept in the schema metadata. Molecules are
+    stored as a binary column of msgpack, and vector values as flattened lists.
+    """
+
+    _metadata_key = b"qcfractal_view"
+
+    def __init__(self, path: Union[str, pathlib.Path]) -> None:
+        """
+        Parameters
+        ----------
+        path: Union[str, pathlib.Path]
+            File path of view
+        """
+        self._path = pathlib.Path(path)
+        self._entries: pd.DataFrame = None
+        self._index: pd.DataFrame = None
+
+        # The memory map is kept open while the table is in use, and reopened when the file is replaced
+        self._source = None
+        self._table = None
+        self._metadata: Dict[str, Any] = None
+        self._file_stat: Optional[Tuple[int, int]] = None
+
+    def close(self) -> None:
+        """Closes the memory map of the view, it is reopened by the next read"""
+        if self._source is not None:
+            self._source.close()
+        self._source = None
+        self._table = None
+        self._metadata = None
+        self._file_stat = None
+
+    def list_values(self) -> pd.DataFrame:
+        table, metadata = self._read_table()
+        df = pd.DataFrame(metadata["list_values"])
+        columns = metadata["history_keys"] + ["name", "native"]
+        df = df.reindex(columns=columns + [column for column in df.columns if column not in columns])
+        return df.astype({"native": bool})
+
+    def get_values(
+        self, queries: List[Dict[str, Union[str, bool]]], subset: Optional[List[str]] = None
+    ) -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """
+        Parameters
+        ----------
+        subset
+        queries: List[Dict[str, Union[str, bool]]]
+            List of queries. Fields actually used are native, name, driver
+        """
+
+        units = {}
+        entries = self.get_index(subset)
+        table, metadata = self._read_table()
+        rows = self._take_indices(entries["_row"])
+
+        ret = pd.DataFrame(index=entries["index"])
+        for query in queries:
+            column_name = query["name"]
+            key = self._column_key(column_name, query["native"])
+            column = metadata["columns"][key]
+            data = table.column(key).take(rows)
+
+            if column["kind"] == "scalar":
+                data = data.to_numpy()
+            else:
+                data = self._split_lists(data)
+                driver = query["driver"].lower()
+                if driver == "gradient":
+                    data = [np.reshape(row, (-1, 3)) for row in data]
+                elif driver == "hessian":
+                    data = [np.reshape(row, (int(round(np.sqrt(len(row)))),) * 2) for row in data]
+                elif driver != "dipole":
+                    warnings.warn(
+                        f"Variable length data type not understood, returning flat array (driver = {driver}).",
+                        RuntimeWarning,
+                    )
+
+            ret[column_name] = list(data)
+            units[column_name] = column["units"]
+
+        return ret, units
+
+    def get_molecules(self, indexes: List[Union[ObjectId, int]], keep_serialized: bool = False) -> pd.Series:
+        table, _ = self._read_table()
+        rows = self._take_indices([int(i) for i in indexes])
+        blobs = table.column("molecule:schema").take(rows).to_pylist()
+        if not keep_serialized:
+            mols = [Molecule(**deserialize(blob, "msgpack-ext"), validate=False) for blob in blobs]
+        else:
+            mols = blobs
+        return pd.Series(mols, index=indexes)
+
+    def get_index(self, subset: Optional[List[str]] = None) -> pd.DataFrame:
+        if self._index is None:
+            table, metadata = self._read_table()
+            names = table.column("index:name").slice(0, metadata["lengths"]["index"]).to_pylist()
+            self._index = pd.DataFrame({"index": names, "_row": range(len(names))})
+            self._index.set_index("index", inplace=True)
+
+        if subset is None:
+            return self._index.reset_index()
+        else:
+            return self._index.loc[subset].reset_index()
+
+    def get_entries(self, subset: Optional[List[str]] = None) -> pd.DataFrame:
+        if self._entries is None:
+            table, metadata = self._read_table()
+            n_entries = metadata["lengths"]["entry"]
+            fields = [name for name in table.column_names if name.startswith("entry:")]
+            self._entries = pd.DataFrame(
+                {field[len("entry:") :]: table.column(field).slice(0, n_entries).to_pandas() for field in fields}
+            )
+            self._entries.set_index("name", inplace=True)
+
+        if subset is None:
+            return self._entries.reset_index()
+        else:
+            return self._entries.loc[subset].reset_index()
+
+    def write(self, ds: Dataset) -> None:
+        ds.get_entries(force=True)
+        index = list(ds.get_index(force=True))
+        history_keys = list(ds.data.history_keys)
+
+        if "stoichiometry" in ds.data.history_keys:
+            molecules = ds.get_molecules(stoich=list(ds.valid_stoich(force=True)), force=True)
+        else:
+            molecules = ds.get_molecules(force=True)
+        mol_id_server_view = {}
+        schemas = []
+        for molecule in molecules["molecule"]:
+            if molecule.id not in mol_id_server_view:
+                mol_id_server_view[molecule.id] = len(schemas)
+                schemas.append(serialize(molecule, "msgpack-ext"))
+
+        entries = ds.get_entries(force=True)
+        if isinstance(ds.data.records[0], MoleculeEntry):
+            model = "MoleculeEntry"
+            entries = pd.DataFrame(
+                {"name": entries["name"], "molecule_id": entries["molecule_id"].map(mol_id_server_view)}
+            )
+        elif isinstance(ds.data.records[0], ReactionEntry):
+            model = "ReactionEntry"
+            entries = pd.DataFrame(
+                {
+                    "name": entries["name"],
+                    "stoichiometry": entries["stoichiometry"],
+                    "molecule": entries["molecule"].map(mol_id_server_view),
+                    "coefficient": entries["coefficient"],
+                }
+            )
+        else:
+            raise ValueError(f"Unknown entry class ({type(ds.data.records[0])}) while writing Arrow entries.")
+
+        list_values = []
+        columns = {}
+        for specification in ds.list_values(native=True, force=True).reset_index().to_dict("records"):
+            name = specification["name"]
+            row = {k: specification[k] for k in history_keys}
+            row.update(name=name, native=True)
+            list_values.append(row)
+
+            df = ds.get_values(name=name, force=True, native=True)
+            columns[(name, True)] = (df.iloc[:, 0].reindex(index), specification["driver"], ds.units)
+
+        for cv_name in ds.list_values(force=True, native=False)["name"]:
+            cv_model = ds.data.contributed_values[cv_name.lower()]
+            row = {k: "Unknown" for k in history_keys}
+            # ReactionDataset uses "default" as a default value for stoich
+            if "stoichiometry" in history_keys:
+                row["stoichiometry"] = "default"
+            if isinstance(cv_model.theory_level_details, dict):
+                row.update(**cv_model.theory_level_details)
+            row.update(name=cv_name, native=False)
+            list_values.append(row)
+
+            try:
+                driver = cv_model.theory_level_details["driver"]
+            except (KeyError, TypeError):
+                driver = None
+            df = ds.get_values(name=cv_name, force=True, native=False)
+            columns[(cv_name, False)] = (df.iloc[:, 0].reindex(index), driver, cv_model.units)
+
+        self._write_table(index, model, entries, schemas, history_keys, list_values, columns)
+
+    def write_view(self, view: HDF5View) -> None:
+        """
+        Writes a copy of an HDF5 view, for example to serve an existing view as an Arrow view.
+
+        Parameters
+        ----------
+        view: HDF5View
+            The view to copy
+        """
+
+        index = list(view.get_index()["index"])
+        list_values = view.list_values()
+        history_keys = [column for column in list_values.columns if column not in {"name", "native"}]
+
+        entries = view.get_entries()
+        id_column = "molecule_id" if "molecule_id" in entries.columns else "molecule"
+        model = "MoleculeEntry" if id_column == "molecule_id" else "ReactionEntry"
+
+        # Only the molecules the entries refer to are copied, in the order they are referred to
+        mol_ids = list(pd.unique(entries[id_column]))
+        schemas = list(view.get_molecules(mol_ids, keep_serialized=True))
+        entries[id_column] = entries[id_column].map({mol_id: i for i, mol_id in enumerate(mol_ids)})
+
+        columns = {}
+        records = list_values.to_dict("records")
+        for row in records:
+            driver = row.get("driver")
+            query = {"name": row["name"], "native": row["native"], "driver": driver or "energy"}
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                df, units = view.get_values([query])
+            values = df.iloc[:, 0].reindex(index).apply(lambda x: x.ravel() if isinstance(x, np.ndarray) else x)
+            columns[(row["name"], row["native"])] = (values, driver, units[row["name"]])
+
+        self._write_table(index, model, entries, schemas, history_keys, records, columns)
+
+    def hash(self) -> str:
+        """Returns the Blake2b hash of the view"""
+        return _file_hash(self._path)
+
+    def _write_table(
+        self,
+        index: List[str],
+        model: str,
+        entries: pd.DataFrame,
+        schemas: List[bytes],
+        history_keys: List[str],
+        list_values: List[Dict[str, Any]],
+        columns: Dict[Tuple[str, bool], Tuple[pd.Series, Optional[str], str]],
+    ) -> None:
+        import pyarrow as pa
+
+        arrays = {"index:name": pa.array(index, type=pa.string())}
+        for field in entries.columns:
+            arrays[f"entry:{field}"] = pa.array(entries[field].to_numpy())
+        arrays["molecule:schema"] = pa.array(schemas, type=pa.binary())
+
+        column_metadata = {}
+        for (name, native), (values, driver, units) in columns.items():
+            values = list(values)
+            # Missing vector values are stored as empty lists, as they are in HDF5 views
+            scalar = driver in {"energy", None} and all(np.isscalar(x) for x in values)
+            if scalar:
+                array = pa.array(np.asarray(values, dtype=np.float64))
+            else:
+                rows = [np.ravel(x) if isinstance(x, np.ndarray) else np.array([], dtype=np.float64) for x in values]
+                array = pa.array(rows, type=pa.list_(pa.float64()))
+
+            key = self._column_key(name, native)
+            arrays[key] = array
+            column_metadata[key] = {"kind": "scalar" if scalar else "list", "units": units}
+
+        length = max([len(array) for array in arrays.values()] + [0])
+        for key, array in arrays.items():
+            if len(array) < length:
+                arrays[key] = pa.concat_arrays([array, pa.nulls(length - len(array), type=array.type)])
+
+        metadata = {
+            "lengths": {"index": len(index), "entry": len(entries), "molecule": len(schemas)},
+            "model": model,
+            "history_keys": history_keys,
+            "list_values": list_values,
+            "columns": column_metadata,
+        }
+        table = pa.table(arrays).replace_schema_metadata(
+            {self._metadata_key: serialize(metadata, "json").encode("utf-8")}
+        )
+
+        # The memory map must not outlive the file it maps
+        self.close()
+        with pa.OSFile(str(self._path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        self._entries = None
+        self._index = None
+
+    def _read_table(self) -> Tuple["pyarrow.Table", Dict[str, Any]]:
+        import pyarrow as pa
+
+        stat = os.stat(self._path)
+        file_stat = (stat.st_ino, stat.st_mtime_ns)
+        if self._table is None or file_stat != self._file_stat:
+            self.close()
+            self._entries = None
+            self._index = None
+            self._source = pa.memory_map(str(self._path), "r")
+            self._table = pa.ipc.open_file(self._source).read_all()
+            self._metadata = deserialize(self._table.schema.metadata[self._metadata_key].decode("utf-8"), "json")
+            self._file_stat = file_stat
+
+        return self._table, self._metadata
+
+    @staticmethod
+    def _column_key(name: str, native: bool) -> str:
+        return f"value:{'native' if native else 'contributed'}:{name}"
+
+    @staticmethod
+    def _take_indices(rows: Any) -> "pyarrow.Array":
+        import pyarrow as pa
+
+        return pa.array(np.asarray(rows, dtype=np.int64))
+
+    @staticmethod
+    def _split_lists(data: "pyarrow.ChunkedArray") -> List[np.ndarray]:
+        """Splits a list column into arrays which share the memory of the column"""
+        rows = []
+        for chunk in data.chunks:
+            values = chunk.flatten().to_numpy()
+            offsets = np.asarray(chunk.offsets) - chunk.offsets[0].as_py()
+            rows.extend(np.split(values, offsets[1:-1]))
+        return rows
+
+
+def download_view(
+    url: str,
+    path: Union[str, pathlib.Path],
+    n_connections: int = 4,
+    progress_bar: bool = True,
+    chunk_size: int = 1048576,
+) -> str:
+    """
+    Downloads a view, in parallel byte ranges if the server supports them.
+
+    The download is written next to ``path`` with a ".part" suffix, and the bytes received are recorded in a
+    ".part.json" file, so that an interrupted download resumes where it stopped. Gzipped views are decompressed, and
+    views are hashed, as the received bytes become contiguous, so that the view is not read again once downloaded.
+
+    Parameters
+    ----------
+    url: str
+        The URL of the view
+    path: Union[str, pathlib.Path]
+        Where to write the view
+    n_connections: int, optional
+        The number of byte ranges downloaded at the same time
+    progress_bar: bool, optional
+        Display a download progress bar
+    chunk_size: int, optional
+        The number of bytes read from a connection at a time
+
+    Returns
+    -------
+    str
+        The Blake2b hash of the (decompressed) view
+    """
+
+    return _ViewDownload(url, path, n_connections, progress_bar, chunk_size).run()
+
+
+class _ViewDownload:
+    """A single download of a view, see download_view"""
+
+    # Retries of a byte range after a dropped connection, each resumes from the last byte received
+    _retries = 3
+    _timeout = 60
+
+    def __init__(
+        self, url: str, path: Union[str, pathlib.Path], n_connections: int, progress_bar: bool, chunk_size: int
+    ) -> None:
+        self.url = url
+        self.path = pathlib.Path(path)
+        self.part_path = self.path.with_name(self.path.name + ".part")
+        self.state_path = self.path.with_name(self.path.name + ".part.json")
+        self.n_connections = max(1, n_connections)
+        self.chunk_size = chunk_size
+        self.progress_bar = progress_bar
+
+        # Byte ranges as [start, end, received], guarded by the condition
+        self.length: Optional[int] = None
+        self.ranges: List[List[int]] = []
+        self.condition = threading.Condition()
+        self.pbar = None
+
+        self._b2b = hashlib.blake2b()
+        self._gzipped: Optional[bool] = None
+        self._decompressor = None
+        self._out = None
+
+    def run(self) -> str:
+        probe = None
+        if not self._load_state():
+            headers = {"Accept-Encoding": "identity", "Range": "bytes=0-"}
+            probe = requests.get(self.url, stream=True, headers=headers, timeout=self._timeout)
+            probe.raise_for_status()
+            self._plan(probe)
+
+        if self.progress_bar:
+            try:
+                received = sum(r[2] for r in self.ranges)
+                self.pbar = tqdm(total=self.length, initial=received, unit="B", unit_scale=True)
+            except Exception:
+                warnings.warn("Failed to create download progress bar", RuntimeWarning)
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(self.ranges)) as executor:
+                futures = []
+                for i, byte_range in enumerate(self.ranges):
+                    if self._remaining(byte_range) != 0:
+                        futures.append(executor.submit(self._fetch, i, probe if i == 0 else None))
+                if probe is not None and self._remaining(self.ranges[0]) == 0:
+                    probe.close()
+
+                self._consume(futures)
+        finally:
+            if self.pbar is not None:
+                self.pbar.close()
+            if self._out is not None:
+                self._out.close()
+
+        if self._gzipped:
+            self.part_path.unlink()
+        else:
+            os.replace(self.part_path, self.path)
+        if self.state_path.exists():
+            self.state_path.unlink()
+
+        return self._b2b.hexdigest()
+
+    def _plan(self, probe: requests.Response) -> None:
+        """Splits the view into byte ranges if the server sent a range of it"""
+        content_range = probe.headers.get("Content-Range", "")
+        length = content_range.rsplit("/", 1)[-1]
+        if probe.status_code == 206 and content_range.startswith("bytes 0-") and length.isdigit() and int(length) > 0:
+            self.length = int(length)
+            size = -(-self.length // self.n_connections)
+            self.ranges = [[start, min(start + size, self.length), 0] for start in range(0, self.length, size)]
+            with open(self.part_path, "wb") as f:
+                f.truncate(self.length)
+            self._save_state()
+        else:
+            # The view is streamed in full, and can not be resumed
+            try:
+                self.length = int(probe.headers["Content-Length"])
+            except (KeyError, ValueError):
+                self.length = None
+            self.ranges = [[0, self.length, 0]]
+            open(self.part_path, "wb").close()
+            if self.state_path.exists():
+                self.state_path.unlink()
+
+    def _load_state(self) -> bool:
+        """Loads the byte ranges received by a previous download of the same view"""
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+            if state["url"] != self.url or os.path.getsize(self.part_path) != state["length"]:
+                return False
+        except (OSError, ValueError, KeyError):
+            return False
+
+        self.length = state["length"]
+        self.ranges = state["ranges"]
+        return True
+
+    def _save_state(self) -> None:
+        with open(self.state_path, "w") as f:
+            json.dump({"url": self.url, "length": self.length, "ranges": self.ranges}, f)
+
+    @staticmethod
+    def _remaining(byte_range: List[int]) -> Optional[int]:
+        start, end, received = byte_range
+        return None if end is None else end - start - received
+
+    def _fetch(self, i: int, response: Optional[requests.Response]) -> None:
+        """Downloads the rest of a byte range, retrying dropped connections"""
+        byte_range = self.ranges[i]
+        for attempt in range(self._retries + 1):
+            try:
+                if response is None:
+                    start = byte_range[0] + byte_range[2]
+                    headers = {"Accept-Encoding": "identity", "Range": f"bytes={start}-{byte_range[1] - 1}"}
+                    response = requests.get(self.url, stream=True, headers=headers, timeout=self._timeout)
+                    if response.status_code != 206:
+                        raise IOError(f"Server did not send the requested range of the view: {response.reason}")
+                self._write(byte_range, response)
+                return
+            except (requests.exceptions.RequestException, IOError):
+                if attempt == self._retries or byte_range[1] is None:
+                    raise
+            finally:
+                if response is not None:
+                    response.close()
+                response = None
+
+    def _write(self, byte_range: List[int], response: requests.Response) -> None:
+        with open(self.part_path, "r+b") as f:
+            f.seek(byte_range[0] + byte_range[2])
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                remaining = self._remaining(byte_range)
+                if remaining is not None:
+                    chunk = chunk[:remaining]
+                f.write(chunk)
+                f.flush()
+                with self.condition:
+                    byte_range[2] += len(chunk)
+                    if byte_range[1] is not None:
+                        self._save_state()
+                    self.condition.notify_all()
+                if self.pbar is not None:
+                    self.pbar.update(len(chunk))
+                if self._remaining(byte_range) == 0:
+                    break
+
+        if byte_range[1] is None:
+            with self.condition:
+                byte_range[1] = byte_range[0] + byte_range[2]
+                self.condition.notify_all()
+        elif self._remaining(byte_range) != 0:
+            raise IOError("Connection closed before the requested range of the view was received.")
+
+    def _frontier(self) -> Tuple[int, bool]:
+        """Returns the number of contiguous bytes received from the start of the view, and if all were received"""
+        position = 0
+        for start, end, received in self.ranges:
+            position = start + received
+            if end is None or position < end:
+                return position, False
+        return position, True
+
+    def _consume(self, futures: List[Any]) -> None:
+        """Hashes and decompresses the received bytes in order, while they are downloaded"""
+        consumed = 0
+        with open(self.part_path, "rb") as f:
+            while True:
+                with self.condition:
+                    frontier, done = self._frontier()
+                    # The first two bytes tell if the view is gzipped
+                    while (frontier == consumed or frontier < 2) and not done:
+                        failed = [future for future in futures if future.done() and future.exception()]
+                        if failed:
+                            raise failed[0].exception()
+                        self.condition.wait(timeout=0.5)
+                        frontier, done = self._frontier()
+
+                f.seek(consumed)
+                while consumed < frontier:
+                    data = f.read(min(self.chunk_size, frontier - consumed))
+                    consumed += len(data)
+                    self._update(data, last=done and consumed == frontier)
+                if done:
+                    break
+
+        for future in futures:
+            future.result()
+
+    def _update(self, data: bytes, last: bool) -> None:
+        if self._gzipped is None:
+            self._gzipped = data[:2] == b"\x1f\x8b"
+            if self._gzipped:
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                self._out = open(self.path, "wb")
+
+        if not self._gzipped:
+            self._b2b.update(data)
+            return
+
+        decompressed = self._decompressor.decompress(data)
+        # Concatenated gzip members are decompressed one after the other
+        while self._decompressor.eof and self._decompressor.unused_data:
+            unused = self._decompressor.unused_data
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            decompressed += self._decompressor.decompress(unused)
+        if last:
+            decompressed += self._decompressor.flush()
+
+        self._out.write(decompressed)
+        self._b2b.update(decompressed)
+
+
+def open_view(path: Union[str, pathlib.Path]) -> DatasetView:
+    """
+    Opens a view file as an ArrowView or HDF5View, depending on its format.
+
+    Parameters
+    ----------
+    path: Union[str, pathlib.Path]
+        File path of view
+
+    Returns
+    -------
+    DatasetView
+        The view
+    """
+    with open(path, "rb") as f:
+        magic = f.read(6)
+
+    if magic == b"ARROW1":
+        return ArrowView(path)
+    return HDF5View(path)
+
+
+def _file_hash(path: Union[str, pathlib.Path]) -> str:
+    """Returns the Blake2b hash of a file"""
+    b2b = hashlib.blake2b()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(8192), b""):
+            b2b.update(chunk)
+    return b2b.hexdigest()
+
+
 class RemoteView(DatasetView):
+    # Number of responses kept for revalidation
+    _response_cache_size = 32
+
     def __init__(self, client: "FractalClient", collection_id: int) -> None:
         """
 
@@ -493,17 +1313,19 @@ class RemoteView(DatasetView):
         self._client: FractalClient = client
         self._id: int = collection_id
 
+        # Responses by request, revalidated with the server by their ETag
+        self._responses: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+
     def get_entries(self, subset: Optional[List[str]] = None) -> pd.DataFrame:
-        # TODO: consider adding a cache
         payload = {"meta": {}, "data": {"subset": subset}}
 
-        response = self._client._automodel_request(f"collection/{self._id}/entry", "get", payload, full_return=True)
+        response = self._view_request("entry", payload)
         self._check_response_meta(response.meta)
         return self._deserialize(response.data, response.meta.msgpacked_cols)
 
     def get_molecules(self, indexes: List[Union[ObjectId, int]]) -> pd.Series:
         payload = {"meta": {}, "data": {"indexes": indexes}}
-        response = self._client._automodel_request(f"collection/{self._id}/molecule", "get", payload, full_return=True)
+        response = self._view_request("molecule", payload)
         self._check_response_meta(response.meta)
         df = self._deserialize(response.data, response.meta.msgpacked_cols)
         return df["molecule"].apply(lambda blob: Molecule(**blob, validate=False))
@@ -521,19 +1343,41 @@ class RemoteView(DatasetView):
         qlist = [{"name": query["name"], "driver": query["driver"], "native": query["native"]} for query in queries]
         payload = {"meta": {}, "data": {"queries": qlist, "subset": subset}}
 
-        response = self._client._automodel_request(f"collection/{self._id}/value", "get", payload, full_return=True)
+        response = self._view_request("value", payload)
         self._check_response_meta(response.meta)
         return self._deserialize(response.data.values, response.meta.msgpacked_cols), response.data.units
 
     def list_values(self) -> pd.DataFrame:
         payload: Dict[str, Dict[str, Any]] = {"meta": {}, "data": {}}
-        response = self._client._automodel_request(f"collection/{self._id}/list", "get", payload, full_return=True)
+        response = self._view_request("list", payload)
         self._check_response_meta(response.meta)
         return self._deserialize(response.data, response.meta.msgpacked_cols)
 
     def write(self, ds: Dataset) -> NoReturn:
         raise NotImplementedError()
 
+    def _view_request(self, request: str, payload: Dict[str, Any]) -> Any:
+        """Requests a view function, the server sends an empty response while a previous response is unchanged"""
+
+        key = (request, serialize(payload, "json"))
+        cached = self._responses.get(key)
+        etag = cached.meta.etag if cached is not None else None
+
+        response = self._client._automodel_request(
+            f"collection/{self._id}/{request}", "get", payload, full_return=True, etag=etag
+        )
+        if response is None:
+            self._responses.move_to_end(key)
+            return cached
+
+        if response.meta.success and response.meta.etag is not None:
+            self._responses[key] = response
+            self._responses.move_to_end(key)
+            while len(self._responses) > self._response_cache_size:
+                self._responses.popitem(last=False)
+
+        return response
+
     @staticmethod
     def _check_response_meta(meta: "CollectionSubresourceGETResponseMeta"):
         if not meta.success:
@@ -342,8 +342,8 @@ class ReactionDataset(Dataset):
             qname = query["name"]
             self._column_metadata[qname].update({"native": True, "units": units[qname]})
 
-        self._update_cache(new_data)
-        return self.df.loc[subset, names]
+        self._cache.update(new_data)
+        return self._cache.frame(subset, names)
 
     def visualize(
         self,
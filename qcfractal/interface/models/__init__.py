@@ -22,5 +22,5 @@ from .model_builder import build_procedure
 from .model_utils import hash_dictionary, json_encoders, prepare_basis
 from .records import OptimizationRecord, ResultRecord
 from .rest_models import ComputeResponse, rest_model
-from .task_models import ManagerStatusEnum, PythonComputeSpec, TaskRecord, TaskStatusEnum
+from .task_models import ManagerStatusEnum, PythonComputeSpec, TaskRecord, TaskResources, TaskStatusEnum
 from .torsiondrive import TorsionDriveInput, TorsionDriveRecord
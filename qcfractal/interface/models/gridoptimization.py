@@ -94,6 +94,21 @@ class GOKeywords(ProtoModel):
         description="If ``True``, first runs an unrestricted optimization before starting the grid computations. "
         "This is especially useful when combined with ``relative`` ``step_types``.",
     )
+    wavefront: bool = Field(
+        False,
+        description="If ``True``, each grid point seeds its uncomputed neighbors as soon as its optimization "
+        "completes rather than waiting for every optimization of the current layer to finish. Results are identical "
+        "to the layered algorithm whenever the order in which neighbors are seeded does not matter.",
+    )
+
+    def dict(self, *args, **kwargs):
+        ret = super().dict(*args, **kwargs)
+
+        # For hash compatibility
+        if ret.get("wavefront", None) is False:
+            ret.pop("wavefront")
+
+        return ret
 
 
 _gridopt_constr = constr(strip_whitespace=True, regex="gridoptimization")
@@ -12,7 +12,7 @@ from qcelemental.util import get_base_docs
 from .common_models import KeywordSet, Molecule, ObjectId, ProtoModel, KVStore
 from .gridoptimization import GridOptimizationInput
 from .records import ResultRecord
-from .task_models import PriorityEnum, TaskRecord
+from .task_models import PriorityEnum, TaskRecord, TaskResources
 from .torsiondrive import TorsionDriveInput
 
 __all__ = [
@@ -483,6 +483,11 @@ class CollectionSubresourceGETResponseMeta(ResponseMeta):
     """
 
     msgpacked_cols: List[str] = Field(..., description="Names of columns which were serialized to msgpack-ext.")
+    etag: Optional[str] = Field(
+        None,
+        description="Identifies the response for the view and request parameters. Sending it back in an "
+        "If-None-Match header returns an empty 304 response while the view is unchanged.",
+    )
 
 
 class CollectionEntryGETBody(ProtoModel):
@@ -796,6 +801,10 @@ class TaskQueuePOSTBody(ProtoModel):
             "If no Tag is specified, any Queue Manager can pull this Task.",
         )
         priority: Union[PriorityEnum, None] = Field(None, description=str(PriorityEnum.__doc__))
+        resources: Optional[TaskResources] = Field(
+            None,
+            description="The resources every Task is expected to need, estimated by the server if not given.",
+        )
 
         class Config(ProtoModel.Config):
             extra = "allow"
@@ -1021,6 +1030,12 @@ common_docs[QueueManagerMeta] = str(get_base_docs(QueueManagerMeta))
 class QueueManagerGETBody(ProtoModel):
     class Data(ProtoModel):
         limit: int = Field(..., description="Max number of Queue Managers to get from the server.")
+        wait: float = Field(
+            0,
+            description="The time (in seconds) the server may hold the request until tasks are available, bounded by "
+            "the server. The request is answered as soon as any tasks are found.",
+            ge=0,
+        )
 
     meta: QueueManagerMeta = Field(..., description=common_docs[QueueManagerMeta])
     data: Data = Field(
@@ -1030,8 +1045,21 @@ class QueueManagerGETBody(ProtoModel):
     )
 
 
+class QueueManagerGETResponseMeta(ResponseGETMeta):
+    """
+    Response metadata for Queue Managers fetching tasks, with hints on when to fetch again.
+    """
+
+    waiting: bool = Field(
+        False, description="Whether more waiting tasks remain for this Queue Manager beyond those returned."
+    )
+    backoff: Optional[float] = Field(
+        None, description="The time (in seconds) the server asks this Queue Manager to wait before fetching again."
+    )
+
+
 class QueueManagerGETResponse(ProtoModel):
-    meta: ResponseGETMeta = Field(..., description=common_docs[ResponseGETMeta])
+    meta: QueueManagerGETResponseMeta = Field(..., description=str(QueueManagerGETResponseMeta.__doc__))
     data: List[Dict[str, Optional[Any]]] = Field(
         ..., description="A list of tasks retrieved from the server to compute."
     )
@@ -1057,6 +1085,9 @@ class QueueManagerPUTBody(ProtoModel):
     class Data(ProtoModel):
         operation: str
         configuration: Optional[Dict[str, Any]] = None
+        task_ids: Optional[List[ObjectId]] = Field(
+            None, description="The ids of the tasks to hand back to the server for the 'return' operation."
+        )
 
     meta: QueueManagerMeta = Field(..., description=common_docs[QueueManagerMeta])
     data: Data = Field(
@@ -53,6 +53,15 @@ class PythonComputeSpec(ProtoModel):
     kwargs: Dict[str, Any] = Field(..., description="Dictionary of keyword arguments to pass into ``function``.")
 
 
+class TaskResources(ProtoModel):
+    """
+    The resources a Task is expected to need, used by Queue Managers which pack tasks of different sizes together.
+    """
+
+    ncores: Optional[int] = Field(None, description="The number of cores the Task is expected to use.", ge=1)
+    memory: Optional[float] = Field(None, description="The memory, in GiB, the Task is expected to use.", gt=0)
+
+
 class TaskRecord(ProtoModel):
 
     id: ObjectId = Field(None, description="The Database assigned Id of the Task, if it has been assigned yet.")
@@ -77,6 +86,11 @@ class TaskRecord(ProtoModel):
         description="The optional tag assigned to this Task. Tagged tasks can only be pulled by Queue Managers which "
         "explicitly reference this tag. If no Tag is specified, any Queue Manager can pull this Task.",
     )
+    resources: Optional[TaskResources] = Field(
+        None,
+        description="The resources this Task is expected to need. Estimated by the server from the molecule, method "
+        "and basis unless given on submission.",
+    )
     # Link back to the base Result
     base_result: ObjectId = Field(
         ..., description="Reference to the output Result from this Task as it exists within the database."
@@ -227,6 +227,14 @@ _base_gridopt = {
     [
         # Check same
         ({}, "fa2da83aae1651a9115f5eaea83043187c4c8c7b"),
+        (
+            {"keywords": {"preoptimization": False, "scans": [_scan_spec], "wavefront": False}},
+            "fa2da83aae1651a9115f5eaea83043187c4c8c7b",
+        ),
+        (
+            {"keywords": {"preoptimization": False, "scans": [_scan_spec], "wavefront": True}},
+            "11ae6463163a73f5411c1a4e6871b9141be943a7",
+        ),
         (
             {
                 "keywords": {
@@ -0,0 +1,175 @@
+"""
+A persistent, size-bounded cache of immutable server objects for the FractalClient.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from qcelemental.util import deserialize, serialize
+
+from .models import KeywordSet, Molecule, ResultRecord
+
+# Builds an object back from its cached dictionary, procedures are kept as the dictionaries the server returns
+_builders: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "molecule": lambda data: Molecule(**data, validate=False),
+    "keyword": lambda data: KeywordSet(**data),
+    "result": lambda data: ResultRecord(**data),
+    "procedure": lambda data: data,
+}
+
+# SQLite limits the number of bound parameters in a single statement
+_chunk_size = 500
+
+
+class RecordCache:
+    """
+    Stores Molecules, KeywordSets and COMPLETE records in a SQLite database so that they are only
+    pulled from a server once.
+
+    Molecules and KeywordSets never change after they are added, and records do not change once
+    they are COMPLETE, so an object is stored under the server address and its id and never
+    invalidated. When the database grows beyond ``max_size`` bytes the least recently used objects
+    are evicted. The database may be shared by several clients and processes.
+    """
+
+    def __init__(self, path: str, max_size: int = 2 ** 30):
+        """
+        Parameters
+        ----------
+        path : str
+            The directory holding the cache database, it is created if it does not exist.
+        max_size : int, optional
+            The maximum size of the cached objects in bytes.
+        """
+
+        self.path = os.path.expanduser(path)
+        os.makedirs(self.path, exist_ok=True)
+
+        self.filename = os.path.join(self.path, "records.sqlite")
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.filename, timeout=60, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS records (address TEXT, kind TEXT, id TEXT, data BLOB, size INTEGER, "
+            "accessed REAL, PRIMARY KEY (address, kind, id))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_records_accessed ON records (accessed)")
+
+    def __repr__(self) -> str:
+        return f"RecordCache(path='{self.path}', max_size={self.max_size})"
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def size(self) -> int:
+        """The total size of the cached objects in bytes."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM records").fetchone()[0]
+
+    def get(self, address: str, kind: str, ids: Iterable[str]) -> Dict[str, Any]:
+        """Returns the cached objects of the given kind with the given ids
+
+        Parameters
+        ----------
+        address : str
+            The address of the server the objects were pulled from.
+        kind : str
+            The kind of object: "molecule", "keyword", "result" or "procedure".
+        ids : Iterable[str]
+            The ids to look up.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The found objects by id, ids which are not cached are missing.
+        """
+
+        ids = list({str(x) for x in ids})
+        rows = []
+        with self._lock:
+            for start in range(0, len(ids), _chunk_size):
+                chunk = ids[start : start + _chunk_size]
+                params = [address, kind] + chunk
+                marks = ", ".join("?" * len(chunk))
+                rows.extend(
+                    self._conn.execute(
+                        f"SELECT id, data FROM records WHERE address = ? AND kind = ? AND id IN ({marks})", params
+                    ).fetchall()
+                )
+                self._conn.execute(
+                    f"UPDATE records SET accessed = ? WHERE address = ? AND kind = ? AND id IN ({marks})",
+                    [time.time()] + params,
+                )
+
+        builder = _builders[kind]
+        return {oid: builder(deserialize(data, "msgpack-ext")) for oid, data in rows}
+
+    def put(self, address: str, kind: str, objects: Dict[str, Any]) -> None:
+        """Stores objects of the given kind and evicts the least recently used objects if the cache is full
+
+        Parameters
+        ----------
+        address : str
+            The address of the server the objects were pulled from.
+        kind : str
+            The kind of object: "molecule", "keyword", "result" or "procedure".
+        objects : Dict[str, Any]
+            The models, or dictionaries for procedures, to store by id.
+        """
+
+        now = time.time()
+        rows = []
+        for oid, obj in objects.items():
+            data = serialize(obj, "msgpack-ext") if isinstance(obj, dict) else obj.serialize("msgpack-ext")
+            rows.append((address, kind, str(oid), data, len(data), now))
+
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self._evict()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self) -> None:
+        """Removes the least recently used objects until the cache fits in ``max_size``"""
+
+        excess = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM records").fetchone()[0] - self.max_size
+        if excess <= 0:
+            return
+
+        # Trim below the bound so that every insert into a full cache does not evict again
+        excess += self.max_size // 10
+
+        evict = []
+        for rowid, size in self._conn.execute("SELECT rowid, size FROM records ORDER BY accessed"):
+            evict.append((rowid,))
+            excess -= size
+            if excess <= 0:
+                break
+
+        self._conn.executemany("DELETE FROM records WHERE rowid = ?", evict)
+
+    def clear(self, address: Optional[str] = None) -> None:
+        """Removes all objects, or only the objects pulled from the given server address"""
+
+        with self._lock:
+            if address is None:
+                self._conn.execute("DELETE FROM records")
+            else:
+                self._conn.execute("DELETE FROM records WHERE address = ?", (address,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
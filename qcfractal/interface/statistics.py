@@ -1,5 +1,8 @@
 """A module for statistical quantities.
 """
+import warnings
+from typing import Any, Dict, List, Optional, Union
+
 import numpy as np
 import pandas as pd
 
@@ -22,6 +25,10 @@ def mean_unsigned_error(value, bench, **kwargs):
     return np.mean(np.abs(value - bench))
 
 
+def root_mean_square_error(value, bench, **kwargs):
+    return np.sqrt(np.mean((value - bench) ** 2))
+
+
 def unsigned_relative_error(value, bench, **kwargs):
     min_div = kwargs.get("floor", None)
     divisor = bench.copy()
@@ -43,21 +50,186 @@ _stats_dict["UE"] = unsigned_error
 _stats_dict["MUE"] = mean_unsigned_error
 _stats_dict["URE"] = unsigned_relative_error
 _stats_dict["MURE"] = mean_unsigned_relative_error
+_stats_dict["RMSE"] = root_mean_square_error
 
-_return_series = ["ME", "MUE", "MURE", "WMURE"]
+_return_series = ["ME", "MUE", "MURE", "WMURE", "RMSE"]
 
+# Mean statistics as the per-entry error they average and the transform applied to the mean
+_mean_stats = {"ME": ("E", None), "MUE": ("UE", None), "MURE": ("URE", None), "RMSE": ("SE", np.sqrt)}
 
-def wrap_statistics(description, ds, value, bench, **kwargs):
-    # Get benchmark
+
+def _error_matrix(description: str, value: np.ndarray, bench: np.ndarray, floor: Optional[float] = None) -> np.ndarray:
+    """The per-entry errors of an (entries x columns) array against an (entries,) benchmark"""
+
+    diff = value - bench[:, None]
+    if description == "E":
+        return diff
+    elif description == "UE":
+        return np.abs(diff)
+    elif description == "SE":
+        return diff ** 2
+    elif description == "URE":
+        divisor = bench.copy()
+        if floor:
+            divisor[np.abs(divisor) < floor] = np.abs(floor)
+        return np.abs(diff / divisor[:, None]) * 100
+    else:
+        raise KeyError(f"Statistic {description} can not be evaluated on arrays.")
+
+
+def _weighted_means(errors: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Means of the columns of errors for each row of entry weights, NaN errors are skipped"""
+
+    mask = ~np.isnan(errors)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (weights @ np.where(mask, errors, 0.0)) / (weights @ mask)
+
+
+def _as_array(value: pd.DataFrame) -> Optional[np.ndarray]:
+    """The values as a float array, or None if the columns hold arrays such as gradients"""
+    try:
+        return value.to_numpy(dtype=float)
+    except (TypeError, ValueError):
+        return None
+
+
+def batch_statistics(
+    description: str, value: pd.DataFrame, bench: pd.Series, **kwargs: Any
+) -> Union[pd.Series, pd.DataFrame]:
+    """Evaluates a statistic for all columns of a frame of scalar values at once
+
+    Parameters
+    ----------
+    description : str
+        The statistic, one of E, UE, URE, ME, MUE, MURE or RMSE
+    value : pd.DataFrame
+        The values as entries by columns
+    bench : pd.Series
+        The benchmark values of the entries
+    **kwargs
+        ``floor``, the smallest benchmark magnitude relative errors are divided by
+
+    Returns
+    -------
+    Union[pd.Series, pd.DataFrame]
+        The statistic by column for mean statistics, otherwise the errors as entries by columns
+    """
+
+    data = _as_array(value)
+    rbench = bench.reindex(value.index).to_numpy(dtype=float)
+    floor = kwargs.get("floor", None)
+
+    if description in _mean_stats:
+        error, transform = _mean_stats[description]
+        ret = _weighted_means(_error_matrix(error, data, rbench, floor), np.ones(len(rbench)))
+        if transform is not None:
+            ret = transform(ret)
+        return pd.Series(ret, index=value.columns)
+    else:
+        return pd.DataFrame(_error_matrix(description, data, rbench, floor), index=value.index, columns=value.columns)
+
+
+def statistics_table(
+    value: pd.DataFrame,
+    bench: pd.Series,
+    stypes: Union[str, List[str]] = ("ME", "MUE", "MURE"),
+    groups: Optional[Dict[str, List[str]]] = None,
+    bootstrap: int = 0,
+    confidence: float = 0.95,
+    seed: Optional[int] = None,
+    **kwargs: Any,
+) -> pd.DataFrame:
+    """Evaluates mean statistics for all columns of a frame of scalar values, optionally by group and
+    with bootstrapped confidence intervals
+
+    Parameters
+    ----------
+    value : pd.DataFrame
+        The values as entries by columns
+    bench : pd.Series
+        The benchmark values of the entries
+    stypes : Union[str, List[str]], optional
+        The statistics to evaluate, any of ME, MUE, MURE or RMSE
+    groups : Optional[Dict[str, List[str]]], optional
+        Subsets of the entries to evaluate the statistics over by group name, all entries if None
+    bootstrap : int, optional
+        The number of bootstrap resamples of the entries of each group used for confidence intervals, no
+        intervals are computed if 0
+    confidence : float, optional
+        The confidence level of the intervals
+    seed : Optional[int], optional
+        The seed of the bootstrap resampling
+    **kwargs
+        ``floor``, the smallest benchmark magnitude relative errors are divided by
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per group, column and statistic, with the columns group, column, statistic and value, and
+        lower and upper with bootstrap
+    """
+
+    if isinstance(stypes, str):
+        stypes = [stypes]
+    stypes = [x.upper() for x in stypes]
+    for stype in stypes:
+        if stype not in _mean_stats:
+            raise KeyError(f"Statistic {stype} is not a mean statistic, choose from {list(_mean_stats)}.")
+
+    data = _as_array(value)
+    if data is None:
+        raise TypeError("Statistics tables can only be built from scalar values.")
+    rbench = bench.reindex(value.index).to_numpy(dtype=float)
+
+    if groups is None:
+        groups = {"all": value.index}
+
+    rng = np.random.default_rng(seed)
+    quantiles = [50 * (1 - confidence), 50 * (1 + confidence)]
+
+    tables = []
+    for group, entries in groups.items():
+        rows = value.index.get_indexer(pd.Index(entries))
+        if (rows < 0).any():
+            raise KeyError(f"Group {group} contains entries which are not in the values.")
+
+        # Each bootstrap resample is a row of how often each entry was drawn
+        weights = np.ones((1, len(rows)))
+        if bootstrap:
+            draws = rng.multinomial(len(rows), np.full(len(rows), 1 / len(rows)), size=bootstrap)
+            weights = np.vstack([weights, draws])
+
+        for stype in stypes:
+            error, transform = _mean_stats[stype]
+            means = _weighted_means(_error_matrix(error, data[rows], rbench[rows], kwargs.get("floor")), weights)
+            if transform is not None:
+                means = transform(means)
+
+            table = {"group": group, "column": value.columns, "statistic": stype, "value": means[0]}
+            if bootstrap:
+                with warnings.catch_warnings():
+                    # Columns without values have no interval
+                    warnings.simplefilter("ignore", RuntimeWarning)
+                    table["lower"], table["upper"] = np.nanpercentile(means[1:], quantiles, axis=0)
+            tables.append(pd.DataFrame(table))
+
+    return pd.concat(tables, ignore_index=True)
+
+
+def _get_benchmark(ds, bench):
     if isinstance(bench, str):
-        rbench = ds.get_values(name=bench)[bench]
+        return ds.get_values(name=bench)[bench]
     elif isinstance(bench, (np.ndarray, pd.Series)):
         if len(bench.shape) != 1:
             raise ValueError("Only 1D numpy arrays can be passed to statistical quantities.")
-        rbench = bench
+        return bench
     else:
         raise TypeError("Benchmark must be a column of the dataframe or a 1D numpy array.")
 
+
+def wrap_statistics(description, ds, value, bench, **kwargs):
+    rbench = _get_benchmark(ds, bench)
+
     if isinstance(value, str):
         rvalue = ds.get_values(name=value)[value]
         return _stats_dict[description](rvalue, rbench, **kwargs)
@@ -66,19 +238,15 @@ def wrap_statistics(description, ds, value, bench, **kwargs):
         rvalue = value
         return _stats_dict[description](rvalue, rbench, **kwargs)
 
-    elif isinstance(value, pd.DataFrame):
-        return value.apply(lambda x: _stats_dict[description](x, rbench, **kwargs))
-
-    elif isinstance(value, (list, tuple)):
-        if description in _return_series:
-            ret = pd.Series(index=value)
-        else:
-            ret = pd.DataFrame(columns=value)
+    elif isinstance(value, (pd.DataFrame, list, tuple)):
+        if not isinstance(value, pd.DataFrame):
+            value = ds.get_values(name=list(value))
 
-        method = _stats_dict[description]
-        for col in value:
-            ret[col] = method(ds.get_values(name=col), rbench, **kwargs)
-        return ret
+        # Scalar columns are evaluated together, array values such as gradients one column at a time
+        scalar = (_as_array(value) is not None) and (_as_array(rbench.to_frame()) is not None)
+        if isinstance(rbench, pd.Series) and scalar:
+            return batch_statistics(description, value, rbench, **kwargs)
+        return value.apply(lambda x: _stats_dict[description](x, rbench, **kwargs))
 
     else:
         raise TypeError("Type {} is not understood for statistical quantities".format(str(type(value))))
@@ -241,3 +241,51 @@ def test_database_history():
     assert ds.list_records(program="P1").shape[0] == 4
     assert ds.list_records(basis="None").shape[0] == 3
     assert ds.list_records(keywords="None").shape[0] == 1
+
+
+def test_database_history_names(water_ds):
+    ds = portal.collections.Dataset("history_names", default_program="p1", default_keywords={"p1": "o1"})
+    history = [
+        ("energy", "p1", "b3lyp", "def2-svp", "o1"),
+        ("energy", "p2", "b3lyp", None, "o2"),
+        ("energy", "dftd3", "b3lyp-d3bj", None, None),
+        ("gradient", "p1", "hf", "sto-3g", None),
+    ]  # yapf: disable
+
+    for h in history:
+        ds._add_history(driver=h[0], program=h[1], method=h[2], basis=h[3], keywords=h[4])
+
+    for stoich in ["default", "cp", "cp1"]:
+        water_ds._add_history(
+            driver="energy", program="psi4", method="hf", basis="sto-3g", keywords=None, stoichiometry=stoich
+        )
+
+    for dataset in [ds, water_ds]:
+        records = dataset._list_records(dftd3=True)
+        names = [
+            dataset._canonical_name(
+                program=row["program"],
+                method=row["method"],
+                basis=row["basis"],
+                keywords=row["keywords"],
+                stoich=row.get("stoichiometry", None),
+                driver=row["driver"],
+            )
+            for row in records.to_dict("records")
+        ]
+        assert list(records["name"]) == names
+
+    assert set(ds.list_records(dftd3=True)["name"]) == {
+        "B3LYP/def2-svp",
+        "B3LYP-D3BJ/def2-svp",
+        "B3LYP-o2-P2",
+        "B3LYP-D3BJ-o2-P2",
+        "B3LYP-D3BJ-Dftd3",
+        "HF/sto-3g",
+    }
+
+    # Listings are built again once the history changes
+    assert ds.list_records().shape[0] == 5
+    ds._add_history(driver="energy", program="p1", method="mp2", basis=None, keywords=None)
+    assert ds.list_records().shape[0] == 6
+    assert "MP2" in set(ds.list_values().reset_index()["name"])
@@ -0,0 +1,60 @@
+"""
+Tests the statistics of dataset values
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from .. import statistics
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(0)
+    index = [f"entry{i}" for i in range(50)]
+
+    bench = pd.Series(rng.normal(size=50), index=index)
+    value = pd.DataFrame(rng.normal(size=(50, 4)), index=index, columns=["a", "b", "c", "d"])
+    value.iloc[::7, 1] = np.nan
+    value["d"] = np.nan
+
+    return value, bench
+
+
+@pytest.mark.parametrize("stype", ["E", "UE", "URE", "ME", "MUE", "MURE", "RMSE"])
+def test_batch_statistics(values, stype):
+    value, bench = values
+
+    ret = statistics.wrap_statistics(stype, None, value, bench, floor=0.5)
+    ref = value.apply(lambda x: statistics._stats_dict[stype](x, bench, floor=0.5))
+
+    pd.testing.assert_frame_equal(pd.DataFrame(ret), pd.DataFrame(ref), check_dtype=False)
+
+
+def test_statistics_table(values):
+    value, bench = values
+    groups = {"first": value.index[:20], "last": value.index[30:]}
+
+    table = statistics.statistics_table(value, bench, ["mue", "RMSE"], groups=groups, bootstrap=200, seed=1)
+    assert list(table.columns) == ["group", "column", "statistic", "value", "lower", "upper"]
+    assert table.shape[0] == 2 * 2 * 4
+
+    table = table.set_index(["group", "statistic", "column"])
+    for group, entries in groups.items():
+        mue = statistics.mean_unsigned_error(value.loc[entries, "b"], bench[entries])
+        assert table.loc[(group, "MUE", "b"), "value"] == pytest.approx(mue)
+
+        rmse = statistics.root_mean_square_error(value.loc[entries, "a"], bench[entries])
+        row = table.loc[(group, "RMSE", "a")]
+        assert row["value"] == pytest.approx(rmse)
+        assert row["lower"] < row["value"] < row["upper"]
+
+    # Columns without values have no statistics
+    assert table.xs("d", level="column").isnull().all().all()
+
+    with pytest.raises(KeyError):
+        statistics.statistics_table(value, bench, "UE")
+
+    with pytest.raises(KeyError):
+        statistics.statistics_table(value, bench, groups={"missing": ["entry1", "other"]})
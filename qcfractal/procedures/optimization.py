@@ -8,9 +8,17 @@ import qcelemental as qcel
 import qcengine as qcng
 
 from .base import BaseTasks
-from ..interface.models import Molecule, OptimizationRecord, QCSpecification, ResultRecord, TaskRecord, KeywordSet
+from ..interface.models import (
+    Molecule,
+    OptimizationRecord,
+    QCSpecification,
+    ResultRecord,
+    TaskRecord,
+    TaskResources,
+    KeywordSet,
+)
 from ..interface.models.task_models import PriorityEnum
-from .procedures_util import parse_single_tasks, form_qcinputspec_schema
+from .procedures_util import estimate_task_resources, parse_single_tasks, form_qcinputspec_schema
 
 
 class OptimizationTasks(BaseTasks):
@@ -80,9 +88,10 @@ class OptimizationTasks(BaseTasks):
         # We should only have gotten here if procedure is 'optimization'
         assert opt_spec.procedure.lower() == "optimization"
 
-        # Grab the tag and priority if available
+        # Grab the tag, priority and resources if available
         tag = opt_spec.tag
         priority = opt_spec.priority
+        resources = opt_spec.resources
 
         # Handle (optimization) keywords, which may be None
         # TODO: These are not stored in the keywords table (yet)
@@ -156,7 +165,12 @@ class OptimizationTasks(BaseTasks):
         new_opt_records = [o for o in all_opt_records if o.id not in existing_ids]
         new_molecules = [m for m, r in zip(valid_molecules, all_opt_records) if r.id not in existing_ids]
         self.create_tasks(
-            new_opt_records, new_molecules, [qc_keywords] * len(new_molecules), tag=tag, priority=priority
+            new_opt_records,
+            new_molecules,
+            [qc_keywords] * len(new_molecules),
+            tag=tag,
+            priority=priority,
+            resources=resources,
         )
 
         # Keep the returned result id list in the same order as the input molecule list
@@ -176,15 +190,16 @@ class OptimizationTasks(BaseTasks):
         qc_keywords: Optional[List[KeywordSet]] = None,
         tag: Optional[str] = None,
         priority: Optional[PriorityEnum] = None,
+        resources: Optional[TaskResources] = None,
     ):
 
         # Find the molecule keywords specified in the records
         rec_mol_ids = [x.initial_molecule for x in records]
 
-        # If not specified when calling this function, load them from the database
-        # TODO: there can be issues with duplicate molecules. So we have to go one by one
+        # If not specified when calling this function, load them from the database in a single query
         if molecules is None:
-            molecules = [self.storage.get_molecules(x)["data"][0] for x in rec_mol_ids]
+            found = self.storage.get_cached_molecules(rec_mol_ids)
+            molecules = [found[x] for x in rec_mol_ids]
 
         # Check id to make sure the molecules match the ids in the records
         mol_ids = [x.id for x in molecules]
@@ -218,6 +233,7 @@ class OptimizationTasks(BaseTasks):
                     "procedure": rec.program,
                     "tag": tag,
                     "priority": priority,
+                    "resources": resources or estimate_task_resources(mol, rec.qc_spec.method, rec.qc_spec.basis),
                     "base_result": rec.id,
                 }
             )
@@ -3,12 +3,26 @@ Utility functions for on-node procedures.
 """
 
 import json
+import math
 
 from typing import Optional, Dict, Any
 
 from qcelemental.models import ResultInput
 
-from ..interface.models import Molecule, QCSpecification
+from ..interface.models import Molecule, QCSpecification, TaskResources
+
+# Prefixes of the density-fitted and local variants of correlated methods
+_METHOD_VARIANT_PREFIXES = ("ri-", "df-", "lpno-", "dlpno-", "scs-", "sos-", "l")
+
+# Methods whose cost grows steeply past the mean-field ones
+_CORRELATED_METHODS = ("mp2", "mp3", "mp4", "omp2", "ccsd", "cc2", "cc3", "qcisd", "cisd", "fci", "casscf", "caspt2")
+
+# Methods without a basis, or this cheap, never use more than a single core
+_SINGLE_CORE_METHODS = ("uff", "mmff94", "mmff94s", "gaff", "gfn0-xtb", "gfn1-xtb", "gfn2-xtb", "am1", "pm3", "pm6", "pm7")
+
+# The most cores and memory (GiB) the estimate assigns to a single task
+_MAX_TASK_CORES = 16
+_MAX_TASK_MEMORY = 64.0
 
 
 def unpack_single_task_spec(storage, meta, molecules):
@@ -150,3 +164,51 @@ def form_qcinputspec_schema(qc_spec: QCSpecification, keywords: Optional["Keywor
         ret["keywords"] = {}
 
     return ret
+
+
+def estimate_task_resources(molecule: Molecule, method: str, basis: Optional[str]) -> TaskResources:
+    """
+    Estimates the cores and memory a task needs from the size of its molecule, its method and its basis.
+
+    This is a coarse heuristic used by Queue Managers to pack tasks of different sizes together, it does not
+    need to be accurate, only to order tasks by their relative cost.
+
+    Parameters
+    ----------
+    molecule : Molecule
+        The molecule the task computes
+    method : str
+        The computational method of the task
+    basis : Optional[str]
+        The basis of the task, None for methods without a basis
+
+    Returns
+    -------
+    TaskResources
+        The expected cores and memory of the task
+    """
+
+    method = method.lower()
+    if basis is None or method in _SINGLE_CORE_METHODS:
+        return TaskResources(ncores=1, memory=1.0)
+
+    stripped = method
+    for prefix in _METHOD_VARIANT_PREFIXES:
+        if stripped.startswith(prefix) and stripped[len(prefix) :].startswith(_CORRELATED_METHODS):
+            stripped = stripped[len(prefix) :]
+            break
+
+    # Cost units: heavy atoms, weighted by the size of the basis and the order of the method
+    size = sum(1 for symbol in molecule.symbols if symbol.upper() != "H")
+    basis = basis.lower()
+    if "qz" in basis or "5z" in basis:
+        size *= 4
+    elif "tz" in basis or basis.startswith("aug-"):
+        size *= 2
+    if stripped.startswith(_CORRELATED_METHODS):
+        size *= 4
+
+    ncores = min(_MAX_TASK_CORES, max(1, math.ceil(size / 8)))
+    memory = min(_MAX_TASK_MEMORY, 0.5 + 0.25 * size)
+
+    return TaskResources(ncores=ncores, memory=memory)
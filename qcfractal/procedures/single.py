@@ -8,8 +8,9 @@ import qcelemental as qcel
 import qcengine as qcng
 
 from .base import BaseTasks
-from ..interface.models import Molecule, ResultRecord, TaskRecord, KeywordSet
+from ..interface.models import Molecule, ResultRecord, TaskRecord, TaskResources, KeywordSet
 from ..interface.models.task_models import PriorityEnum
+from .procedures_util import estimate_task_resources
 
 _wfn_return_names = set(qcel.models.results.WavefunctionProperties._return_results_names)
 _wfn_all_fields = set(qcel.models.results.WavefunctionProperties.__fields__.keys())
@@ -61,10 +62,11 @@ class SingleResultTasks(BaseTasks):
         procedure = qc_spec_dict.pop("procedure")
         assert procedure.lower() == "single"
 
-        # Grab the tag and priority if available
+        # Grab the tag, priority and resources if available
         # These are not used in the ResultRecord, so we can pop them
         tag = qc_spec_dict.pop("tag")
         priority = qc_spec_dict.pop("priority")
+        resources = qc_spec_dict.pop("resources")
 
         # Handle keywords, which may be None
         if data.meta.keywords is not None:
@@ -119,7 +121,12 @@ class SingleResultTasks(BaseTasks):
         new_result_records = [r for r in all_result_records if r.id not in existing_ids]
         new_molecules = [m for m, r in zip(valid_molecules, all_result_records) if r.id not in existing_ids]
         self.create_tasks(
-            new_result_records, new_molecules, [keywords] * len(new_molecules), tag=tag, priority=priority
+            new_result_records,
+            new_molecules,
+            [keywords] * len(new_molecules),
+            tag=tag,
+            priority=priority,
+            resources=resources,
         )
 
         # Keep the returned result id list in the same order as the input molecule list
@@ -139,6 +146,7 @@ class SingleResultTasks(BaseTasks):
         keywords: Optional[List[KeywordSet]] = None,
         tag: Optional[str] = None,
         priority: Optional[PriorityEnum] = None,
+        resources: Optional[TaskResources] = None,
     ):
         """
         Creates TaskRecord objects based on a record and molecules/keywords
@@ -156,6 +164,13 @@ class SingleResultTasks(BaseTasks):
         keywords: Optional[KeywordSet]
             QC Keywords to use in the calculation. If given, must be the same length as records, and
             be in the same order. They must have been added to the database already and have an id.
+        tag: Optional[str]
+            The tag of the tasks
+        priority: Optional[PriorityEnum]
+            The priority of the tasks
+        resources: Optional[TaskResources]
+            The resources every task is expected to need. If not given, they are estimated for each task from its
+            molecule, method and basis.
 
         Returns
         -------
@@ -166,10 +181,10 @@ class SingleResultTasks(BaseTasks):
         # Find the molecule keywords specified in the records
         rec_mol_ids = [x.molecule for x in records]
 
-        # If not specified when calling this function, load them from the database
-        # TODO: there can be issues with duplicate molecules. So we have to go one by one
+        # If not specified when calling this function, load them from the database in a single query
         if molecules is None:
-            molecules = [self.storage.get_molecules(x)["data"][0] for x in rec_mol_ids]
+            found = self.storage.get_cached_molecules(rec_mol_ids)
+            molecules = [found[x] for x in rec_mol_ids]
 
         # Check id to make sure the molecules match the ids in the records
         mol_ids = [x.id for x in molecules]
@@ -204,6 +219,7 @@ class SingleResultTasks(BaseTasks):
                     "program": rec.program,
                     "tag": tag,
                     "priority": priority,
+                    "resources": resources or estimate_task_resources(mol, rec.method, rec.basis),
                     "base_result": rec.id,
                 }
             )
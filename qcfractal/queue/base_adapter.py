@@ -6,6 +6,7 @@ import abc
 import importlib
 import logging
 import operator
+from collections import deque
 from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 
 
@@ -63,6 +64,16 @@ class BaseAdapter(abc.ABC):
 
         self.queue = {}
         self.function_map = {}
+
+        # Keys of finished tasks, pushed from completion callbacks by adapters which support them
+        self._completed = deque()
+        self.completion_callback = None
+
+        # Time (in seconds) spent by workers on finished tasks and the part of it outside of the computation itself,
+        # the overhead of each task is kept until the manager collects it
+        self.total_task_time = 0.0
+        self.total_task_overhead = 0.0
+        self.task_overheads = {}
         self.cores_per_task = cores_per_task
         self.memory_per_task = memory_per_task
         self.nodes_per_task = nodes_per_task
@@ -137,7 +148,8 @@ class BaseAdapter(abc.ABC):
         Parameters
         ----------
         tasks : list of dict
-            Canonical Fractal task with {"spec: {"function", "args", "kwargs"}} fields.
+            Canonical Fractal task with {"spec: {"function", "args", "kwargs"}} fields. An optional "allocation"
+            field with "ncores" and "memory" overrides the per-task cores and memory of the adapter for that task.
 
         Returns
         -------
@@ -152,12 +164,13 @@ class BaseAdapter(abc.ABC):
             if self._task_exists(tag):
                 continue
 
-            # Trap QCEngine Memory and CPU
-            if task_spec["spec"]["function"].startswith("qcengine.compute") and self.qcengine_local_options:
+            # Trap QCEngine Memory and CPU, the manager may have packed this task with its own
+            local_options = {**self.qcengine_local_options, **task_spec.get("allocation", {})}
+            if task_spec["spec"]["function"].startswith("qcengine.compute") and local_options:
                 task_spec = task_spec.copy()  # Copy for safety
                 task_spec["spec"]["kwargs"] = {
                     **task_spec["spec"]["kwargs"],
-                    **{"local_options": self.qcengine_local_options},
+                    **{"local_options": local_options},
                 }
 
             queue_key, task = self._submit_task(task_spec)
@@ -178,6 +191,82 @@ class BaseAdapter(abc.ABC):
             The JSON structures of complete tasks
         """
 
+    def _notify_complete(self, key: Hashable, *args) -> None:
+        """
+        Completion callback for adapters whose tasks signal when they finish, may be called from any thread.
+
+        Parameters
+        ----------
+        key : Valid Dictionary Key
+            Identifier of the finished task in the queue
+        *args
+            Ignored, the result or future the callback was invoked with
+        """
+        self._completed.append(key)
+        if self.completion_callback is not None:
+            self.completion_callback(len(self._completed))
+
+    def record_task_time(self, key: Hashable, result: Any, worker_time: float) -> None:
+        """
+        Records the time a worker spent on a finished task, for adapters which measure it.
+
+        The overhead is the worker time beyond the wall time QCEngine reports for the computation, e.g. imports,
+        environment discovery and deserializing the task.
+
+        Parameters
+        ----------
+        key : Hashable
+            The identifier of the task
+        result : Any
+            The result of the task
+        worker_time : float
+            The time (in seconds) the worker spent on the task
+        """
+        self.total_task_time += worker_time
+
+        wall_time = getattr(getattr(result, "provenance", None), "wall_time", None)
+        if wall_time is not None:
+            overhead = max(0.0, worker_time - float(wall_time))
+            self.total_task_overhead += overhead
+            self.task_overheads[key] = overhead
+
+    def _record_timed_results(self, results: Dict[Hashable, Any]) -> Dict[Hashable, Any]:
+        """
+        Unpacks results returned along with their worker time and records the time.
+        Results which failed outside of the worker carry no time and are returned as they are.
+        """
+        ret = {}
+        for key, result in results.items():
+            if isinstance(result, tuple):
+                result, worker_time = result
+                self.record_task_time(key, result, worker_time)
+            ret[key] = result
+
+        return ret
+
+    def _acquire_notified(self, get_result: Callable[[Any], Any]) -> Dict[str, Any]:
+        """
+        Pulls only the tasks which notified their completion out of the task queue.
+
+        Parameters
+        ----------
+        get_result : Callable[[Any], Any]
+            Obtains the result from a finished task object
+
+        Returns
+        -------
+        dict
+            The complete tasks keyed by their identifier
+        """
+        ret = {}
+        while self._completed:
+            key = self._completed.popleft()
+            task = self.queue.pop(key, None)
+            if task is not None:
+                ret[key] = get_result(task)
+
+        return ret
+
     @abc.abstractmethod
     def await_results(self) -> bool:
         """Waits for all tasks to complete before returning.
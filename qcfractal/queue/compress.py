@@ -2,9 +2,12 @@
 Helpers for compressing data to send back to the server
 """
 
-from typing import Union, Optional, Dict
+from typing import Any, Union, Optional, Dict, List
+
+import msgpack
 from ..interface.models import KVStore, CompressionEnum
 from qcelemental.models import AtomicResult, OptimizationResult
+from qcelemental.util import msgpackext_dumps
 
 
 def _compress_common(
@@ -78,3 +81,55 @@ def compress_results(
             ret[k] = result
 
     return ret
+
+
+def serialize_results(results: Dict[str, Any]) -> Dict[str, bytes]:
+    """
+    Serializes each result to msgpack on its own
+
+    The bytes are used as they are to size, journal and post the results, so each result is serialized only once.
+    """
+
+    return {k: msgpackext_dumps(v.dict() if hasattr(v, "dict") else v) for k, v in results.items()}
+
+
+def batch_results(results: Dict[str, bytes], max_count: int, max_bytes: int) -> List[Dict[str, bytes]]:
+    """
+    Splits serialized results into batches to send back to the server
+
+    Each batch holds at most max_count results and at most max_bytes of serialized (msgpack) results.
+    A single result larger than max_bytes is sent in a batch of its own.
+    """
+
+    batches = []
+    batch = {}
+    batch_bytes = 0
+    for k, data in results.items():
+        nbytes = len(data)
+
+        if batch and (len(batch) >= max_count or batch_bytes + nbytes > max_bytes):
+            batches.append(batch)
+            batch = {}
+            batch_bytes = 0
+
+        batch[k] = data
+        batch_bytes += nbytes
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+def pack_results(results: Dict[str, bytes]) -> bytes:
+    """
+    Joins serialized results into a single msgpack map keyed by task id, without serializing them again
+    """
+
+    parts = [msgpack.Packer().pack_map_header(len(results))]
+    for k, data in results.items():
+        parts.append(msgpackext_dumps(k))
+        parts.append(data)
+
+    return b"".join(parts)
+
@@ -2,10 +2,16 @@
 Queue adapter for Dask
 """
 
+import importlib
+import operator
+import time
 import traceback
-from typing import Any, Dict, Hashable, Tuple
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, List, Tuple, Union
 
+import numpy as np
 from qcelemental.models import FailedOperation
+from qcelemental.util import msgpackext_dumps, msgpackext_loads
 
 from .base_adapter import BaseAdapter
 
@@ -19,6 +25,73 @@ def _get_result(result):
         return ret
 
 
+# Functions resolved by this worker process, so each is only imported once
+_worker_functions = {}
+
+# Types which survive a msgpack round trip unchanged
+_PLAIN_TYPES = (str, int, float, bool, type(None), bytes, np.ndarray)
+
+
+def _initialize_warm_worker(programs: List[str]) -> None:
+    """
+    Imports QCEngine and the program harnesses once when a worker process starts, rather than on its first task.
+
+    Nothing is raised, a worker which cannot be warmed up pays the start-up cost on its first task instead.
+    """
+    try:
+        import qcengine as qcng
+    except ImportError:
+        return
+
+    try:
+        qcng.get_config()
+    except Exception:
+        pass
+
+    for program in programs:
+        try:
+            qcng.get_program(program).get_version()
+        except Exception:
+            pass
+
+
+def _is_plain(obj: Any) -> bool:
+    if isinstance(obj, dict):
+        return all(isinstance(k, str) and _is_plain(v) for k, v in obj.items())
+    if isinstance(obj, list):
+        return all(_is_plain(v) for v in obj)
+    return isinstance(obj, _PLAIN_TYPES)
+
+
+def _encode_task(function: str, args: List[Any], kwargs: Dict[str, Any]) -> Union[bytes, Tuple[str, List, Dict]]:
+    """
+    Packs a task for a worker. Tasks holding only plain data, as tasks from the server do, are sent as msgpack
+    bytes, anything else is handed over as is.
+    """
+    if _is_plain(args) and _is_plain(kwargs):
+        return msgpackext_dumps({"function": function, "args": args, "kwargs": kwargs})
+
+    return function, args, kwargs
+
+
+def _run_task(task: Union[bytes, Tuple[str, List, Dict]]) -> Tuple[Any, float]:
+    """Runs a task packed by _encode_task in the worker and returns its result along with the time spent on it"""
+    start = time.perf_counter()
+
+    if isinstance(task, bytes):
+        task = msgpackext_loads(task)
+        function, args, kwargs = task["function"], task["args"], task["kwargs"]
+    else:
+        function, args, kwargs = task
+
+    if function not in _worker_functions:
+        module_name, func_name = function.split(".", 1)
+        _worker_functions[function] = operator.attrgetter(func_name)(importlib.import_module(module_name))
+
+    result = _worker_functions[function](*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
 def _get_future(future):
     try:
         return future.result()
@@ -38,25 +111,21 @@ class ExecutorAdapter(BaseAdapter):
         )
 
     def _submit_task(self, task_spec: Dict[str, Any]) -> Tuple[Hashable, Any]:
-        func = self.get_function(task_spec["spec"]["function"])
-        task = self.client.apply_async(func, task_spec["spec"]["args"], task_spec["spec"]["kwargs"])
+        spec = task_spec["spec"]
+        notify = partial(self._notify_complete, task_spec["id"])
+        task = self.client.apply_async(
+            _run_task,
+            (_encode_task(spec["function"], spec["args"], spec["kwargs"]),),
+            callback=notify,
+            error_callback=notify,
+        )
         return task_spec["id"], task
 
     def count_active_task_slots(self) -> int:
         return len(self.client._pool)
 
     def acquire_complete(self) -> Dict[str, Any]:
-        ret = {}
-        del_keys = []
-        for key, result in self.queue.items():
-            if result.ready():
-                ret[key] = _get_result(result)
-                del_keys.append(key)
-
-        for key in del_keys:
-            del self.queue[key]
-
-        return ret
+        return self._record_timed_results(self._acquire_notified(_get_result))
 
     def await_results(self) -> bool:
         for result in self.queue.values():
@@ -78,12 +147,13 @@ class DaskAdapter(BaseAdapter):
         return "<DaskAdapter client={}>".format(self.client)
 
     def _submit_task(self, task_spec: Dict[str, Any]) -> Tuple[Hashable, Any]:
-        func = self.get_function(task_spec["spec"]["function"])
+        spec = task_spec["spec"]
 
         # Watch out out for thread unsafe tasks and our own constraints
         task = self.client.submit(
-            func, *task_spec["spec"]["args"], **task_spec["spec"]["kwargs"], resources={"process": 1}
+            _run_task, _encode_task(spec["function"], spec["args"], spec["kwargs"]), resources={"process": 1}
         )
+        task.add_done_callback(partial(self._notify_complete, task_spec["id"]))
         return task_spec["id"], task
 
     def count_active_task_slots(self) -> int:
@@ -95,17 +165,7 @@ class DaskAdapter(BaseAdapter):
             return len(self.client.cluster.scheduler.workers)
 
     def acquire_complete(self) -> Dict[str, Any]:
-        ret = {}
-        del_keys = []
-        for key, future in self.queue.items():
-            if future.done():
-                ret[key] = _get_future(future)
-                del_keys.append(key)
-
-        for key in del_keys:
-            del self.queue[key]
-
-        return ret
+        return self._record_timed_results(self._acquire_notified(_get_future))
 
     def await_results(self) -> bool:
         from dask.distributed import wait
@@ -3,6 +3,8 @@ Queue backend abstraction manager.
 """
 
 import collections
+import datetime
+import time
 import traceback
 
 import tornado.web
@@ -302,8 +304,14 @@ class QueueManagerHandler(APIHandler):
         storage_socket.queue_mark_error(error_data)
         return len(completed), len(error_data)
 
-    def get(self):
-        """Pulls new tasks from the task queue"""
+    async def get(self):
+        """
+        Pulls new tasks from the task queue.
+
+        If the manager asks to wait, a request finding no tasks is held without blocking the server until tasks
+        are submitted or reset to waiting, and only then looks for tasks again. A held request is answered without
+        tasks once the manager shuts down.
+        """
 
         body_model, response_model = rest_model("queue_manager", "get")
         body = self.parse_bodymodel(body_model)
@@ -311,10 +319,41 @@ class QueueManagerHandler(APIHandler):
         # Figure out metadata and kwargs
         name = self._get_name_from_metadata(body.meta)
 
+        condition = self.objects.get("task_condition")
+        wait = min(body.data.wait, self.objects.get("manager_long_poll_limit", 0))
+        deadline = time.monotonic() + wait
+
         # Grab new tasks and write out
-        new_tasks = self.storage.queue_get_next(
-            name, body.meta.programs, body.meta.procedures, limit=body.data.limit, tag=body.meta.tag
+        while True:
+            new_tasks = self.storage.queue_get_next(
+                name,
+                body.meta.programs,
+                body.meta.procedures,
+                limit=body.data.limit,
+                tag=body.meta.tag,
+                effective_priority=self.objects.get("effective_task_priority", False),
+            )
+
+            remaining = deadline - time.monotonic()
+            if new_tasks or condition is None or remaining <= 0:
+                break
+
+            # Times out by returning False, any submission wakes all waiting managers to look again
+            if not await condition.wait(timeout=datetime.timedelta(seconds=remaining)):
+                break
+
+            # The manager shut down while its request was held, tasks handed out now would never be run
+            if self.storage.get_managers(name=name, status="ACTIVE")["meta"]["n_found"] == 0:
+                break
+
+        # Only managers which took all they asked for may have work left, idle managers are asked to back off
+        waiting = len(new_tasks) == body.data.limit and self.storage.queue_has_waiting(
+            body.meta.programs, body.meta.procedures, tag=body.meta.tag
         )
+        backoff = None
+        if len(new_tasks) == 0 and self.objects.get("manager_idle_backoff"):
+            backoff = self.objects["manager_idle_backoff"]
+
         response = response_model(
             **{
                 "meta": {
@@ -323,6 +362,8 @@ class QueueManagerHandler(APIHandler):
                     "errors": [],
                     "error_description": "",
                     "missing": [],
+                    "waiting": waiting,
+                    "backoff": backoff,
                 },
                 "data": new_tasks,
             }
@@ -340,7 +381,9 @@ class QueueManagerHandler(APIHandler):
         body_model, response_model = rest_model("queue_manager", "post")
         body = self.parse_bodymodel(body_model)
 
+        start = time.time()
         success, error = self.insert_complete_tasks(self.storage, body, self.logger)
+        ingest_time = time.time() - start
 
         completed = success + error
 
@@ -358,7 +401,7 @@ class QueueManagerHandler(APIHandler):
             }
         )
         self.write(response)
-        self.logger.info("QueueManager: Inserted {} complete tasks.".format(len(body.data)))
+        self.logger.info("QueueManager: Inserted {} complete tasks in {:.3f}s.".format(len(body.data), ingest_time))
 
         # Update manager logs
         name = self._get_name_from_metadata(body.meta)
@@ -386,6 +429,11 @@ class QueueManagerHandler(APIHandler):
             nshutdown = self.storage.queue_reset_status(manager=name, reset_running=True)
             self.storage.manager_update(name, returned=nshutdown, status="INACTIVE", **body.meta.dict(), log=True)
 
+            # Answer a check for new tasks the manager may still have held
+            condition = self.objects.get("task_condition")
+            if condition is not None:
+                condition.notify_all()
+
             self.logger.info(
                 "QueueManager: Shutdown of manager {} detected, recycling {} incomplete tasks.".format(name, nshutdown)
             )
@@ -396,6 +444,17 @@ class QueueManagerHandler(APIHandler):
             self.storage.manager_update(name, status="ACTIVE", **body.meta.dict(), log=True)
             self.logger.debug("QueueManager: Heartbeat of manager {} detected.".format(name))
 
+        elif op == "return":
+            if not body.data.task_ids:
+                raise tornado.web.HTTPError(status_code=400, reason="Operation 'return' requires task_ids.")
+
+            nreturned = self.storage.queue_reset_status(id=body.data.task_ids, manager=name, reset_running=True)
+            self.storage.manager_update(name, returned=nreturned)
+
+            self.logger.info("QueueManager: Manager {} returned {} unstarted tasks.".format(name, nreturned))
+
+            ret = {"nreturned": nreturned}
+
         else:
             msg = "Operation '{}' not understood.".format(op)
             raise tornado.web.HTTPError(status_code=400, reason=msg)
@@ -4,20 +4,27 @@ Queue backend abstraction manager.
 
 import json
 import logging
-import sched
+import math
+import os
 import socket
+import tempfile
+import threading
 import time
 import uuid
-from typing import Any, Callable, Dict, List, Optional, Union
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from pydantic import BaseModel, validator
 
 import qcengine as qcng
+from qcelemental.util import msgpackext_loads
 from qcfractal.extras import get_information
 
 from ..interface.data import get_molecule
 from .adapters import build_queue_adapter
-from .compress import compress_results
+from .compress import batch_results, compress_results, pack_results, serialize_results
+from .metrics import ManagerMetrics, MetricsServer
+from .outbox import ResultOutbox
 
 __all__ = ["QueueManager"]
 
@@ -33,12 +40,19 @@ class QueueStatistics(BaseModel):
     total_worker_walltime: float = 0.0
     total_task_walltime: float = 0.0
     maximum_possible_walltime: float = 0.0  # maximum_workers * time_delta, experimental
+    total_task_overhead: float = 0.0  # Worker time outside of the computations themselves, adapter dependent
+    maximum_task_overhead: float = 0.0  # In seconds
+    timed_tasks: int = 0
     active_task_slots: int = 0
+    allocated_cores: int = 0  # Cores of the running tasks, only when tasks are packed by their resources
+    allocated_memory: float = 0.0
+    completion_rate: float = 0.0  # Tasks per second, exponentially smoothed over updates
 
     # Static Quantities
     max_concurrent_tasks: int = 0
     cores_per_task: int = 0
     memory_per_task: float = 0.0
+    total_cores: int = 0  # The core budget tasks are packed onto, 0 for uniform task slots
     last_update_time: float = None
 
     def __init__(self, **kwargs):
@@ -53,14 +67,24 @@ class QueueStatistics(BaseModel):
     @property
     def theoretical_max_consumption(self) -> float:
         """In Core Hours"""
-        return self.max_concurrent_tasks * self.cores_per_task * (time.time() - self.last_update_time) / 3600
+        return self.max_concurrent_cores * (time.time() - self.last_update_time) / 3600
+
+    @property
+    def max_concurrent_cores(self) -> int:
+        if self.total_cores:
+            return self.total_cores
+        return self.max_concurrent_tasks * self.cores_per_task
 
     @property
     def active_cores(self) -> int:
+        if self.total_cores:
+            return self.allocated_cores
         return self.active_task_slots * self.cores_per_task
 
     @property
     def active_memory(self) -> float:
+        if self.total_cores:
+            return self.allocated_memory
         return self.active_task_slots * self.memory_per_task
 
     @validator("cores_per_task", pre=True)
@@ -106,6 +130,19 @@ class QueueManager:
         scratch_directory: Optional[str] = None,
         retries: Optional[int] = 2,
         configuration: Optional[Dict[str, Any]] = None,
+        prefetch_limit: int = 0,
+        prefetch_lease: float = 600,
+        upload_queue_size: int = 10,
+        outbox_path: Optional[str] = None,
+        upload_batch_size: int = 100,
+        upload_batch_bytes: int = 32 * 1048576,
+        harvest_threshold: int = 0,
+        total_cores: Optional[int] = None,
+        total_memory: Optional[float] = None,
+        min_update_frequency: Optional[float] = None,
+        max_update_frequency: Optional[float] = None,
+        long_poll: float = 0,
+        metrics_port: Optional[int] = None,
     ):
         """
         Parameters
@@ -123,7 +160,9 @@ class QueueManager:
         manager_name : str, optional
             The cluster the manager belongs to
         update_frequency : Union[int, float], optional
-            The frequency to check for new tasks in seconds
+            The frequency to check for new tasks in seconds. The interval between checks adapts between
+            ``min_update_frequency`` and ``max_update_frequency`` if they are given, and is never shorter than a
+            backoff requested by the server.
         verbose : bool, optional
             Whether or not to have the manager be verbose (logger level debug and up)
         server_error_retries : Optional[int], optional
@@ -155,6 +194,51 @@ class QueueManager:
             error will be raised.
         configuration : Optional[Dict[str, Any]], optional
             A JSON description of the settings used to create this object for the database.
+        prefetch_limit : int, optional
+            The maximum number of tasks to acquire ahead of demand and hold locally. Held tasks are handed to
+            the adapter as soon as its slots free up. The number of held tasks follows the observed task
+            completion rate over one ``update_frequency``, up to this limit. Set to 0 to disable prefetching.
+        prefetch_lease : float, optional
+            The time (in seconds) a prefetched task may be held locally before it is returned to the server.
+        upload_queue_size : int, optional
+            The maximum number of harvested result batches in the outbox waiting to be posted to the server. Once
+            full, complete tasks are left in the adapter until the upload catches up.
+        outbox_path : Optional[str], optional
+            The location of the on-disk journal holding complete results from their harvest until the server
+            acknowledges them. Results left behind by a previous manager using the same journal, including those it
+            gave up on as stale, are posted on the next update.
+            None indicates "a temporary journal removed when the manager exits"
+        upload_batch_size : int, optional
+            The maximum number of complete tasks posted to the server in a single request
+        upload_batch_bytes : int, optional
+            The maximum size, in bytes, of the serialized complete tasks posted to the server in a single request.
+            A single task larger than this is posted on its own.
+        harvest_threshold : int, optional
+            The number of complete tasks which wake the harvest loop of `start` before its next scheduled pass.
+            Only adapters which signal task completion support this. Set to 0 to disable.
+        total_cores : Optional[int], optional
+            The number of cores tasks are packed onto by the resources they are expected to need, each task is
+            given its own cores and memory in place of ``cores_per_task`` and ``memory_per_task``, which remain the
+            default of tasks without expected resources. ``max_tasks`` still caps the number of running tasks.
+            None indicates "uniform task slots of ``cores_per_task``"
+        total_memory : Optional[float], optional
+            The memory, in GiB, tasks are packed onto together with ``total_cores``.
+            None indicates "pack by cores only"
+        min_update_frequency : Optional[float], optional
+            The shortest interval, in seconds, between checks for new tasks. The interval drops to this while the
+            server reports more waiting tasks than were acquired, so that freed slots are refilled quickly.
+            None indicates "never shorter than ``update_frequency``"
+        max_update_frequency : Optional[float], optional
+            The longest interval, in seconds, between checks for new tasks. The interval doubles up to this every
+            time the server has no tasks for this manager.
+            None indicates "never longer than ``update_frequency``"
+        long_poll : float, optional
+            The time (in seconds) the server may hold a check for new tasks which finds none, answering as soon as
+            tasks are submitted. The server bounds this time. Set to 0 to have checks answered immediately.
+        metrics_port : Optional[int], optional
+            The port on which the statistics, queue depths and stage latencies of the manager are served at
+            ``/metrics`` in the Prometheus text format, 0 picks a free port.
+            None indicates "do not serve metrics"
         """
 
         # Setup logging
@@ -193,11 +277,18 @@ class QueueManager:
             max_concurrent_tasks=self.max_tasks,
             cores_per_task=(cores_per_task or 0),
             memory_per_task=(memory_per_task or 0),
+            total_cores=(total_cores or 0),
             update_frequency=update_frequency,
         )
 
-        self.scheduler = None
         self.update_frequency = update_frequency
+        self.harvest_frequency = min(1.0, update_frequency)
+
+        # The interval between checks for new tasks follows the work available on the server
+        self.min_update_frequency = min(update_frequency, min_update_frequency or update_frequency)
+        self.max_update_frequency = max(update_frequency, max_update_frequency or update_frequency)
+        self.update_interval = update_frequency
+        self.long_poll = long_poll
         self.periodic = {}
         self.active = 0
         self.exit_callbacks = []
@@ -205,10 +296,60 @@ class QueueManager:
         # Server response/stale job handling
         self.server_error_retries = server_error_retries
         self.stale_update_limit = stale_update_limit
-        self._stale_updates_tracked = 0
-        self._stale_payload_tracking = []
         self.n_stale_jobs = 0
 
+        # Results are journaled on disk until the server acknowledges them
+        if outbox_path is None:
+            self._outbox_directory = tempfile.TemporaryDirectory(prefix="qcfractal_outbox_")
+            outbox_path = os.path.join(self._outbox_directory.name, "outbox.sqlite")
+        self.outbox = ResultOutbox(outbox_path)
+        n_revived = self.outbox.revive()
+        self.upload_queue_size = upload_queue_size
+        self.upload_batch_size = upload_batch_size
+        self.upload_batch_bytes = upload_batch_bytes
+
+        # Tasks acquired but not yet handed to the adapter as (acquisition time, task)
+        self.prefetch_limit = prefetch_limit
+        self.prefetch_lease = prefetch_lease
+        self._prefetch_buffer = deque()
+        self._buffer_lock = threading.Lock()
+
+        # Tasks packed onto the core and memory budget, as task id: (cores, memory, start time), guarded by the
+        # buffer lock
+        self.total_cores = total_cores
+        self.total_memory = total_memory
+        self._allocations = {}
+        # Core seconds of packed tasks harvested since the last statistics update
+        self._released_core_seconds = 0.0
+        # Cores of harvested packed tasks until their results are processed
+        self._task_cores = {}
+
+        # Harvested tasks, these drive the completion rate
+        self._n_harvested = 0
+        self._last_harvested = 0
+
+        # Stage latencies, from the time each task was last acquired or submitted and each batch was journaled
+        self.metrics = ManagerMetrics()
+        self._task_times = {}
+        self._task_programs = {}
+        self._journal_times = {}
+        self.metrics_server = None
+
+        # The status of the results of each journaled batch, logged and counted once the batch is posted
+        self._result_summaries = {}
+        if metrics_port is not None:
+            self.metrics_server = MetricsServer(self.render_metrics, metrics_port)
+
+        # Loops of start, each stage runs in its own thread
+        self._loop_threads = {}
+        self._loop_error = None
+        self._stop_event = threading.Event()
+        self._submit_event = threading.Event()
+
+        self.harvest_threshold = harvest_threshold
+        if self.harvest_threshold > 0:
+            self.queue_adapter.completion_callback = self._on_complete
+
         # QCEngine data
         self.available_programs = qcng.list_available_programs()
         self.available_procedures = qcng.list_available_procedures()
@@ -235,12 +376,21 @@ class QueueManager:
         self.logger.info("    Queue Adapter:")
         self.logger.info("        {}\n".format(self.queue_adapter))
 
+        if len(self.outbox):
+            self.logger.info(
+                "    Outbox {} holds {} tasks ({} stale) from a previous manager, posting them on the next "
+                "update.\n".format(self.outbox.path, self.outbox.count_tasks(), n_revived)
+            )
+
         if self.verbose:
             self.logger.info("    QCEngine:")
             self.logger.info("        Version:        {}".format(qcng.__version__))
             self.logger.info("        Task Cores:     {}".format(self.cores_per_task))
             self.logger.info("        Task Mem:       {}".format(self.memory_per_task))
             self.logger.info("        Task Nodes:     {}".format(self.nodes_per_task))
+            if self.total_cores is not None:
+                self.logger.info("        Packed Cores:   {}".format(self.total_cores))
+                self.logger.info("        Packed Mem:     {}".format(self.total_memory))
             self.logger.info("        Cores per Rank: {}".format(self.cores_per_rank))
             self.logger.info("        Scratch Dir:    {}".format(self.scratch_directory))
             self.logger.info("        Programs:       {}".format(self.available_programs))
@@ -329,27 +479,94 @@ class QueueManager:
     def start(self) -> None:
         """
         Starts up all IOLoops and processes.
+
+        Harvesting of complete tasks, upload of results, acquisition of new tasks and the heartbeat each run in
+        their own thread, so that a slow upload never delays acquisition or the heartbeat.
+
+        All loops share the FractalClient. This is safe as the client keeps no connection state between requests:
+        every request goes through a one-off `requests` call with its own session and connection.
         """
 
         self.assert_connected()
 
-        self.scheduler = sched.scheduler(time.time, time.sleep)
+        self._stop_event.clear()
+        self._loop_error = None
         heartbeat_time = int(0.4 * self.heartbeat_frequency)
 
-        def scheduler_update():
-            self.update()
-            self.scheduler.enter(self.update_frequency, 1, scheduler_update)
+        def loop_harvest():
+            self.harvest()
+            self._submit_event.wait(self.harvest_frequency)
+            self._submit_event.clear()
+
+        def loop_upload():
+            self._upload_results(allow_shutdown=False)
+            self._stop_event.wait(self.update_frequency)
 
-        def scheduler_heartbeat():
+        def loop_acquire():
+            self._log_statistics()
+            if self._acquire_tasks():
+                self._submit_event.set()
+            self._stop_event.wait(self.update_interval)
+
+        def loop_heartbeat():
             self.heartbeat()
-            self.scheduler.enter(heartbeat_time, 1, scheduler_heartbeat)
+            self._stop_event.wait(heartbeat_time)
+
+        loops = {"harvest": loop_harvest, "upload": loop_upload, "acquire": loop_acquire, "heartbeat": loop_heartbeat}
+        self._loop_threads = {
+            name: threading.Thread(target=self._run_loop, args=(func,), name=f"QueueManager {name}", daemon=True)
+            for name, func in loops.items()
+        }
 
         self.logger.info("QueueManager successfully started.\n")
 
-        self.scheduler.enter(0, 1, scheduler_update)
-        self.scheduler.enter(0, 2, scheduler_heartbeat)
+        for thread in self._loop_threads.values():
+            thread.start()
 
-        self.scheduler.run()
+        # Blocks until stopped or one of the loops fails
+        self._stop_event.wait()
+
+        if self._loop_error is not None:
+            try:
+                self._stop_loops()
+            finally:
+                raise self._loop_error
+
+    def _run_loop(self, func: Callable) -> None:
+        """Runs a single stage of the manager until stopped, a failure stops all stages"""
+
+        try:
+            while not self._stop_event.is_set():
+                func()
+        except Exception as error:
+            self.logger.error(f"QueueManager loop {threading.current_thread().name} failed: {error}")
+            self._loop_error = error
+            self._stop_event.set()
+            self._submit_event.set()
+
+    def _join_loops(self, skip: Iterable[str] = ()) -> None:
+        """Stops and waits on all stage loops except the skipped ones"""
+
+        self._stop_event.set()
+        self._submit_event.set()
+        for name in [x for x in self._loop_threads if x not in skip]:
+            thread = self._loop_threads.pop(name)
+            if thread is not threading.current_thread():
+                thread.join()
+
+    def _stop_loops(self) -> None:
+        """
+        Stops all stage loops and shuts down with the server.
+
+        The acquisition loop may be held in a long poll which the shutdown makes the server answer without tasks,
+        so it is only waited on once the shutdown went through.
+        """
+
+        self._join_loops(skip=["acquire"])
+        try:
+            self.shutdown()
+        finally:
+            self._join_loops()
 
     def stop(self, signame="Not provided", signum=None, stack=None) -> None:
         """
@@ -357,17 +574,18 @@ class QueueManager:
         """
         self.logger.info("QueueManager received shutdown signal: {}.\n".format(signame))
 
-        # Cancel all events
-        if self.scheduler is not None:
-            for event in self.scheduler.queue:
-                self.scheduler.cancel(event)
-
-        # Push data back to the server
-        self.shutdown()
+        # Wait for all loops to finish their current pass and push data back to the server
+        self._stop_loops()
 
         # Close down the adapter
         self.close_adapter()
 
+        # Results the server has not acknowledged stay in the outbox for the next manager using it
+        self.outbox.close()
+
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+
         # Call exit callbacks
         for func, args, kwargs in self.exit_callbacks:
             func(*args, **kwargs)
@@ -404,7 +622,11 @@ class QueueManager:
         """
         self.assert_connected()
 
-        self.update(new_tasks=False, allow_shutdown=False)
+        # Complete tasks are still uploaded, but acquired tasks are not handed to the adapter as the shutdown below
+        # returns them to the server
+        self.harvest(submit=False)
+        self._upload_results(allow_shutdown=False)
+        self._log_statistics()
 
         payload = self._payload_template()
         payload["data"]["operation"] = "shutdown"
@@ -412,6 +634,12 @@ class QueueManager:
             response = self.client._automodel_request("queue_manager", "put", payload, timeout=5)
             response["success"] = True
 
+            # The server returns all tasks held by this manager, including prefetched ones
+            with self._buffer_lock:
+                self._prefetch_buffer.clear()
+                self._allocations.clear()
+                self._task_times.clear()
+
             shutdown_string = "Shutdown was successful, {} tasks returned to master queue."
 
         except IOError:
@@ -448,13 +676,240 @@ class QueueManager:
         """
         self.exit_callbacks.append((callback, args, kwargs))
 
-    def _post_update(self, payload_data, allow_shutdown=True):
-        """Internal function to post payload update"""
+    def harvest(self, submit: bool = True) -> int:
+        """
+        Pulls complete tasks out of the adapter and hands acquired tasks to the freed slots.
+        The complete tasks are journaled in the outbox for upload to the server.
+
+        Parameters
+        ----------
+        submit : bool, optional
+            Hand acquired tasks to the adapter, False while shutting down
+
+        Returns
+        -------
+        int
+            The number of complete tasks pulled out of the adapter
+        """
+
+        # Leave complete tasks in the adapter while the upload is behind, slots freed earlier are still filled
+        results = {}
+        if self.outbox.count_pending() >= self.upload_queue_size:
+            self.logger.debug("Outbox is full, complete tasks are held until the upload catches up.")
+        else:
+            # This also compresses their stdout/stderr/error outputs
+            results = self.queue_adapter.acquire_complete()
+
+        if results:
+            start = time.time()
+            results = compress_results(results)
+            self.metrics.compression_seconds.observe(time.time() - start)
+
+            self._journal_results(results)
+            self._observe_stage(results, "complete")
+            self._release_allocations(results)
+            self.active -= len(results)
+            self._n_harvested += len(results)
+            self._collect_task_overheads(results)
+
+        if submit:
+            self._submit_prefetched()
+
+        return len(results)
+
+    def _journal_results(self, results: Dict[str, Any]) -> None:
+        """Writes harvested results to the outbox in bounded batches sharing a group"""
+
+        # Each result is serialized once here, the same bytes are journaled and posted
+        results = {k: v.dict() if hasattr(v, "dict") else v for k, v in results.items()}
+        summaries = {k: self._summarize_result(v) for k, v in results.items()}
+
+        group = None
+        journaled = time.time()
+        for batch in batch_results(serialize_results(results), self.upload_batch_size, self.upload_batch_bytes):
+            entry_id = self.outbox.put(pack_results(batch), len(batch), self.name_data, group=group)
+            group = group or entry_id
+            self._journal_times[entry_id] = journaled
+            self._result_summaries[entry_id] = {k: summaries[k] for k in batch}
+
+    def _observe_stage(self, task_ids: Iterable[str], stage: str) -> None:
+        """Records the time tasks spent since they entered their previous stage, and restarts their clock"""
+
+        now = time.time()
+        with self._buffer_lock:
+            for task_id in task_ids:
+                entered = self._task_times.pop(task_id, None)
+                if entered is not None:
+                    self.metrics.stage_seconds.observe(now - entered, stage=stage)
+                if stage == "submit":
+                    self._task_times[task_id] = now
+
+    def _collect_task_overheads(self, results: Dict[str, Any]) -> None:
+        """Moves the per-task overhead measured by the adapter into the statistics"""
+
+        for key in results:
+            overhead = self.queue_adapter.task_overheads.pop(key, None)
+            if overhead is None:
+                continue
+
+            self.logger.debug(f"Task {key} spent {overhead:.3f}s in the worker outside of the computation.")
+            self.statistics.timed_tasks += 1
+            self.statistics.total_task_overhead += overhead / 3600
+            self.statistics.maximum_task_overhead = max(self.statistics.maximum_task_overhead, overhead)
+
+    def _on_complete(self, n_complete: int) -> None:
+        """Wakes the harvest loop once enough tasks are complete, called from the adapter"""
+
+        if n_complete >= self.harvest_threshold:
+            self._submit_event.set()
+
+    def _submit_prefetched(self) -> int:
+        """Hands acquired tasks to the adapter for every open slot, or the free cores and memory when packing"""
+
+        # Acquired tasks are returned to the server on shutdown
+        if self._stop_event.is_set():
+            return 0
+
+        with self._buffer_lock:
+            if self.total_cores is not None:
+                tasks = self._pack_prefetched()
+            else:
+                n_submit = min(len(self._prefetch_buffer), max(0, self.max_tasks - self.active))
+                tasks = [self._prefetch_buffer.popleft()[1] for _ in range(n_submit)]
+
+        n_submit = len(tasks)
+        if n_submit == 0:
+            return 0
+
+        self._observe_stage([task["id"] for task in tasks], "submit")
+        self._task_programs.update((task["id"], task.get("program") or "unknown") for task in tasks)
+        self.queue_adapter.submit_tasks(tasks)
+        self.active += n_submit
+
+        return n_submit
+
+    def _task_allocation(self, task: Dict[str, Any]) -> Tuple[int, float]:
+        """The cores and memory a task is packed with, its expected resources clipped to the budget"""
+
+        resources = task.get("resources") or {}
+        ncores = min(resources.get("ncores") or self.cores_per_task or 1, self.total_cores)
+        memory = resources.get("memory") or self.memory_per_task or 0.0
+        if self.total_memory is not None:
+            memory = min(memory, self.total_memory)
+
+        return ncores, memory
+
+    def _pack_prefetched(self) -> List[Dict[str, Any]]:
+        """
+        Takes the acquired tasks which fit the free cores and memory, first fit in acquisition order.
+        Tasks held for over half the lease are not passed over, so that large tasks are not starved by small ones.
+        Must be called under the buffer lock.
+        """
+
+        free_cores = self.total_cores - sum(x[0] for x in self._allocations.values())
+        free_memory = None
+        if self.total_memory is not None:
+            free_memory = self.total_memory - sum(x[1] for x in self._allocations.values())
+        n_open = max(0, self.max_tasks - self.active)
+        now = time.time()
+        starve_time = now - 0.5 * self.prefetch_lease
+
+        tasks = []
+        remaining = deque()
+        for acquired, task in self._prefetch_buffer:
+            ncores, memory = self._task_allocation(task)
+            fits = ncores <= free_cores and (free_memory is None or memory <= free_memory)
+            if len(tasks) >= n_open or (remaining and remaining[0][0] < starve_time) or not fits:
+                remaining.append((acquired, task))
+                continue
+
+            free_cores -= ncores
+            if free_memory is not None:
+                free_memory -= memory
+
+            allocation = {"ncores": ncores}
+            if memory > 0:
+                allocation["memory"] = memory
+            tasks.append({**task, "allocation": allocation})
+            self._allocations[task["id"]] = (ncores, memory, now)
+
+        self._prefetch_buffer = remaining
+        return tasks
+
+    def _release_allocations(self, results: Dict[str, Any]) -> None:
+        """Frees the cores and memory of harvested packed tasks, keeping their cores for the statistics"""
+
+        if self.total_cores is None:
+            return
+
+        now = time.time()
+        with self._buffer_lock:
+            for key in results:
+                allocation = self._allocations.pop(key, None)
+                if allocation is None:
+                    continue
+
+                ncores, _, start = allocation
+                self._task_cores[key] = ncores
+                self._released_core_seconds += ncores * (now - max(start, self.statistics.last_update_time))
+
+    def _return_expired_prefetch(self) -> int:
+        """Returns prefetched tasks whose lease has aged out to the server"""
+
+        expire_time = time.time() - self.prefetch_lease
+
+        with self._buffer_lock:
+            expired = [x for x in self._prefetch_buffer if x[0] < expire_time]
+            if len(expired) == 0:
+                return 0
+            self._prefetch_buffer = deque(x for x in self._prefetch_buffer if x[0] >= expire_time)
+            for _, task in expired:
+                self._task_times.pop(task["id"], None)
+
+        nreturned = self._return_tasks([task["id"] for _, task in expired])
+        if nreturned is None:
+            self.logger.warning("Return of expired prefetched tasks was not successful, will retry on next update.")
+            with self._buffer_lock:
+                self._prefetch_buffer.extendleft(reversed(expired))
+            return 0
+
+        self.logger.info(f"Returned {nreturned} prefetched tasks whose lease expired.")
+
+        return nreturned
+
+    def _return_tasks(self, task_ids: List[str]) -> Optional[int]:
+        """Returns unstarted tasks to the server, the number returned or None if the server could not be reached"""
+
+        payload = self._payload_template()
+        payload["data"]["operation"] = "return"
+        payload["data"]["task_ids"] = task_ids
+        try:
+            return self.client._automodel_request("queue_manager", "put", payload)["nreturned"]
+        except IOError:
+            return None
+
+    def _prefetch_target(self) -> int:
+        """The number of tasks to hold beyond the open slots"""
+
+        if self.prefetch_limit <= 0:
+            return 0
+
+        # Twice the tasks expected to complete before the next update, so that the buffer can grow with the rate
+        return min(self.prefetch_limit, math.ceil(2 * self.statistics.completion_rate * self.update_interval))
+
+    def _post_update(self, payload_data, allow_shutdown=True, name_data=None):
+        """Internal function to post payload update, packed results are posted as they are"""
         payload = self._payload_template()
-        # Update with data
-        payload["data"] = payload_data
+        # Results journaled by a previous manager are posted under its name
+        if name_data is not None:
+            payload["meta"].update(name_data)
         try:
-            self.client._automodel_request("queue_manager", "post", payload, full_return=True)
+            if isinstance(payload_data, bytes):
+                # Results packed by `compress.pack_results` are posted without decoding them
+                self.client.post_serialized("queue_manager", payload["meta"], payload_data)
+            else:
+                payload["data"] = payload_data
+                self.client._automodel_request("queue_manager", "post", payload, full_return=True)
         except IOError:
 
             # Trapped behavior elsewhere
@@ -475,167 +930,220 @@ class QueueManager:
             finally:
                 raise fatal
 
-    def _update_stale_jobs(self, allow_shutdown=True):
-        """
-        Attempt to post the previous payload failures
+    def update(self, new_tasks: bool = True, allow_shutdown=True) -> bool:
+        """Examines the queue for completed tasks and adds successful completions to the database
+        while unsuccessful are logged for future inspection.
+
+        Runs a single pass of every stage of `start` in order.
+
+        Parameters
+        ----------
+        new_tasks: bool, optional, Default: True
+            Try to get new tasks from the server
+        allow_shutdown: bool, optional, Default: True
+            Allow function to attempt graceful shutdowns in the case of stale job or fatal error limits.
+            Does not prevent errors from being raise, but mostly used to prevent infinite loops when update is
+            called from `shutdown` itself
         """
-        clear_indices = []
-        for index, (results, attempts) in enumerate(self._stale_payload_tracking):
+
+        self.assert_connected()
+
+        self.harvest()
+        self._upload_results(allow_shutdown=allow_shutdown)
+        self._log_statistics()
+
+        if new_tasks is False:
+            return True
+
+        ret = self._acquire_tasks()
+        self._submit_prefetched()
+
+        return ret
+
+    def _upload_results(self, allow_shutdown=True) -> int:
+        """Posts the result batches journaled in the outbox to the server and logs their status"""
+
+        n_result = 0
+        for entry_id, group, name_data, packed_results, ntasks, attempts in self.outbox.entries():
+            post_failed = False
             try:
-                self._post_update(results)
-                self.logger.info(f"Successfully pushed jobs from {attempts+1} updates ago")
-                self.logger.info(f"Tasks pushed: " + str(list(results.keys())))
-                clear_indices.append(index)
+                start = time.time()
+                self._post_update(packed_results, allow_shutdown=allow_shutdown, name_data=name_data)
+                self.outbox.ack(entry_id)
+                status = "sent"
+
+                now = time.time()
+                self.logger.debug(f"Posted {ntasks} tasks in {now - start:.2f}s.")
+                self.metrics.upload_seconds.observe(now - start)
+                self.metrics.upload_bytes.inc(len(packed_results))
+
+                # Batches left by a previous manager were journaled before this one started
+                journaled = self._journal_times.pop(entry_id, None)
+                if journaled is not None:
+                    for _ in range(ntasks):
+                        self.metrics.stage_seconds.observe(now - journaled, stage="upload")
+                if attempts:
+                    self.logger.info(f"Successfully pushed jobs from {attempts} updates ago")
+
             except IOError:
+                post_failed = True
+                n_attempts = self.outbox.retry(entry_id)
 
-                # Tried and failed
-                attempts += 1
                 # Case: Still within the retry limit
-                if self.server_error_retries is None or self.server_error_retries > attempts:
-                    self._stale_payload_tracking[index][-1] = attempts
-                    self.logger.warning(f"Could not post jobs from {attempts} updates ago, will retry on next update.")
+                if self.server_error_retries is None or self.server_error_retries >= n_attempts:
+                    self.logger.warning("Post complete tasks was not successful. Attempting again on next update.")
+                    status = "deferred"
 
                 # Case: Over limit
                 else:
                     self.logger.warning(
-                        f"Could not post jobs from {attempts} ago and over attempt limit, marking " f"jobs as stale."
+                        f"Could not post jobs after {n_attempts} attempts and over attempt limit, marking jobs as "
+                        f"stale. They are kept in the outbox {self.outbox.path} for the next manager using it."
                     )
-                    self.n_stale_jobs += len(results)
-                    clear_indices.append(index)
-                    self._stale_updates_tracked += 1
-
-        # Cleanup clear indices
-        for index in clear_indices[::-1]:
-            self._stale_payload_tracking.pop(index)
-
-        # Check stale limiters
-        if (
-            self.stale_update_limit is not None
-            and (len(self._stale_payload_tracking) + self._stale_updates_tracked) > self.stale_update_limit
-        ):
+                    self.outbox.mark_stale(entry_id)
+                    self._journal_times.pop(entry_id, None)
+                    self.n_stale_jobs += ntasks
+                    status = "stale"
+
+            self.metrics.uploads.inc(status=status)
+
+            # Results are accounted for on their first attempt only, batches left by a previous manager are read back
+            if attempts == 0:
+                summaries = self._result_summaries.pop(entry_id, None)
+                if summaries is None:
+                    summaries = {k: self._summarize_result(v) for k, v in msgpackext_loads(packed_results).items()}
+                self._process_results(summaries, status)
+                n_result += ntasks
+
+            # Once a batch fails the server is likely unreachable, remaining batches wait for the next update
+            if post_failed:
+                break
+
+        # Check stale limiters, batches of the same harvest count as a single stale update
+        if self.stale_update_limit is not None and self.outbox.count_failed_groups() > self.stale_update_limit:
             self.logger.error("Exceeded number of stale updates allowed! Attempting to shutdown gracefully...")
 
-            # Log all not-quite stale jobs to stale
-            for (results, _) in self._stale_payload_tracking:
-                self.n_stale_jobs += len(results)
+            # Log all not-quite stale jobs to stale, they are kept in the outbox
+            self.n_stale_jobs += self.outbox.count_tasks(stale=False)
             try:
                 if allow_shutdown:
                     self.shutdown()
             finally:
                 raise RuntimeError("Exceeded number of stale updates allowed!")
 
-    def update(self, new_tasks: bool = True, allow_shutdown=True) -> bool:
-        """Examines the queue for completed tasks and adds successful completions to the database
-        while unsuccessful are logged for future inspection.
+        return n_result
 
-        Parameters
-        ----------
-        new_tasks: bool, optional, Default: True
-            Try to get new tasks from the server
-        allow_shutdown: bool, optional, Default: True
-            Allow function to attempt graceful shutdowns in the case of stale job or fatal error limits.
-            Does not prevent errors from being raise, but mostly used to prevent infinite loops when update is
-            called from `shutdown` itself
-        """
+    @staticmethod
+    def _summarize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """The success, wall time and error of a result, all that is logged and counted of it"""
 
-        self.assert_connected()
-        self._update_stale_jobs(allow_shutdown=allow_shutdown)
+        wall_time_seconds = 0
+        if result["success"]:
+            provenance = result.get("provenance") or {}
+            if "wall_time" in provenance:
+                wall_time_seconds = float(provenance["wall_time"])
 
-        results = self.queue_adapter.acquire_complete()
+            return {"success": True, "wall_time": wall_time_seconds, "error": None}
+
+        # Try to get the wall time in the most fault-tolerant way
+        try:
+            wall_time_seconds = float(result["input_data"].get("provenance", {}).get("wall_time", 0))
+        except AttributeError:
+            # Trap the result.input_data is None, but let other attribute errors go
+            if result.get("input_data") is None:
+                wall_time_seconds = 0
+            else:
+                raise
+        except TypeError:
+            # Trap wall time corruption, e.g. float(None)
+            # Other Result corruptions will raise an error correctly
+            wall_time_seconds = 0
+
+        return {"success": False, "wall_time": wall_time_seconds, "error": result["error"]}
+
+    def _process_results(self, summaries: Dict[str, Dict[str, Any]], status: str) -> None:
+        """Logs the status of journaled results from their summaries and adds them to the statistics"""
+
+        n_success = 0
+        task_cpu_hours = 0
 
-        # Compress the stdout/stderr/error outputs
-        results = compress_results(results)
+        # For logging
+        task_status = {}
+        failure_messages = {}
+
+        for key, summary in summaries.items():
+            wall_time_seconds = summary["wall_time"]
+            if summary["success"]:
+                n_success += 1
+                task_status[key] = f"{status} / success"
+            else:
+                error = summary["error"]
+                task_status[key] = f"{status} / failed: {error['error_type']}"
+                failure_messages[key] = error
+
+            # Results replayed from the outbox of a previous manager have no program recorded
+            program = self._task_programs.pop(key, "unknown")
+            self.metrics.task_wall_seconds.observe(wall_time_seconds, program=program)
+
+            # Packed tasks ran on their own number of cores
+            task_cores = self._task_cores.pop(key, self.statistics.cores_per_task)
+            task_cpu_hours += wall_time_seconds * task_cores / 3600
+        n_fail = len(summaries) - n_success
+
+        # Now print out all the info
+        self.logger.info(f"Processed {len(summaries)} tasks: {n_success} succeeded / {n_fail} failed).")
+        self.logger.info(f"Task ids, submission status, calculation status below")
+        for task_id, status_msg in task_status.items():
+            self.logger.info(f"    Task {task_id} : {status_msg}")
+        if n_fail:
+            self.logger.info("The following tasks failed with the errors:")
+            for task_id, error_info in failure_messages.items():
+                self.logger.info(f"Error message for task id {task_id}")
+                self.logger.info("    Error type: " + str(error_info["error_type"]))
+                self.logger.info("    Backtrace: \n" + str(error_info["error_message"]))
+
+        # Crunch Statistics
+        self.statistics.total_failed_tasks += n_fail
+        self.statistics.total_successful_tasks += n_success
+        self.statistics.total_task_walltime += task_cpu_hours
+
+    def _log_statistics(self) -> None:
+        """Updates the time-based statistics and logs the task, worker and stage queue statistics"""
 
         # Stats fetching for running tasks, as close to the time we got the jobs as we can
         last_time = self.statistics.last_update_time
         now = self.statistics.last_update_time = time.time()
         time_delta_seconds = now - last_time
 
+        n_harvested = self._n_harvested
+        if time_delta_seconds > 0:
+            rate = (n_harvested - self._last_harvested) / time_delta_seconds
+            self.statistics.completion_rate = 0.5 * (self.statistics.completion_rate + rate)
+        self._last_harvested = n_harvested
+
         try:
             self.statistics.active_task_slots = self.queue_adapter.count_active_task_slots()
             log_efficiency = True
         except NotImplementedError:
             log_efficiency = False
 
-        timedelta_worker_walltime = time_delta_seconds * self.statistics.active_cores / 3600
-        timedelta_maximum_walltime = (
-            time_delta_seconds * self.statistics.max_concurrent_tasks * self.statistics.cores_per_task / 3600
-        )
+        if self.total_cores is None:
+            timedelta_worker_walltime = time_delta_seconds * self.statistics.active_cores / 3600
+        else:
+            # Packed tasks are accounted with their own cores over the time they ran since the last update
+            with self._buffer_lock:
+                core_seconds = self._released_core_seconds
+                self._released_core_seconds = 0.0
+                for ncores, _, start in self._allocations.values():
+                    core_seconds += ncores * (now - max(start, last_time))
+                self.statistics.allocated_cores = sum(x[0] for x in self._allocations.values())
+                self.statistics.allocated_memory = sum(x[1] for x in self._allocations.values())
+            timedelta_worker_walltime = core_seconds / 3600
+
+        timedelta_maximum_walltime = time_delta_seconds * self.statistics.max_concurrent_cores / 3600
         self.statistics.total_worker_walltime += timedelta_worker_walltime
         self.statistics.maximum_possible_walltime += timedelta_maximum_walltime
 
-        # Process jobs
-        n_success = 0
-        n_fail = 0
-        n_result = len(results)
-        task_cpu_hours = 0
-        error_payload = []
-
-        if n_result:
-            # For logging
-            failure_messages = {}
-
-            try:
-                self._post_update(results, allow_shutdown=allow_shutdown)
-                task_status = {k: "sent" for k in results.keys()}
-            except IOError:
-                if self.server_error_retries is None or self.server_error_retries > 0:
-                    self.logger.warning("Post complete tasks was not successful. Attempting again on next update.")
-                    self._stale_payload_tracking.append([results, 0])
-                    task_status = {k: "deferred" for k in results.keys()}
-                else:
-                    self.logger.warning("Post complete tasks was not successful. Data may be lost.")
-                    self.n_stale_jobs += len(results)
-                    task_status = {k: "unknown_error" for k in results.keys()}
-
-            self.active -= n_result
-            for key, result in results.items():
-                wall_time_seconds = 0
-                if result.success:
-                    n_success += 1
-                    if hasattr(result.provenance, "wall_time"):
-                        wall_time_seconds = float(result.provenance.wall_time)
-
-                    task_status[key] += " / success"
-                else:
-                    task_status[key] += f" / failed: {result.error.error_type}"
-                    failure_messages[key] = result.error
-
-                    # Try to get the wall time in the most fault-tolerant way
-                    try:
-                        wall_time_seconds = float(result.input_data.get("provenance", {}).get("wall_time", 0))
-                    except AttributeError:
-                        # Trap the result.input_data is None, but let other attribute errors go
-                        if result.input_data is None:
-                            wall_time_seconds = 0
-                        else:
-                            raise
-                    except TypeError:
-                        # Trap wall time corruption, e.g. float(None)
-                        # Other Result corruptions will raise an error correctly
-                        wall_time_seconds = 0
-
-                task_cpu_hours += wall_time_seconds * self.statistics.cores_per_task / 3600
-            n_fail = n_result - n_success
-
-            # Now print out all the info
-            self.logger.info(f"Processed {len(results)} tasks: {n_success} succeeded / {n_fail} failed).")
-            self.logger.info(f"Task ids, submission status, calculation status below")
-            for task_id, status_msg in task_status.items():
-                self.logger.info(f"    Task {task_id} : {status_msg}")
-            if n_fail:
-                self.logger.info("The following tasks failed with the errors:")
-                for task_id, error_info in failure_messages.items():
-                    self.logger.info(f"Error message for task id {task_id}")
-                    self.logger.info("    Error type: " + str(error_info.error_type))
-                    self.logger.info("    Backtrace: \n" + str(error_info.error_message))
-
-        open_slots = max(0, self.max_tasks - self.active)
-
-        # Crunch Statistics
-        self.statistics.total_failed_tasks += n_fail
-        self.statistics.total_successful_tasks += n_success
-        self.statistics.total_task_walltime += task_cpu_hours
         na_format = ""
         float_format = ",.2f"
         if self.statistics.total_completed_tasks == 0:
@@ -658,7 +1166,11 @@ class QueueManager:
                 # Efficiency calculated as:
                 # sum_task(task_wall_time * nthread / task)
                 # -------------------------------------------------------------
-                if self.statistics.total_task_walltime == 0 or self.statistics.maximum_possible_walltime == 0:
+                if (
+                    self.statistics.total_task_walltime == 0
+                    or self.statistics.total_worker_walltime == 0
+                    or self.statistics.maximum_possible_walltime == 0
+                ):
                     efficiency_of_running = "(N/A yet)"
                     efficiency_of_potential = "(N/A yet)"
                     efficiency_format = na_format
@@ -676,31 +1188,130 @@ class QueueManager:
                         f", Core Usage vs. Max Resources Requested: " f"{efficiency_of_potential:{efficiency_format}}%"
                     )
 
+        # Only adapters which time their workers report an overhead
+        if worker_stats_str is not None and self.statistics.timed_tasks > 0:
+            mean_overhead = self.statistics.total_task_overhead * 3600 / self.statistics.timed_tasks
+            worker_stats_str += (
+                f", Task Overhead: {mean_overhead:.3f}s mean, {self.statistics.maximum_task_overhead:.3f}s max"
+            )
+            if self.queue_adapter.total_task_time > 0:
+                fraction = self.queue_adapter.total_task_overhead / self.queue_adapter.total_task_time * 100
+                worker_stats_str += f" ({fraction:.1f}% of worker time)"
+
         self.logger.info(task_stats_str)
         if worker_stats_str is not None:
             self.logger.info(worker_stats_str)
 
-        if (new_tasks is False) or (open_slots == 0):
+        if self.total_cores is not None:
+            self.logger.info(
+                f"Packing: Cores={self.statistics.allocated_cores}/{self.total_cores}, "
+                f"Memory={self.statistics.allocated_memory:.1f}/{self.total_memory} GiB"
+            )
+
+        self.logger.info(
+            f"Stage Queues: Running={self.active}/{self.max_tasks}, "
+            f"Acquired={len(self._prefetch_buffer)}, "
+            f"Outbox={self.outbox.count_pending()}/{self.upload_queue_size} "
+            f"({self.outbox.count_tasks(stale=True)} stale tasks)"
+        )
+
+    def render_metrics(self) -> str:
+        """
+        Formats the statistics, queue depths and stage latencies of the manager in the Prometheus text format.
+        """
+
+        statistics = self.statistics.dict()
+        for name in ["total_completed_tasks", "max_concurrent_cores", "active_cores", "active_memory"]:
+            statistics[name] = getattr(self.statistics, name)
+
+        gauges = {}
+        for name, value in statistics.items():
+            if name != "last_update_time" and isinstance(value, (int, float)):
+                gauges[f"qcfractal_manager_{name}"] = (f"The {name} of the manager statistics.", value)
+
+        utilisation = 0.0
+        if self.statistics.max_concurrent_cores > 0:
+            utilisation = self.statistics.active_cores / self.statistics.max_concurrent_cores
+
+        gauges["qcfractal_manager_running_tasks"] = ("Tasks submitted to the adapter.", self.active)
+        gauges["qcfractal_manager_acquired_tasks"] = ("Tasks acquired but not submitted.", len(self._prefetch_buffer))
+        gauges["qcfractal_manager_outbox_batches"] = ("Batches of results to post.", self.outbox.count_pending())
+        gauges["qcfractal_manager_stale_tasks"] = ("Results given up on.", self.outbox.count_tasks(stale=True))
+        gauges["qcfractal_manager_core_utilisation"] = ("Fraction of the cores in use.", utilisation)
+        gauges["qcfractal_manager_update_interval_seconds"] = ("Time between checks for tasks.", self.update_interval)
+
+        return self.metrics.render(gauges)
+
+    def _acquire_tasks(self) -> bool:
+        """Requests new tasks from the server for the open slots and the prefetch target"""
+
+        if self._stop_event.is_set():
+            return True
+
+        self._return_expired_prefetch()
+
+        # Acquired tasks first fill the open slots, the remainder counts toward the prefetch target
+        n_demand = max(0, self.max_tasks - self.active) + self._prefetch_target() - len(self._prefetch_buffer)
+        if n_demand <= 0:
             return True
 
         # Get new tasks
         payload = self._payload_template()
-        payload["data"]["limit"] = open_slots
+        payload["data"]["limit"] = n_demand
+
+        # The request is held by the server for up to the long poll
+        timeout = None
+        if self.long_poll > 0:
+            payload["data"]["wait"] = self.long_poll
+            timeout = math.ceil(self.long_poll) + 60
 
         try:
-            new_tasks = self.client._automodel_request("queue_manager", "get", payload)
+            response = self.client._automodel_request(
+                "queue_manager", "get", payload, full_return=True, timeout=timeout
+            )
         except IOError:
             # TODO something as we didnt successfully get data
             self.logger.warning("Acquisition of new tasks was not successful.")
             return False
 
+        new_tasks = response.data
+
+        # Stopped while the request was held, the tasks would never be run
+        if new_tasks and self._stop_event.is_set():
+            self._return_tasks([task["id"] for task in new_tasks])
+            self.logger.info(f"Returned {len(new_tasks)} tasks acquired while stopping.")
+            return True
+
         self.logger.info("Acquired {} new tasks.".format(len(new_tasks)))
+        self._adapt_update_interval(len(new_tasks), response.meta.waiting, response.meta.backoff)
+
+        # Tasks are handed to the adapter by the harvest stage
+        acquired = time.time()
+        with self._buffer_lock:
+            self._prefetch_buffer.extend((acquired, task) for task in new_tasks)
+            self._task_times.update((task["id"], acquired) for task in new_tasks)
 
-        # Add new tasks to queue
-        self.queue_adapter.submit_tasks(new_tasks)
-        self.active += len(new_tasks)
         return True
 
+    def _adapt_update_interval(self, n_acquired: int, waiting: bool, backoff: Optional[float]) -> None:
+        """Sets the interval until the next check for new tasks from the outcome of this one"""
+
+        if waiting:
+            # Work is left on the server, refill slots as soon as they free up
+            interval = self.min_update_frequency
+        elif n_acquired == 0:
+            interval = min(self.max_update_frequency, 2 * self.update_interval)
+        else:
+            interval = self.update_frequency
+
+        # The server may ask to be left alone for longer than we would wait
+        if backoff is not None:
+            interval = max(interval, backoff)
+
+        if interval != self.update_interval:
+            self.logger.debug(f"Next check for new tasks in {interval:.1f}s.")
+        self.update_interval = interval
+
     def await_results(self) -> bool:
         """A synchronous method for testing or small launches
         that awaits task completion.
@@ -0,0 +1,219 @@
+"""
+Prometheus-style metrics of a queue manager, served over HTTP in the plain text exposition format
+"""
+
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Sequence, Tuple
+
+__all__ = ["Counter", "Histogram", "ManagerMetrics", "MetricsServer"]
+
+# Upper bounds, in seconds, of latencies from milliseconds to a day
+LATENCY_BUCKETS = (0.001, 0.01, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600, 14400, 86400)
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+
+    if not pairs:
+        return ""
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    """
+    A monotonically increasing value for every combination of label values.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = defaultdict(float)
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] += amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    Counts of observed values by upper bound, with their sum, for every combination of label values.
+    """
+
+    def __init__(
+        self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS, labelnames: Sequence[str] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        # Label values: (per bucket counts, sum, count), the counts are not cumulative
+        self._values = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[idx] += 1
+                    break
+            self._values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: str) -> int:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, (None, 0.0, 0))[2]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class ManagerMetrics:
+    """
+    The counters and histograms recorded by a QueueManager as tasks move through its stages.
+
+    Tasks are acquired from the server, submitted to the adapter, harvested once complete, which compresses them,
+    and finally uploaded to the server. The time spent between each of these is recorded by stage.
+    """
+
+    def __init__(self):
+        self.stage_seconds = Histogram(
+            "qcfractal_manager_stage_seconds",
+            "Time tasks spend in each stage: acquired until submitted (submit), submitted until harvested "
+            "(complete) and harvested until the server received them (upload).",
+            labelnames=("stage",),
+        )
+        self.task_wall_seconds = Histogram(
+            "qcfractal_manager_task_wall_seconds",
+            "Wall time of the computation of each task by the program it ran, as reported by QCEngine.",
+            labelnames=("program",),
+        )
+        self.compression_seconds = Histogram(
+            "qcfractal_manager_compression_seconds", "Time spent compressing the outputs of each harvest."
+        )
+        self.upload_seconds = Histogram(
+            "qcfractal_manager_upload_seconds", "Time spent posting each batch of results to the server."
+        )
+        self.upload_bytes = Counter(
+            "qcfractal_manager_upload_bytes_total", "Serialized size of the results posted to the server."
+        )
+        self.uploads = Counter(
+            "qcfractal_manager_uploads_total",
+            "Batches of results posted to the server by status (sent, deferred or stale).",
+            labelnames=("status",),
+        )
+
+    def render(self, gauges: Dict[str, Tuple[str, float]]) -> str:
+        """
+        Formats all metrics in the Prometheus text exposition format.
+
+        Parameters
+        ----------
+        gauges : Dict[str, Tuple[str, float]]
+            Values sampled at the time of the request, as name: (documentation, value)
+
+        Returns
+        -------
+        str
+            The metrics, one sample per line
+        """
+
+        lines = []
+        for name, (documentation, value) in gauges.items():
+            lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} gauge", f"{name} {value}"])
+
+        for metric in (
+            self.stage_seconds,
+            self.task_wall_seconds,
+            self.compression_seconds,
+            self.upload_seconds,
+            self.upload_bytes,
+            self.uploads,
+        ):
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Serves metrics on ``/metrics`` from a background thread.
+    """
+
+    def __init__(self, render: Callable[[], str], port: int, host: str = "0.0.0.0"):
+        """
+        Parameters
+        ----------
+        render : Callable[[], str]
+            Returns the current metrics in the Prometheus text exposition format
+        port : int
+            The port to listen on, 0 picks a free port
+        host : str, optional
+            The address to listen on
+        """
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Scrapes are frequent, keep them out of the manager log
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="QueueManager metrics", daemon=True)
+        self._thread.start()
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def close(self) -> None:
+        """
+        Stops serving metrics.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
@@ -0,0 +1,182 @@
+"""
+A durable outbox for complete results awaiting upload to the server
+"""
+
+import sqlite3
+import threading
+import zlib
+from typing import Dict, Iterator, Optional, Tuple
+
+from qcelemental.util import msgpackext_dumps, msgpackext_loads
+
+__all__ = ["ResultOutbox"]
+
+
+class ResultOutbox:
+    """
+    An SQLite journal of complete result batches which have not been acknowledged by the server.
+
+    Each batch is stored as zlib-compressed msgpack, exactly as it is posted, together with the name of the manager
+    that owned its tasks, so that batches left behind by a manager which died can be replayed by the next manager
+    using the same outbox.
+    Batches split from the same harvest share a group, and each batch is acknowledged on its own.
+    Batches are only read back one at a time, so memory stays bounded regardless of the number of pending batches.
+
+    Batches which were given up on are marked stale rather than removed, a manager opening the journal again revives
+    them so that no result is lost to a restart.
+    """
+
+    def __init__(self, path: str):
+        """
+        Parameters
+        ----------
+        path : str
+            The location of the SQLite journal, created if it does not exist
+        """
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+
+        # Acknowledged batches are truncated from the file
+        self._conn.execute("PRAGMA auto_vacuum = FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox "
+            "(id INTEGER PRIMARY KEY AUTOINCREMENT, grp INTEGER, name_data BLOB, results BLOB, ntasks INTEGER, "
+            "attempts INTEGER, stale INTEGER DEFAULT 0)"
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def __repr__(self) -> str:
+        return f"ResultOutbox(path='{self.path}', batches={len(self)})"
+
+    def count_pending(self) -> int:
+        """
+        Returns the number of batches which are not stale.
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox WHERE stale = 0").fetchone()[0]
+
+    def count_failed_groups(self) -> int:
+        """
+        Returns the number of harvests with batches which failed to post at least once, including stale ones.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(DISTINCT grp) FROM outbox WHERE attempts > 0 OR stale = 1"
+            ).fetchone()[0]
+
+    def count_tasks(self, stale: Optional[bool] = None) -> int:
+        """
+        Returns the number of tasks over all batches, or over the stale or pending batches only.
+        """
+        query = "SELECT COALESCE(SUM(ntasks), 0) FROM outbox"
+        if stale is not None:
+            query += f" WHERE stale = {int(stale)}"
+
+        with self._lock:
+            return self._conn.execute(query).fetchone()[0]
+
+    def put(self, results: bytes, ntasks: int, name_data: Dict[str, str], group: Optional[int] = None) -> int:
+        """
+        Writes a batch of results to the journal before it is posted.
+
+        Parameters
+        ----------
+        results : bytes
+            The complete results as a msgpack map keyed by task id, see `compress.pack_results`
+        ntasks : int
+            The number of results in the batch
+        name_data : Dict[str, str]
+            The cluster, hostname, and uuid of the manager the tasks are assigned to
+        group : Optional[int], optional
+            The id of the first batch of the same harvest, None starts a new group
+
+        Returns
+        -------
+        int
+            The id of the batch, used to acknowledge or retry it
+        """
+
+        blob = zlib.compress(results)
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO outbox (grp, name_data, results, ntasks, attempts) VALUES (?, ?, ?, ?, 0)",
+                (group, msgpackext_dumps(name_data), blob, ntasks),
+            )
+            entry_id = cursor.lastrowid
+            if group is None:
+                self._conn.execute("UPDATE outbox SET grp = id WHERE id = ?", (entry_id,))
+
+            return entry_id
+
+    def entries(self) -> Iterator[Tuple[int, int, Dict[str, str], bytes, int, int]]:
+        """
+        Iterates over the batches which are not stale in the order they were written.
+
+        Yields
+        ------
+        Tuple[int, int, Dict[str, str], bytes, int, int]
+            The id, group, manager name data, packed results, number of tasks and number of failed attempts of each
+            batch
+        """
+
+        with self._lock:
+            ids = [x[0] for x in self._conn.execute("SELECT id FROM outbox WHERE stale = 0 ORDER BY id")]
+
+        for entry_id in ids:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT grp, name_data, results, ntasks, attempts FROM outbox WHERE id = ? AND stale = 0",
+                    (entry_id,),
+                ).fetchone()
+
+            # Acknowledged or given up on in the meantime
+            if row is None:
+                continue
+
+            group, name_data, blob, ntasks, attempts = row
+            yield entry_id, group, msgpackext_loads(name_data), zlib.decompress(blob), ntasks, attempts
+
+    def ack(self, entry_id: int) -> None:
+        """
+        Removes a batch once the server has received it.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM outbox WHERE id = ?", (entry_id,))
+
+    def retry(self, entry_id: int) -> int:
+        """
+        Records a failed attempt to post a batch and returns the number of failed attempts.
+        """
+        with self._lock:
+            self._conn.execute("UPDATE outbox SET attempts = attempts + 1 WHERE id = ?", (entry_id,))
+            return self._conn.execute("SELECT attempts FROM outbox WHERE id = ?", (entry_id,)).fetchone()[0]
+
+    def mark_stale(self, entry_id: int) -> None:
+        """
+        Gives up on posting a batch, it is kept on disk until the journal is revived.
+        """
+        with self._lock:
+            self._conn.execute("UPDATE outbox SET stale = 1 WHERE id = ?", (entry_id,))
+
+    def revive(self) -> int:
+        """
+        Makes all stale batches pending again, resets the attempt count of every batch and returns the number of
+        tasks which were stale.
+        """
+        with self._lock:
+            ntasks = self._conn.execute("SELECT COALESCE(SUM(ntasks), 0) FROM outbox WHERE stale = 1").fetchone()[0]
+            self._conn.execute("UPDATE outbox SET stale = 0, attempts = 0")
+            return ntasks
+
+    def close(self) -> None:
+        """
+        Closes the journal, pending batches are kept on disk.
+        """
+        with self._lock:
+            self._conn.close()
@@ -5,23 +5,27 @@ The FractalServer class
 import asyncio
 import datetime
 import logging
+import math
 import ssl
 import time
 import traceback
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 from qcelemental.models import ComputeError
 
 import tornado.ioloop
+import tornado.locks
 import tornado.log
 import tornado.options
 import tornado.web
 
 from .extras import get_information
 from .interface import FractalClient
+from .interface.models.task_models import TaskStatusEnum
 from .queue import QueueManager, QueueManagerHandler, ServiceQueueHandler, TaskQueueHandler, ComputeManagerHandler
 from .services import construct_service
 from .storage_sockets import ViewHandler, storage_socket_factory
+from .storage_sockets.view import StorageClient, ViewBuilder
 from .storage_sockets.api_logger import API_AccessLogger
 from .web_handlers import (
     CollectionHandler,
@@ -35,6 +39,9 @@ from .web_handlers import (
     WavefunctionStoreHandler,
 )
 
+if TYPE_CHECKING:
+    from .services.service_util import BaseService
+
 
 def _build_ssl():
     from cryptography import x509
@@ -106,6 +113,10 @@ class FractalServer:
         # View options
         view_enabled: bool = False,
         view_path: Optional[str] = None,
+        view_cache_size: int = 128,
+        view_update_frequency: float = 0,
+        view_max_builds: int = 1,
+        view_update_budget: float = 600,
         # Log options
         logfile_prefix: str = None,
         loglevel: str = "info",
@@ -114,9 +125,17 @@ class FractalServer:
         # Queue options
         queue_socket: "BaseAdapter" = None,
         heartbeat_frequency: float = 1800,
+        manager_idle_backoff: float = 0,
+        manager_long_poll_limit: float = 60,
         # Service options
         max_active_services: int = 20,
         service_frequency: float = 60,
+        task_priority_policy: str = "fixed",
+        critical_path_tasks: int = 2,
+        priority_aging_time: float = 3600,
+        service_admission: str = "fixed",
+        admission_low_watermark: float = 1,
+        admission_high_watermark: float = 4,
         # Testing functions
         skip_storage_version_check=True,
     ):
@@ -146,6 +165,16 @@ class FractalServer:
             The project name to use on the database.
         query_limit : int, optional
             The maximum number of entries a query will return.
+        view_cache_size : int, optional
+            The number of serialized collection view responses kept in memory, 0 disables the cache.
+        view_update_frequency : float, optional
+            The time (in seconds) between checks for collections whose views are missing or out of date, which are
+            then written from the database. Set to 0 to disable.
+        view_max_builds : int, optional
+            The maximum number of views written at the same time.
+        view_update_budget : float, optional
+            The time (in seconds) spent writing views per check, views which are not started within it are written
+            by the next check. Set to 0 to write all views on every check.
         logfile_prefix : str, optional
             The logfile to use for logging.
         loglevel : str, optional
@@ -155,10 +184,39 @@ class FractalServer:
             Should only be used for testing and interactive sessions.
         heartbeat_frequency : float, optional
             The time (in seconds) of the heartbeat manager frequency.
+        manager_idle_backoff : float, optional
+            The time (in seconds) a Queue Manager which found no tasks is asked to wait before fetching again.
+            Set to 0 to let managers poll at their own frequency.
+        manager_long_poll_limit : float, optional
+            The longest time (in seconds) the server holds a Queue Manager's request for tasks until tasks it can
+            run are submitted, when the manager asks to wait for them. Set to 0 to always answer immediately.
         max_active_services : int, optional
             The maximum number of active Services that can be running at any given time.
         service_frequency : float, optional
             The time (in seconds) before checking and updating services.
+        task_priority_policy : str, optional
+            The policy used to prioritize tasks {"fixed", "critical_path"}. The "fixed" policy hands out tasks by the
+            priority they were submitted with. The "critical_path" policy hands out tasks by an effective priority
+            which raises tasks gating the next iteration of a service and ages waiting tasks so that they are not
+            starved. The submitted priority is kept in either case.
+        critical_path_tasks : int, optional
+            Under the "critical_path" policy, the tasks of services with at most this many outstanding tasks are
+            boosted. Services with fewer outstanding tasks are boosted further.
+        priority_aging_time : float, optional
+            Under the "critical_path" policy, the time (in seconds) a waiting task must wait to be raised by a
+            single priority level. Tasks are aged every ``service_frequency`` seconds.
+        service_admission : str, optional
+            The policy used to start waiting services {"fixed", "adaptive"}. The "fixed" policy starts services
+            whenever fewer than ``max_active_services`` are running. The "adaptive" policy only starts services
+            when the waiting task queue, projected forward by the recent task throughput, falls below the low
+            watermark, and then starts enough services to refill it to the high watermark. ``max_active_services``
+            remains an upper bound.
+        admission_low_watermark : float, optional
+            Under the "adaptive" policy, the number of waiting tasks per active manager task slot below which new
+            services are started.
+        admission_high_watermark : float, optional
+            Under the "adaptive" policy, the number of waiting tasks per active manager task slot new services are
+            started to reach.
         """
 
         # Save local options
@@ -172,6 +230,32 @@ class FractalServer:
         self.max_active_services = max_active_services
         self.service_frequency = service_frequency
         self.heartbeat_frequency = heartbeat_frequency
+        self.manager_idle_backoff = manager_idle_backoff
+        self.manager_long_poll_limit = manager_long_poll_limit
+
+        if task_priority_policy not in {"fixed", "critical_path"}:
+            raise KeyError("Task priority policy '{}' not recognized.".format(task_priority_policy))
+
+        self.task_priority_policy = task_priority_policy
+        self.critical_path_tasks = critical_path_tasks
+        self.priority_aging_time = priority_aging_time
+
+        if service_admission not in {"fixed", "adaptive"}:
+            raise KeyError("Service admission policy '{}' not recognized.".format(service_admission))
+
+        if admission_low_watermark > admission_high_watermark:
+            raise ValueError("The admission low watermark must not be larger than the high watermark.")
+
+        self.service_admission = service_admission
+        self.admission_low_watermark = admission_low_watermark
+        self.admission_high_watermark = admission_high_watermark
+
+        # Last (time, completed tasks) sample and admission decision
+        self._admission_sample = None
+        self._admission_decision = None
+
+        # Tasks submitted by a service on its first iteration, smoothed over recently started services
+        self._service_task_estimate = None
 
         # Setup logging.
         if logfile_prefix is not None:
@@ -253,19 +337,30 @@ class FractalServer:
         )
 
         if view_enabled:
-            self.view_handler = ViewHandler(view_path)
+            self.view_handler = ViewHandler(view_path, cache_size=view_cache_size)
         else:
             self.view_handler = None
+        self.view_update_frequency = view_update_frequency
+        self.view_builder = None
 
         # Pull the current loop if we need it
         self.loop = loop or tornado.ioloop.IOLoop.current()
 
+        # Wakes managers waiting for tasks, tasks may be submitted from any thread
+        self._task_condition = tornado.locks.Condition()
+        self.storage.add_queue_listener(lambda: self.loop.add_callback(self._task_condition.notify_all))
+
         # Build up the application
         self.objects = {
             "storage_socket": self.storage,
             "logger": self.logger,
             "api_logger": self.api_logger,
             "view_handler": self.view_handler,
+            # Waiting tasks are handed out by their boosted and aged priority under the critical path policy
+            "effective_task_priority": self.task_priority_policy == "critical_path",
+            "manager_idle_backoff": self.manager_idle_backoff,
+            "manager_long_poll_limit": self.manager_long_poll_limit,
+            "task_condition": self._task_condition,
         }
 
         # Public information
@@ -279,6 +374,18 @@ class FractalServer:
         }
         self.update_public_information()
 
+        # Views are written from the database in the background
+        if (self.view_handler is not None) and (view_update_frequency > 0):
+            storage_client = StorageClient(self.storage, self.objects["public_information"], self._address)
+            self.view_builder = ViewBuilder(
+                self.storage,
+                self.view_handler,
+                storage_client,
+                max_builds=view_max_builds,
+                time_budget=view_update_budget,
+                logger=self.logger,
+            )
+
         endpoints = [
             # Generic web handlers
             (r"/information", InformationHandler, self.objects),
@@ -407,6 +514,18 @@ class FractalServer:
             server_log.start()
             self.periodic["server_log"] = server_log
 
+            # Views are written in a thread, and an update is skipped while the previous one is still running
+            if self.view_builder is not None:
+
+                def run_view_update_in_thread():
+                    self._run_in_thread(self.update_views)
+
+                view_update = tornado.ioloop.PeriodicCallback(
+                    run_view_update_in_thread, self.view_update_frequency * 1000
+                )
+                view_update.start()
+                self.periodic["view_update"] = view_update
+
         # Build callbacks which are always required
         public_info = tornado.ioloop.PeriodicCallback(self.update_public_information, self.heartbeat_frequency * 1000)
         public_info.start()
@@ -444,6 +563,9 @@ class FractalServer:
         for k, v in self.futures.items():
             v.cancel()
 
+        if self.view_builder is not None:
+            self.view_builder.close()
+
         if self.executor is not None:
             self.executor.shutdown()
 
@@ -506,10 +628,12 @@ class FractalServer:
         current_services = self.storage.get_services(status="RUNNING")["data"]
 
         # Grab new services if we have open slots
-        open_slots = max(0, self.max_active_services - len(current_services))
+        open_slots = self.service_admission_slots(len(current_services))
+        new_service_ids = set()
         if open_slots > 0:
             new_services = self.storage.get_services(status="WAITING", limit=open_slots)["data"]
             current_services.extend(new_services)
+            new_service_ids = {x["id"] for x in new_services}
             if len(new_services):
                 self.logger.info(f"Starting {len(new_services)} new services.")
 
@@ -518,6 +642,7 @@ class FractalServer:
         # Loop over the services and iterate
         running_services = 0
         completed_services = []
+        iterated_services = []
         for data in current_services:
 
             # TODO HACK: remove task_id from 'output'. This is contained in services
@@ -549,6 +674,13 @@ class FractalServer:
             else:
                 running_services += 1
 
+                if service.status != "ERROR":
+                    iterated_services.append(service)
+
+                    # Everything a service waits on after its first iteration was just submitted by it
+                    if service.id in new_service_ids:
+                        self._record_service_tasks(len(service.task_manager.required_tasks))
+
         if len(completed_services):
             self.logger.info(f"Completed {len(completed_services)} services.")
 
@@ -557,14 +689,162 @@ class FractalServer:
         # Add new procedures and services
         self.storage.services_completed(completed_services)
 
+        if self.task_priority_policy == "critical_path":
+            self.update_task_priorities(iterated_services)
+
         return running_services
 
+    def _record_service_tasks(self, n_tasks: int) -> None:
+        """Adds the number of tasks a newly started service submitted to the admission estimate"""
+
+        if self._service_task_estimate is None:
+            self._service_task_estimate = float(n_tasks)
+        else:
+            self._service_task_estimate = 0.5 * (self._service_task_estimate + n_tasks)
+
+    def service_admission_slots(self, running_services: int) -> int:
+        """Determines the number of waiting services which may be started.
+
+        Under the "adaptive" policy the waiting task depth, the task slots of the active managers and the task
+        throughput since the previous call are compared against the admission watermarks. The room below the high
+        watermark is divided by the number of tasks recently started services submitted on their first iteration.
+        While no active manager reports task slots the capacity is unknown, and services are started one at a time
+        so that they are not stalled until a manager connects. The decision is kept and written to the next server
+        stats log.
+
+        Parameters
+        ----------
+        running_services : int
+            The number of currently running services
+
+        Returns
+        -------
+        int
+            The number of services to start
+        """
+
+        open_slots = max(0, self.max_active_services - running_services)
+        if self.service_admission == "fixed":
+            return open_slots
+
+        capacity = self.storage.get_manager_capacity()
+        waiting = self.storage.queue_count_tasks(status=TaskStatusEnum.waiting)
+
+        # Tasks returned per second since the last sample
+        now = time.time()
+        throughput = 0.0
+        if self._admission_sample is not None:
+            last_time, last_completed = self._admission_sample
+            if now > last_time:
+                throughput = max(0, capacity["completed"] - last_completed) / (now - last_time)
+        self._admission_sample = (now, capacity["completed"])
+
+        # Waiting tasks expected to remain by the next service update
+        projected = max(0.0, waiting - throughput * self.service_frequency)
+        low = self.admission_low_watermark * capacity["active_tasks"]
+        high = self.admission_high_watermark * capacity["active_tasks"]
+
+        if capacity["active_tasks"] == 0:
+            decision, admit = "no_capacity", min(open_slots, 1)
+        elif projected >= high:
+            decision, admit = "throttle", 0
+        elif projected >= low:
+            decision, admit = "hold", 0
+        elif self._service_task_estimate is None:
+            # Nothing is known about the tasks a service submits yet, start a single one to measure it
+            decision, admit = "admit", min(open_slots, 1)
+        else:
+            # Each new service is expected to submit as many tasks as recently started services did
+            tasks_per_service = max(1.0, self._service_task_estimate)
+            decision, admit = "admit", min(open_slots, math.ceil((high - projected) / tasks_per_service))
+
+        self._admission_decision = {
+            "decision": decision,
+            "admitted": admit,
+            "running_services": running_services,
+            "waiting_tasks": waiting,
+            "projected_tasks": projected,
+            "active_managers": capacity["active_managers"],
+            "active_tasks": capacity["active_tasks"],
+            "throughput": throughput,
+            "low_watermark": low,
+            "high_watermark": high,
+            "tasks_per_service": self._service_task_estimate,
+        }
+
+        self.logger.debug(
+            f"Service admission: {decision}, {admit} new services ({waiting} waiting tasks, "
+            f"{capacity['active_tasks']} manager task slots, {throughput:.3f} tasks/s)."
+        )
+
+        return admit
+
+    def update_task_priorities(self, services: List["BaseService"]) -> int:
+        """Boosts the tasks gating the next iteration of the given services and ages all waiting tasks.
+
+        The tasks of a service with ``n`` outstanding tasks are raised by ``critical_path_tasks - n + 1``
+        priority levels above the service's task priority. Waiting tasks are raised by one level for every
+        ``priority_aging_time`` seconds they have waited. Both only affect the order in which waiting tasks are
+        handed out, see ``queue_get_next``.
+
+        Parameters
+        ----------
+        services : List[BaseService]
+            The services whose outstanding tasks may be boosted
+
+        Returns
+        -------
+        int
+            The number of tasks whose priority was raised
+        """
+
+        boosted = 0
+        for service in services:
+            base_results = list(service.task_manager.required_tasks.values())
+            if len(base_results) == 0:
+                continue
+
+            outstanding = self.storage.queue_count_tasks(
+                base_result=base_results, status=[TaskStatusEnum.waiting, TaskStatusEnum.running]
+            )
+
+            levels = self.critical_path_tasks - outstanding + 1
+            if (outstanding == 0) or (levels <= 0):
+                continue
+
+            boosted += self.storage.queue_boost_priority(base_results, int(service.task_priority) + levels)
+
+        if boosted:
+            self.logger.info(f"Boosted the priority of {boosted} critical path tasks.")
+
+        aged = self.storage.queue_age_priority(self.priority_aging_time)
+        if aged:
+            self.logger.info(f"Aged the priority of {aged} waiting tasks.")
+
+        return boosted
+
+    def update_views(self) -> int:
+        """
+        Writes the views of collections whose records, contributed values or results changed since their views
+        were written.
+
+        Returns
+        -------
+        int
+            The number of views written, or -1 if the previous update is still running
+        """
+
+        if self.view_builder is None:
+            raise AttributeError("View updates are only available if views and view updates are enabled.")
+
+        return self.view_builder.update()
+
     def update_server_log(self) -> Dict[str, Any]:
         """
         Updates the servers internal log
         """
 
-        return self.storage.log_server_stats()
+        return self.storage.log_server_stats(service_admission=self._admission_decision)
 
     def update_public_information(self) -> None:
         """
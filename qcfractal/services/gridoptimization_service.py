@@ -6,10 +6,12 @@ import json
 from typing import Dict, Set
 
 import numpy as np
+from pydantic import validator
+from qcelemental.models.types import Array
 
 from ..extras import get_information
 from ..interface.models import GridOptimizationRecord, Molecule
-from .service_util import BaseService, expand_ndimensional_grid
+from .service_util import BaseService, expand_ndimensional_grid, mark_ndimensional_grid
 
 __all__ = ["GridOptimizationService"]
 
@@ -29,9 +31,9 @@ class GridOptimizationService(BaseService):
 
     # Temporaries
     grid_optimizations: Dict[str, str] = {}
-    seeds: Set[tuple] = set()
-    complete: Set[tuple] = set()
     dimensions: tuple
+    seeds: Set[tuple] = set()
+    complete: Array[bool] = None
     iteration: int
     starting_grid: tuple
     final_energies = {}
@@ -45,6 +47,18 @@ class GridOptimizationService(BaseService):
     # keyword_template: KeywordSet
     starting_molecule: Molecule
 
+    @validator("complete", pre=True, always=True)
+    def _complete_grid(cls, v, values):
+        # Services created by older versions stored the complete grid points as a set
+        if isinstance(v, np.ndarray) and (v.dtype == bool):
+            # Arrays decoded from the database are read-only
+            return np.array(v, dtype=bool)
+
+        if "dimensions" not in values:
+            raise ValueError("The dimensions of the grid are required to build the complete grid.")
+
+        return mark_ndimensional_grid(np.zeros(values["dimensions"], dtype=bool), v or [])
+
     @classmethod
     def initialize_from_api(cls, storage_socket, logger, service_input, tag=None, priority=None):
 
@@ -146,9 +160,8 @@ class GridOptimizationService(BaseService):
 
             complete_tasks = self.task_manager.get_tasks()
 
-            self.starting_molecule = self.storage_socket.get_molecules(
-                id=[complete_tasks["initial_opt"]["final_molecule"]]
-            )["data"][0]
+            starting_id = complete_tasks["initial_opt"]["final_molecule"]
+            self.starting_molecule = self.storage_socket.get_cached_molecules([starting_id])[starting_id]
             self.starting_grid = self._calculate_starting_grid(self.output.keywords.scans, self.starting_molecule)
 
             self.submit_optimization_tasks({self.output.serialize_key(self.starting_grid): self.starting_molecule.id})
@@ -164,6 +177,10 @@ class GridOptimizationService(BaseService):
 
             return False
 
+        # Seed neighbors as soon as individual grid points complete
+        if self.output.keywords.wavefront:
+            return self._iterate_wavefront()
+
         # Check if tasks are done
         if self.task_manager.done() is False:
             return False
@@ -176,19 +193,13 @@ class GridOptimizationService(BaseService):
 
         # Build out nthe new set of seeds
         complete_seeds = set(tuple(json.loads(k)) for k in complete_tasks.keys())
-        self.complete |= complete_seeds
+        mark_ndimensional_grid(self.complete, complete_seeds)
         self.seeds = complete_seeds
-        # print("Complete", self.complete)
 
         # Compute new points
         new_points_list = expand_ndimensional_grid(self.dimensions, self.seeds, self.complete)
         # print(new_points_list)
 
-        # grid = np.zeros(self.dimensions, dtype=np.int)
-        # for x in self.complete:
-        #     grid[x] = 1
-        # print(grid)
-
         next_tasks = {}
         for new_points in new_points_list:
             old = self.output.serialize_key(new_points[0])
@@ -206,7 +217,50 @@ class GridOptimizationService(BaseService):
 
         return False
 
-    def submit_optimization_tasks(self, task_dict):
+    def _iterate_wavefront(self):
+        """
+        Processes the grid points whose optimizations have completed and immediately submits their uncomputed
+        neighbors while the remaining grid points are still running.
+        """
+
+        complete_tasks = self.task_manager.pop_complete_tasks()
+        for k, v in complete_tasks.items():
+            self.final_energies[k] = v["energies"][-1]
+            self.grid_optimizations[k] = v["id"]
+
+        # Grid points which are running remain in the task manager
+        running = set(tuple(json.loads(k)) for k in self.task_manager.required_tasks.keys())
+
+        complete_seeds = set(tuple(json.loads(k)) for k in complete_tasks.keys())
+        mark_ndimensional_grid(self.complete, complete_seeds)
+        self.seeds = complete_seeds
+
+        # Points which are complete or running have already been seeded
+        seeded = mark_ndimensional_grid(self.complete.copy(), running)
+        new_points_list = expand_ndimensional_grid(self.dimensions, self.seeds, seeded)
+
+        next_tasks = {}
+        for new_points in new_points_list:
+            old = self.output.serialize_key(new_points[0])
+            new = self.output.serialize_key(new_points[1])
+
+            next_tasks[new] = complete_tasks[old]["final_molecule"]
+
+        if len(next_tasks):
+            self.submit_optimization_tasks(next_tasks, append=True)
+
+        # All done
+        elif len(running) == 0:
+            self.status = "COMPLETE"
+            self.update_output()
+            return True
+
+        else:
+            self.update_output()
+
+        return False
+
+    def submit_optimization_tasks(self, task_dict, append=False):
 
         new_tasks = {}
 
@@ -235,7 +289,7 @@ class GridOptimizationService(BaseService):
 
             new_tasks[key] = packet
 
-        self.task_manager.submit_tasks("optimization", new_tasks)
+        self.task_manager.submit_tasks("optimization", new_tasks, append=append)
         self.grid_optimizations.update(self.task_manager.required_tasks)
 
         self.update_output()
@@ -4,8 +4,9 @@ Utilities and base functions for Services.
 
 import abc
 import datetime
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 
+import numpy as np
 from pydantic import validator
 from qcelemental.models import ComputeError
 
@@ -61,6 +62,38 @@ class TaskManager(ProtoModel):
         else:
             return False
 
+    def pop_complete_tasks(self) -> Dict[str, Any]:
+        """
+        Pulls the currently held tasks that have completed and stops tracking them.
+
+        Tasks which are still running are left in ``required_tasks`` so that they may be checked again later.
+        """
+
+        if len(self.required_tasks) == 0:
+            return {}
+
+        task_query = self.storage_socket.get_procedures(
+            id=list(self.required_tasks.values()), include=["id", "status"]
+        )
+
+        status_map = {x["id"]: x["status"] for x in task_query["data"]}
+        if "ERROR" in status_map.values():
+            raise KeyError("All tasks did not execute successfully.")
+
+        complete_keys = [k for k, id in self.required_tasks.items() if status_map.get(id, None) == "COMPLETE"]
+        if len(complete_keys) == 0:
+            return {}
+
+        # Pull all complete procedures in a single query
+        procedures = self.storage_socket.get_procedures(id=[self.required_tasks[k] for k in complete_keys])["data"]
+        procedure_map = {x["id"]: x for x in procedures}
+
+        ret = {}
+        for k in complete_keys:
+            ret[k] = procedure_map[self.required_tasks.pop(k)]
+
+        return ret
+
     def get_tasks(self) -> Dict[str, Any]:
         """
         Pulls currently held tasks.
@@ -72,9 +105,12 @@ class TaskManager(ProtoModel):
 
         return ret
 
-    def submit_tasks(self, procedure_type: str, tasks: Dict[str, Any]) -> bool:
+    def submit_tasks(self, procedure_type: str, tasks: Dict[str, Any], append: bool = False) -> bool:
         """
         Submits new tasks to the queue and provides a waiter until there are done.
+
+        If ``append`` is True the new tasks are tracked in addition to the currently held tasks,
+        otherwise they replace them.
         """
         procedure_parser = get_procedure_parser(procedure_type, self.storage_socket, self.logger)
 
@@ -95,7 +131,10 @@ class TaskManager(ProtoModel):
             # print("Submission:", r["data"])
             required_tasks[key] = r["data"]["ids"][0]
 
-        self.required_tasks = required_tasks
+        if append:
+            self.required_tasks = {**self.required_tasks, **required_tasks}
+        else:
+            self.required_tasks = required_tasks
 
         return True
 
@@ -173,12 +212,49 @@ class BaseService(ProtoModel, abc.ABC):
         """
 
 
+def _points_to_array(points: Iterable[Tuple[int, ...]], ndim: int) -> np.ndarray:
+    """
+    Converts an iterable of grid points into an (npoints, ndim) integer array, preserving their order.
+    """
+
+    points = list(points)
+    flat = np.fromiter((x for point in points for x in point), dtype=np.int64, count=len(points) * ndim)
+    return flat.reshape(-1, ndim)
+
+
+def mark_ndimensional_grid(grid: np.ndarray, points: Iterable[Tuple[int, ...]]) -> np.ndarray:
+    """
+    Marks the given points of a boolean grid in place. Points outside of the grid are ignored.
+
+    Example
+    -------
+    >>> mark_ndimensional_grid(np.zeros((2, 2), dtype=bool), {(0, 1), (2, 0)})
+    array([[False,  True],
+           [False, False]])
+    """
+
+    point_array = _points_to_array(points, grid.ndim)
+    in_grid = np.all((point_array >= 0) & (point_array < grid.shape), axis=1)
+    grid[tuple(point_array[in_grid].T)] = True
+
+    return grid
+
+
 def expand_ndimensional_grid(
-    dimensions: Tuple[int, ...], seeds: Set[Tuple[int, ...]], complete: Set[Tuple[int, ...]]
+    dimensions: Tuple[int, ...],
+    seeds: Set[Tuple[int, ...]],
+    complete: Union[Set[Tuple[int, ...]], np.ndarray],
 ) -> List[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
     """
     Expands an n-dimensional key/value grid.
 
+    Each seed is displaced by -1 and +1 along every dimension. Displaced points which lie outside of
+    the grid, are already complete, or were already reached by an earlier seed are dropped. The
+    connections are ordered by dimension, then by the iteration order of ``seeds``, then by displacement.
+
+    ``complete`` may either be a set of points or a boolean array of shape ``dimensions``, the latter
+    avoids converting the complete points on every call.
+
     Example
     -------
     >>> expand_ndimensional_grid((3, 3), {(1, 1)}, set())
@@ -186,35 +262,30 @@ def expand_ndimensional_grid(
     """
 
     dimensions = tuple(dimensions)
-    compute = set()
-    connections = []
+    ndim = len(dimensions)
+    if (ndim == 0) or (len(seeds) == 0):
+        return []
 
-    for d in range(len(dimensions)):
+    if not isinstance(complete, np.ndarray):
+        complete = mark_ndimensional_grid(np.zeros(dimensions, dtype=bool), complete)
 
-        # Loop over all compute seeds
-        for seed in seeds:
+    seed_array = _points_to_array(seeds, ndim)
 
-            # Iterate both directions
-            for disp in [-1, 1]:
-                new_dim = seed[d] + disp
+    # Candidates ordered as (dimension, seed, displacement)
+    eye = np.eye(ndim, dtype=np.int64)
+    displacements = np.stack([-eye, eye], axis=1)[:, None, :, :]
+    origins = np.broadcast_to(seed_array[None, :, None, :], (ndim, len(seed_array), 2, ndim)).reshape(-1, ndim)
+    candidates = (seed_array[None, :, None, :] + displacements).reshape(-1, ndim)
 
-                # Bound check
-                if new_dim >= dimensions[d]:
-                    continue
-                if new_dim < 0:
-                    continue
-
-                new = list(seed)
-                new[d] = new_dim
-                new = tuple(new)
+    # Bound check
+    mask = np.all((candidates >= 0) & (candidates < dimensions), axis=1)
+    origins, candidates = origins[mask], candidates[mask]
 
-                # Push out duplicates from both new compute and copmlete
-                if new in compute:
-                    continue
-                if new in complete:
-                    continue
+    # Push out complete points and keep the first connection to each new point
+    flat = np.ravel_multi_index(tuple(candidates.T), dimensions)
+    mask = ~complete.ravel()[flat]
+    origins, candidates, flat = origins[mask], candidates[mask], flat[mask]
 
-                compute |= {new}
-                connections.append((seed, new))
+    first = np.sort(np.unique(flat, return_index=True)[1])
 
-    return connections
+    return list(zip(map(tuple, origins[first].tolist()), map(tuple, candidates[first].tolist())))
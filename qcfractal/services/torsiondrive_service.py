@@ -141,6 +141,12 @@ class TorsionDriveService(BaseService):
 
         complete_tasks = self.task_manager.get_tasks()
 
+        # Lookup all molecules at once
+        mol_ids = []
+        for ret in complete_tasks.values():
+            mol_ids.extend([ret["initial_molecule"], ret["final_molecule"]])
+        mol_map = self.storage_socket.get_cached_molecules(mol_ids)
+
         # Populate task results
         task_results = {}
         for key, task_ids in self.task_map.items():
@@ -150,15 +156,10 @@ class TorsionDriveService(BaseService):
                 # Cycle through all tasks for this entry
                 ret = complete_tasks[task_id]
 
-                # Lookup molecules
-                initial_id = ret["initial_molecule"]
-                final_id = ret["final_molecule"]
-
-                mol_ids = [initial_id, final_id]
-                mol_data = self.storage_socket.get_molecules(id=mol_ids)["data"]
-                mol_map = {x.id: x.geometry for x in mol_data}
+                initial_mol = mol_map[ret["initial_molecule"]]
+                final_mol = mol_map[ret["final_molecule"]]
 
-                task_results[key].append((mol_map[initial_id], mol_map[final_id], ret["energies"][-1]))
+                task_results[key].append((initial_mol.geometry, final_mol.geometry, ret["energies"][-1]))
 
         # The torsiondrive package uses print, so capture that using
         # contextlib
@@ -96,12 +96,14 @@ class TaskQueries(QueryBase):
 
     def _task_counts(self):
 
+        # Submitted priorities next to the boost of the task priority policy, the oldest task in each group shows
+        # starvation
         sql_statement = f"""
-            SELECT tag, priority, status, count(*)
+            SELECT tag, priority, priority_boost, status, count(*), min(created_on) AS oldest
             FROM task_queue
             WHERE True
-            group by tag, priority, status
-            order by tag, priority, status
+            group by tag, priority, priority_boost, status
+            order by tag, priority, priority_boost, status
         """
 
         return self.execute_query(sql_statement, with_keys=True)
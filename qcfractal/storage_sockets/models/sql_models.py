@@ -79,6 +79,10 @@ class ServerStatsLogORM(Base):
     db_index_size = Column(BigInteger)
     db_table_information = Column(JSON)
 
+    # Services
+    service_admission = Column(JSON)
+    molecule_cache = Column(JSON)
+
     __table_args__ = (Index("ix_server_stats_log_timestamp", "timestamp"),)
 
 
@@ -189,6 +193,8 @@ class TaskQueueORM(Base):
 
     __tablename__ = "task_queue"
 
+    db_related_fields = Base.db_related_fields + ["priority_boost", "effective_priority"]
+
     id = Column(Integer, primary_key=True)
 
     spec = Column(MsgpackExt, nullable=False)
@@ -200,7 +206,13 @@ class TaskQueueORM(Base):
     procedure = Column(String)
     status = Column(Enum(TaskStatusEnum), default=TaskStatusEnum.waiting)
     priority = Column(Integer, default=int(PriorityEnum.NORMAL))
+    # Levels added to the submitted priority by the server's task priority policy, only used to order waiting tasks
+    priority_boost = Column(Integer, default=0, server_default="0", nullable=False)
+    # The submitted priority raised by the boost and by aging, kept up to date by the server so that waiting tasks
+    # can be handed out in this order through an index
+    effective_priority = Column(Integer, default=int(PriorityEnum.NORMAL), server_default="1", nullable=False)
     manager = Column(String, ForeignKey("queue_manager.name", ondelete="SET NULL"), default=None)
+    resources = Column(JSON)
 
     created_on = Column(DateTime, default=datetime.datetime.utcnow)
     modified_on = Column(DateTime, default=datetime.datetime.utcnow)
@@ -229,6 +241,7 @@ class TaskQueueORM(Base):
         Index("ix_task_queue_manager", "manager"),
         Index("ix_task_queue_base_result_id", "base_result_id"),
         Index("ix_task_waiting_sort", text("priority desc,  created_on")),
+        Index("ix_task_effective_sort", text("effective_priority desc,  created_on")),
     )
 
 
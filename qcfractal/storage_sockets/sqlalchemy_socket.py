@@ -3,7 +3,7 @@ SQLAlchemy Database class to handle access to Pstgres through ORM
 """
 
 try:
-    from sqlalchemy import create_engine, and_, or_, case, func
+    from sqlalchemy import create_engine, and_, or_, case, cast, func, Integer
     from sqlalchemy.exc import IntegrityError
     from sqlalchemy.orm import sessionmaker, with_polymorphic
     from sqlalchemy.sql.expression import desc
@@ -19,7 +19,7 @@ import secrets
 from collections.abc import Iterable
 from contextlib import contextmanager
 from datetime import datetime as dt
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
 
 import bcrypt
 
@@ -39,6 +39,7 @@ from qcfractal.interface.models import (
     prepare_basis,
 )
 from qcfractal.interface.models.records import RecordStatusEnum
+from qcfractal.interface.models.task_models import ManagerStatusEnum, PriorityEnum
 
 from qcfractal.storage_sockets.db_queries import QUERY_CLASSES
 from qcfractal.storage_sockets.models import (
@@ -63,7 +64,7 @@ from qcfractal.storage_sockets.models import (
     VersionsORM,
     WavefunctionStoreORM,
 )
-from qcfractal.storage_sockets.storage_utils import add_metadata_template, get_metadata_template
+from qcfractal.storage_sockets.storage_utils import MoleculeCache, add_metadata_template, get_metadata_template
 
 from .models import Base
 
@@ -170,6 +171,7 @@ class SQLAlchemySocket:
         sql_echo: bool = False,
         max_limit: int = 1000,
         skip_version_check: bool = False,
+        molecule_cache_size: int = 10000,
     ):
         """
         Constructs a new SQLAlchemy socket
@@ -188,6 +190,12 @@ class SQLAlchemySocket:
 
         self._lower_results_index = ["method", "basis", "program"]
 
+        # In-process cache of molecules used by the services
+        self.molecule_cache = MoleculeCache(maxsize=molecule_cache_size)
+
+        # Called whenever tasks may have become available to managers
+        self._queue_listeners = []
+
         # disconnect from any active default connection
         # disconnect()
         if "psycopg2" not in uri:
@@ -610,10 +618,8 @@ class SQLAlchemySocket:
 
         id_mols.update({k: v for k, v in zip(flat_mol_keys, flat_mols)})
 
-        # Get molecules by index and translate back to dict
-        tmp = self.get_molecules(list(id_mols.values()))
-        id_mols_list = tmp["data"]
-        meta["errors"].extend(tmp["meta"]["errors"])
+        # Get molecules by index through the cache, services pass the molecules of previous iterations by id
+        id_mols_list = list(self.get_cached_molecules(list(id_mols.values())).values())
 
         # TODO - duplicate ids get removed on the line below. Some
         # code may depend on this behavior, so careful changing it
@@ -769,6 +775,32 @@ class SQLAlchemySocket:
 
         return {"meta": meta, "data": data}
 
+    def get_cached_molecules(self, id: List[ObjectId]) -> Dict[str, Molecule]:
+        """
+        Gets molecules by id through the in-process molecule cache.
+
+        All molecules missing from the cache are fetched with a single query.
+
+        Parameters
+        ----------
+        id : List[ObjectId]
+            The ids of the molecules
+
+        Returns
+        -------
+        Dict[str, Molecule]
+            The found molecules keyed by the given ids
+        """
+
+        found, missing = self.molecule_cache.get(id)
+
+        if missing:
+            fetched = self.get_molecules(id=missing)["data"]
+            self.molecule_cache.put(fetched)
+            found.update({str(mol.id): mol for mol in fetched})
+
+        return {i: found[str(i)] for i in id if str(i) in found}
+
     def del_molecules(self, id: List[str] = None, molecule_hash: List[str] = None):
         """
         Removes a molecule from the database from its hash.
@@ -791,6 +823,11 @@ class SQLAlchemySocket:
         with self.session_scope() as session:
             ret = session.query(MoleculeORM).filter(*query).delete(synchronize_session=False)
 
+        if (id is not None) and (molecule_hash is None):
+            self.molecule_cache.evict([id] if isinstance(id, (int, str)) else id)
+        else:
+            self.molecule_cache.clear()
+
         return ret
 
     # ~~~~~~~~~~~~~~~~~~~~~~~ Keywords ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -1135,6 +1172,33 @@ class SQLAlchemySocket:
             count = session.query(CollectionORM).filter_by(**filter_spec).delete(synchronize_session=False)
         return count
 
+    def update_collection_view(self, col_id: int, view_metadata: Dict[str, Any], view_available: bool = True) -> int:
+        """
+        Updates the view fields of a collection, without rewriting its records.
+
+        Parameters
+        ----------
+        col_id: int
+            Database id of the collection
+        view_metadata: Dict[str, Any]
+            The metadata of the view, such as its checksum
+        view_available: bool, optional
+            Whether the server has a view of the collection
+
+        Returns
+        -------
+        int
+            Number of collections updated
+        """
+
+        with self.session_scope() as session:
+            count = (
+                session.query(CollectionORM)
+                .filter_by(id=col_id)
+                .update(dict(view_metadata=view_metadata, view_available=view_available), synchronize_session=False)
+            )
+        return count
+
     ## ResultORMs functions
 
     def add_results(self, record_list: List[ResultRecord]):
@@ -1340,6 +1404,35 @@ class SQLAlchemySocket:
 
         return updated_count
 
+    def get_results_summary(self, molecule: List[ObjectId]) -> Dict[str, Any]:
+        """
+        Summarizes the complete results of a set of molecules in a single query.
+
+        Parameters
+        ----------
+        molecule : List[ObjectId]
+            The ids of the molecules
+
+        Returns
+        -------
+        Dict[str, Any]
+            The number of complete results (``n_results``) and the time the last of them was modified
+            (``modified_on``), which is None if there are none
+        """
+
+        if not molecule:
+            return {"n_results": 0, "modified_on": None}
+
+        with self.session_scope() as session:
+            row = (
+                session.query(func.count(ResultORM.id), func.max(ResultORM.modified_on))
+                .filter(ResultORM.molecule.in_([int(x) for x in molecule]))
+                .filter(ResultORM.status == RecordStatusEnum.complete)
+                .one()
+            )
+
+        return {"n_results": row[0], "modified_on": row[1]}
+
     def get_results_count(self):
         """
         TODO: just return the count, used for big queries
@@ -2117,6 +2210,7 @@ class SQLAlchemySocket:
                     task = TaskQueueORM(**task_dict)
                     new_idx.append(task_num)
                     task.priority = task.priority.value
+                    task.effective_priority = task.priority
                     # append all the new tasks that should be added
                     new_tasks.append(task)
                     # add the (yet to be) inserted object id to dictionary
@@ -2135,39 +2229,29 @@ class SQLAlchemySocket:
                 if not isinstance(results[i], str):
                     results[i] = str(results[i].id)
 
+        if new_tasks:
+            self._notify_queue_listeners()
+
         meta["success"] = True
 
         ret = {"data": results, "meta": meta}
         return ret
 
     def queue_get_next(
-        self, manager, available_programs, available_procedures, limit=100, tag=None
+        self, manager, available_programs, available_procedures, limit=100, tag=None, effective_priority=False
     ) -> List[TaskRecord]:
         """Obtain tasks for a manager
 
         Given tags and available programs/procedures on the manager, obtain
         waiting tasks to run.
-        """
 
-        proc_filt = TaskQueueORM.procedure.in_([p.lower() for p in available_procedures])
-        none_filt = TaskQueueORM.procedure == None  # lgtm [py/test-equals-none]
-
-        order_by = []
-        if tag is not None:
-            if isinstance(tag, str):
-                tag = [tag]
+        If effective_priority is True, tasks are ordered by their effective priority: the submitted priority raised
+        by their priority boost and by their aging, see `queue_boost_priority` and `queue_age_priority`. Otherwise
+        they are ordered by the submitted priority only. Either order is read from an index.
+        """
 
-        order_by.extend([TaskQueueORM.priority.desc(), TaskQueueORM.created_on])
-        queries = []
-        if tag is not None:
-            for t in tag:
-                query = format_query(TaskQueueORM, status=TaskStatusEnum.waiting, program=available_programs, tag=t)
-                query.append(or_(proc_filt, none_filt))
-                queries.append(query)
-        else:
-            query = format_query(TaskQueueORM, status=TaskStatusEnum.waiting, program=available_programs)
-            query.append((or_(proc_filt, none_filt)))
-            queries.append(query)
+        order_by = self._queue_order_by(effective_priority)
+        queries = self._queue_waiting_filters(available_programs, available_procedures, tag)
 
         new_limit = limit
         found = []
@@ -2222,6 +2306,61 @@ class SQLAlchemySocket:
 
         return found
 
+    def add_queue_listener(self, callback: Callable[[], None]) -> None:
+        """Registers a function called, possibly from any thread, after tasks were added or reset to waiting"""
+
+        self._queue_listeners.append(callback)
+
+    def _notify_queue_listeners(self) -> None:
+        for callback in self._queue_listeners:
+            try:
+                callback()
+            except Exception:
+                self.logger.exception("QUEUE: Queue listener failed.")
+
+    @staticmethod
+    def _queue_order_by(effective_priority=False):
+        """The order in which waiting tasks are handed out, each matches an index of the task queue"""
+
+        if effective_priority:
+            return [TaskQueueORM.effective_priority.desc(), TaskQueueORM.created_on]
+        else:
+            return [TaskQueueORM.priority.desc(), TaskQueueORM.created_on]
+
+    def queue_has_waiting(self, available_programs, available_procedures, tag=None) -> bool:
+        """Checks whether waiting tasks remain for a manager with the given tags and programs/procedures"""
+
+        queries = self._queue_waiting_filters(available_programs, available_procedures, tag)
+        with self.session_scope() as session:
+            for q in queries:
+                if session.query(session.query(TaskQueueORM.id).filter(*q).exists()).scalar():
+                    return True
+
+        return False
+
+    @staticmethod
+    def _queue_waiting_filters(available_programs, available_procedures, tag=None):
+        """Forms the filters of the waiting tasks a manager can run, one set of filters per tag in order"""
+
+        proc_filt = TaskQueueORM.procedure.in_([p.lower() for p in available_procedures])
+        none_filt = TaskQueueORM.procedure == None  # lgtm [py/test-equals-none]
+
+        queries = []
+        if tag is not None:
+            if isinstance(tag, str):
+                tag = [tag]
+
+            for t in tag:
+                query = format_query(TaskQueueORM, status=TaskStatusEnum.waiting, program=available_programs, tag=t)
+                query.append(or_(proc_filt, none_filt))
+                queries.append(query)
+        else:
+            query = format_query(TaskQueueORM, status=TaskStatusEnum.waiting, program=available_programs)
+            query.append((or_(proc_filt, none_filt)))
+            queries.append(query)
+
+        return queries
+
     def get_queue(
         self,
         id=None,
@@ -2496,6 +2635,9 @@ class SQLAlchemySocket:
                 .update(dict(status=TaskStatusEnum.waiting, modified_on=dt.utcnow()), synchronize_session=False)
             )
 
+        if updated:
+            self._notify_queue_listeners()
+
         return updated
 
     def reset_base_result_status(
@@ -2586,6 +2728,113 @@ class SQLAlchemySocket:
                 .update(update_dict, synchronize_session=False)
             )
 
+        # A new tag may match other managers
+        if updated:
+            self._notify_queue_listeners()
+
+        return updated
+
+    def queue_count_tasks(
+        self, base_result: Union[str, List[str]] = None, status: Union[str, List[str]] = None
+    ) -> int:
+        """
+        Counts the tasks in the queue matching the given base results and statuses.
+
+        Parameters
+        ----------
+        base_result : Optional[Union[str, List[str]]], optional
+            The id of the base result of the tasks
+        status : Optional[Union[str, List[str]]], optional
+            The status of the tasks: 'RUNNING', 'WAITING', or 'ERROR'
+
+        Returns
+        -------
+        int
+            The number of matching tasks
+        """
+
+        query = format_query(TaskQueueORM, base_result_id=base_result, status=status)
+
+        with self.session_scope() as session:
+            count = get_count_fast(session.query(TaskQueueORM).filter(*query))
+
+        return count
+
+    def queue_boost_priority(self, base_result: Union[str, List[str]], priority: int) -> int:
+        """
+        Raises the effective priority of waiting tasks to at least the given priority.
+
+        Only the priority boost and the effective priority of the tasks are modified, their submitted priority is
+        kept. Tasks which already have an equal or higher priority boost (excluding aging) are not modified.
+
+        Parameters
+        ----------
+        base_result : Union[str, List[str]]
+            The id of the base result of the tasks to boost
+        priority : int
+            The minimum effective priority the tasks should have
+
+        Returns
+        -------
+        int
+            Updated count
+        """
+
+        if not base_result:
+            return 0
+
+        priority = int(priority)
+        query = format_query(TaskQueueORM, base_result_id=base_result, status=TaskStatusEnum.waiting)
+
+        with self.session_scope() as session:
+            updated = (
+                session.query(TaskQueueORM)
+                .filter(*query)
+                .filter(TaskQueueORM.priority + TaskQueueORM.priority_boost < priority)
+                .update(
+                    {
+                        "priority_boost": priority - TaskQueueORM.priority,
+                        "effective_priority": TaskQueueORM.effective_priority
+                        + (priority - TaskQueueORM.priority - TaskQueueORM.priority_boost),
+                    },
+                    synchronize_session=False,
+                )
+            )
+
+        return updated
+
+    def queue_age_priority(self, priority_aging_time: float) -> int:
+        """
+        Ages the effective priority of waiting tasks by one level for every priority_aging_time seconds they have
+        waited since they were created.
+
+        The effective priority is stored so that `queue_get_next` reads its order from an index, tasks therefore
+        only age when this is called. Every waiting task is examined, but only tasks which reached a new level
+        are written.
+
+        Parameters
+        ----------
+        priority_aging_time : float
+            The time (in seconds) a waiting task must wait to be raised by a single priority level
+
+        Returns
+        -------
+        int
+            Updated count
+        """
+
+        waited = func.extract("epoch", dt.utcnow() - TaskQueueORM.created_on)
+        aged = TaskQueueORM.priority + TaskQueueORM.priority_boost + cast(
+            func.floor(waited / float(priority_aging_time)), Integer
+        )
+
+        with self.session_scope() as session:
+            updated = (
+                session.query(TaskQueueORM)
+                .filter(TaskQueueORM.status == TaskStatusEnum.waiting, TaskQueueORM.effective_priority < aged)
+                .update({"effective_priority": aged}, synchronize_session=False)
+            )
+
         return updated
 
     def del_tasks(self, id: Union[str, list]):
@@ -2717,6 +2966,30 @@ class SQLAlchemySocket:
 
         return {"data": data, "meta": meta}
 
+    def get_manager_capacity(self) -> Dict[str, int]:
+        """
+        Summarizes the compute capacity of the active managers in a single query.
+
+        Returns
+        -------
+        Dict[str, int]
+            The number of active managers (``active_managers``), the number of task slots
+            they report (``active_tasks``) and the number of tasks returned by all managers
+            ever registered (``completed``). The latter is monotonic and may be differenced over
+            time to obtain the task throughput.
+        """
+
+        active = QueueManagerORM.status == ManagerStatusEnum.active
+
+        with self.session_scope() as session:
+            row = session.query(
+                func.count(case([(active, 1)])),
+                func.sum(case([(active, QueueManagerORM.active_tasks)], else_=0)),
+                func.sum(QueueManagerORM.completed + QueueManagerORM.failures),
+            ).one()
+
+        return {"active_managers": row[0] or 0, "active_tasks": row[1] or 0, "completed": row[2] or 0}
+
     def get_manager_logs(self, manager_ids: Union[List[str], str], timestamp_after=None, limit=None, skip=0):
         meta = get_metadata_template()
         query = format_query(QueueManagerLogORM, manager_id=manager_ids)
@@ -3086,7 +3359,7 @@ class SQLAlchemySocket:
 
         return count
 
-    def log_server_stats(self):
+    def log_server_stats(self, service_admission: Optional[Dict[str, Any]] = None):
 
         table_info = self.custom_query("database_stats", "table_information")["data"]
 
@@ -3122,6 +3395,8 @@ class SQLAlchemySocket:
             "db_table_size": table_size,
             "db_index_size": index_size,
             "db_table_information": table_info,
+            "service_admission": service_admission,
+            "molecule_cache": self.molecule_cache.stats(),
         }
 
         with self.session_scope() as session:
@@ -3,6 +3,9 @@ Contains a number of utility functions for storage sockets.
 """
 
 import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Tuple
 
 # Constants
 _get_metadata = json.dumps({"errors": [], "n_found": 0, "success": False, "missing": [], "error_description": False})
@@ -31,3 +34,86 @@ def add_metadata_template():
     Returns a copy of the metadata for database save/updates.
     """
     return json.loads(_add_metadata)
+
+
+class MoleculeCache:
+    """
+    A bounded, thread-safe LRU cache of Molecules keyed by their id.
+
+    Molecules are immutable once inserted so entries only need to be evicted when
+    the cache is full or the molecule is deleted.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, ids: Iterable[str]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Looks up the given molecule ids.
+
+        Returns
+        -------
+        Tuple[Dict[str, Any], List[str]]
+            The cached molecules keyed by id and the unique ids which were not cached
+        """
+
+        found = {}
+        missing = []
+        with self._lock:
+            for i in ids:
+                i = str(i)
+                if (i in found) or (i in missing):
+                    continue
+
+                mol = self._data.get(i, None)
+                if mol is None:
+                    missing.append(i)
+                else:
+                    self._data.move_to_end(i)
+                    found[i] = mol
+
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        return found, missing
+
+    def put(self, molecules: Iterable[Any]) -> None:
+        """
+        Adds molecules to the cache, evicting the least recently used ones beyond the maximum size.
+        """
+
+        with self._lock:
+            for mol in molecules:
+                self._data[str(mol.id)] = mol
+                self._data.move_to_end(str(mol.id))
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def evict(self, ids: Iterable[str]) -> None:
+        """
+        Removes the given molecule ids from the cache.
+        """
+
+        with self._lock:
+            for i in ids:
+                self._data.pop(str(i), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the size and hit/miss counters of the cache.
+        """
+
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
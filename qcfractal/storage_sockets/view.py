@@ -1,30 +1,54 @@
+import hashlib
 import io
+import json
+import logging
+import os
 import pathlib
-from typing import Any, Dict, Union
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, DefaultDict, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 from qcelemental.util.serialization import serialize
 
-from ..interface.collections import HDF5View
+from ..interface import FractalClient
+from ..interface.collections import ArrowView, Dataset, DatasetView, HDF5View, ReactionDataset
+from ..interface.collections.dataset_view import open_view
+from ..interface.models.rest_models import rest_model
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .sqlalchemy_socket import SQLAlchemySocket
 
 
 class ViewHandler:
-    def __init__(self, path: Union[str, pathlib.Path]) -> None:
+    def __init__(self, path: Union[str, pathlib.Path], cache_size: int = 128) -> None:
         """
         Parameters
         ----------
         path: Union[str, Path]
             Directory containing dataset views
+        cache_size: int, optional
+            Number of serialized responses kept in memory, 0 disables the cache
         """
-        self._view_cache: Dict[int, HDF5View] = {}
+        self._view_cache: Dict[int, DatasetView] = {}
+
+        # Views are immutable until they are regenerated, so responses are keyed by the hash of the view file.
+        # Hashes are recomputed only when the file changes on disk.
+        self._view_hashes: Dict[int, Tuple[Tuple[int, int, int], str]] = {}
+        self._response_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
         self._path = pathlib.Path(path)
         if not self._path.is_dir():
             raise ValueError(f"Path in ViewHandler must be a directory, got: {self._path}")
 
     def view_path(self, collection_id: int) -> pathlib.Path:
         """
-        Returns the path to a view corresponding to a collection identified by an id.
+        Returns the path to a view corresponding to a collection identified by an id. Arrow views are served in
+        preference to HDF5 views of the same collection.
 
         Parameters
         ----------
@@ -37,6 +61,9 @@ class ViewHandler:
             Path of requested view
         """
 
+        arrow_path = self._path / f"{collection_id}.arrow"
+        if arrow_path.is_file():
+            return arrow_path
         return self._path / f"{collection_id}.hdf5"
 
     def view_exists(self, collection_id: int) -> bool:
@@ -56,12 +83,51 @@ class ViewHandler:
 
         return self.view_path(collection_id).is_file()
 
-    def _get_view(self, collection_id: int):
-        if collection_id not in self._view_cache:
-            if not self.view_exists(collection_id):
+    def _get_view(self, collection_id: int) -> DatasetView:
+        path = self.view_path(collection_id)
+        view = self._view_cache.get(collection_id)
+        if view is None or view._path != path:
+            if not path.is_file():
                 raise IOError
-            self._view_cache[collection_id] = HDF5View(self.view_path(collection_id))
-        return self._view_cache[collection_id]
+            view = self._view_cache[collection_id] = open_view(path)
+        return view
+
+    def _view_hash(self, collection_id: int) -> str:
+        stat = os.stat(self.view_path(collection_id))
+        file_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        cached = self._view_hashes.get(collection_id)
+        if cached is None or cached[0] != file_stat:
+            cached = (file_stat, self._get_view(collection_id).hash())
+            self._view_hashes[collection_id] = cached
+
+        return cached[1]
+
+    def etag(self, collection_id: int, request: str, model: Dict[str, Any]) -> Optional[str]:
+        """
+        Returns the ETag of the response to a view request, which changes only when the view is regenerated.
+
+        Parameters
+        ----------
+        collection_id: int
+            Collection id corresponding to a view.
+        request: str
+            Requested data, see handle_request
+        model:
+            REST model containing input options.
+
+        Returns
+        -------
+        Optional[str]
+            The quoted ETag, or None if the view does not exist
+        """
+
+        if not self.view_exists(collection_id):
+            return None
+
+        params = json.dumps(model, sort_keys=True, default=str)
+        key = f"{self._view_hash(collection_id)}:{request}:{params}"
+        return '"' + hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '"'
 
     def handle_request(self, collection_id: int, request: str, model: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -86,7 +152,32 @@ class ViewHandler:
         Dict[str, Any]:
             Dictionary corresponding to requested REST model
         """
-        meta = {"errors": [], "success": False, "error_description": False, "msgpacked_cols": []}
+
+        etag = self.etag(collection_id, request, model)
+        if etag is None or self._cache_size <= 0:
+            return self._handle_request(collection_id, request, model, etag)
+
+        with self._cache_lock:
+            response = self._response_cache.get(etag)
+            if response is not None:
+                self._response_cache.move_to_end(etag)
+                return response
+
+        response = self._handle_request(collection_id, request, model, etag)
+
+        # Failures are not cached, for example a missing entry may be added when the view is regenerated
+        if response["meta"]["success"]:
+            with self._cache_lock:
+                self._response_cache[etag] = response
+                while len(self._response_cache) > self._cache_size:
+                    self._response_cache.popitem(last=False)
+
+        return response
+
+    def _handle_request(
+        self, collection_id: int, request: str, model: Dict[str, Any], etag: Optional[str]
+    ) -> Dict[str, Any]:
+        meta = {"errors": [], "success": False, "error_description": False, "msgpacked_cols": [], "etag": etag}
 
         try:
             view = self._get_view(collection_id)
@@ -145,3 +236,263 @@ class ViewHandler:
         meta["success"] = True
 
         return {"meta": meta, "data": data}
+
+
+class StorageClient(FractalClient):
+    """
+    A read-only client which answers queries from a storage socket directly, rather than through the REST API of a
+    server. Collections built with this client can be read, for example to write their views, within the server.
+    """
+
+    def __init__(self, storage_socket: "SQLAlchemySocket", server_info: Dict[str, Any], address: str) -> None:
+        """
+        Parameters
+        ----------
+        storage_socket: SQLAlchemySocket
+            The storage socket of the server
+        server_info: Dict[str, Any]
+            The public information of the server
+        address: str
+            The address of the server
+        """
+
+        self.address = address
+        self.username = None
+        self.encoding = "msgpack-ext"
+        self._storage = storage_socket
+        self._request_counter: DefaultDict[Tuple[str, str], int] = defaultdict(int)
+
+        self.server_info = server_info
+        self.server_name = self.server_info["name"]
+        self.query_limit: int = self.server_info["query_limit"]
+
+    def _automodel_request(
+        self,
+        name: str,
+        rest: str,
+        payload: Dict[str, Any],
+        full_return: bool = False,
+        timeout: int = None,
+        etag: Optional[str] = None,
+    ) -> Any:
+        sname = name.strip("/")
+        self._request_counter[(sname, rest)] += 1
+
+        if rest != "get" or sname not in self._queries:
+            raise NotImplementedError(f"StorageClient does not support the {rest.upper()} {sname} request.")
+
+        body_model, response_model = rest_model(sname, rest)
+        body = body_model(**payload)
+        response = response_model(**self._queries[sname](self._storage, body))
+
+        if full_return:
+            return response
+        else:
+            return response.data
+
+    # The storage calls of the read handlers of the server, see web_handlers
+    _queries = {
+        "collection": lambda storage, body: storage.get_collections(
+            **body.data.dict(), include=body.meta.include, exclude=body.meta.exclude
+        ),
+        "keyword": lambda storage, body: storage.get_keywords(
+            **{**body.data.dict(), **body.meta.dict()}, with_ids=False
+        ),
+        "molecule": lambda storage, body: storage.get_molecules(**{**body.data.dict(), **body.meta.dict()}),
+        "procedure": lambda storage, body: storage.get_procedures(**{**body.data.dict(), **body.meta.dict()}),
+        "result": lambda storage, body: storage.get_results(**{**body.data.dict(), **body.meta.dict()}),
+    }
+
+
+class ViewBuilder:
+    """
+    Writes the views of collections in the directory of a ViewHandler, directly from the database.
+
+    A view is written again when the records or contributed values of its collection change, or when results of the
+    molecules of the collection are completed. The fingerprint of these is stored in the view metadata of the
+    collection, and compared with the database on every update.
+    """
+
+    _collection_types = {"dataset": Dataset, "reactiondataset": ReactionDataset}
+
+    def __init__(
+        self,
+        storage_socket: "SQLAlchemySocket",
+        view_handler: ViewHandler,
+        client: StorageClient,
+        max_builds: int = 1,
+        time_budget: float = 600,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        storage_socket: SQLAlchemySocket
+            The storage socket of the server
+        view_handler: ViewHandler
+            The view handler of the server, views are written in its directory
+        client: StorageClient
+            Client used to read the collections
+        max_builds: int, optional
+            Maximum number of views written at the same time
+        time_budget: float, optional
+            Seconds of view writing per update, later views are written by the next update. 0 disables the budget.
+        logger: Optional[logging.Logger], optional
+            Logger of the server
+        """
+
+        self.storage = storage_socket
+        self.view_handler = view_handler
+        self.client = client
+        self.max_builds = max_builds
+        self.time_budget = time_budget
+        self.logger = logger or logging.getLogger("ViewBuilder")
+
+        self._executor = ThreadPoolExecutor(max_workers=max_builds)
+        self._update_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Waits for the views being written, no further views are written"""
+        self._executor.shutdown()
+
+    def stale_collections(self) -> List[Tuple[int, str]]:
+        """
+        Finds the collections whose view is missing or out of date.
+
+        Returns
+        -------
+        List[Tuple[int, str]]
+            The ids of the collections and their current fingerprints
+        """
+
+        stale = []
+        for collection in self._collection_types:
+            rows = self.storage.get_collections(
+                collection=collection,
+                include=["id", "records", "contributed_values", "history", "view_metadata"],
+            )["data"]
+            for row in rows:
+                fingerprint = self.fingerprint(collection, row)
+                view_metadata = row.get("view_metadata") or {}
+                if (
+                    not self.view_handler.view_exists(row["id"])
+                    or view_metadata.get("fingerprint") != fingerprint
+                    or view_metadata.get("blake2b_checksum") != self.view_handler._view_hash(row["id"])
+                ):
+                    stale.append((row["id"], fingerprint))
+
+        return stale
+
+    def fingerprint(self, collection: str, row: Dict[str, Any]) -> str:
+        """
+        Returns the fingerprint of the data of a collection in the database.
+
+        Parameters
+        ----------
+        collection: str
+            The type of the collection
+        row: Dict[str, Any]
+            The records, contributed values and history of the collection
+
+        Returns
+        -------
+        str
+            The fingerprint
+        """
+
+        records = row.get("records") or []
+        if collection == "dataset":
+            molecules = {record["molecule_id"] for record in records}
+        else:
+            molecules = {
+                mol_id for record in records for stoich in record["stoichiometry"].values() for mol_id in stoich
+            }
+
+        # Any complete result of the molecules counts, even if it does not match the history of the collection
+        summary = self.storage.get_results_summary(sorted(molecules, key=int))
+        state = [row.get("records"), row.get("contributed_values"), row.get("history"), summary]
+        return hashlib.blake2b(json.dumps(state, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+    def update(self) -> int:
+        """
+        Writes the views of the collections changed since their views were written, up to the time budget.
+
+        Returns
+        -------
+        int
+            The number of views written, or -1 if an update was already in progress
+        """
+
+        # Updates may take longer than the update period, but do not overlap
+        if not self._update_lock.acquire(blocking=False):
+            return -1
+
+        try:
+            stale = self.stale_collections()
+            start = time.time()
+            futures = []
+            for col_id, fingerprint in stale:
+                # Builds are queued as workers free up, so that the budget is checked before each of them starts
+                while len([future for future in futures if not future.done()]) >= self.max_builds:
+                    wait(futures, return_when=FIRST_COMPLETED)
+                if self.time_budget > 0 and (time.time() - start) > self.time_budget:
+                    self.logger.info(f"ViewBuilder: time budget exhausted, {len(stale) - len(futures)} views deferred.")
+                    break
+                futures.append(self._executor.submit(self.build, col_id, fingerprint))
+
+            n_built = 0
+            for future in futures:
+                try:
+                    future.result()
+                    n_built += 1
+                except Exception:
+                    self.logger.exception("ViewBuilder: failed to write a view.")
+
+            return n_built
+        finally:
+            self._update_lock.release()
+
+    def build(self, col_id: int, fingerprint: str) -> str:
+        """
+        Writes the view of a collection and updates its view metadata.
+
+        Parameters
+        ----------
+        col_id: int
+            Database id of the collection
+        fingerprint: str
+            The fingerprint of the collection, see fingerprint
+
+        Returns
+        -------
+        str
+            The Blake2b hash of the view
+        """
+
+        collection = self.storage.get_collections(col_id=col_id, include=["collection"])["data"][0]["collection"]
+        data = self.storage.get_collections(col_id=col_id)["data"][0]
+        ds = self._collection_types[collection].from_json(data, client=self.client)
+        ds._disable_view = True
+
+        # Views are written aside and moved into place, so that they are never served half written
+        hdf5_path = self.view_handler._path / f"{col_id}.hdf5"
+        tmp_path = hdf5_path.with_suffix(".hdf5.tmp")
+        view = HDF5View(tmp_path)
+        view.write(ds)
+        view.close()
+        os.replace(tmp_path, hdf5_path)
+
+        # Arrow views are served in preference to HDF5 views, and are kept in step with them
+        arrow_path = hdf5_path.with_suffix(".arrow")
+        if arrow_path.is_file():
+            tmp_path = arrow_path.with_suffix(".arrow.tmp")
+            hdf5_view = HDF5View(hdf5_path)
+            ArrowView(tmp_path).write_view(hdf5_view)
+            hdf5_view.close()
+            os.replace(tmp_path, arrow_path)
+
+        checksum = self.view_handler._view_hash(col_id)
+        self.storage.update_collection_view(col_id, {"blake2b_checksum": checksum, "fingerprint": fingerprint})
+        self.logger.info(f"ViewBuilder: wrote the view of collection #{col_id}.")
+
+        return checksum
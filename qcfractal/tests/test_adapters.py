@@ -2,6 +2,7 @@
 Explicit tests for queue manipulation.
 """
 
+import json
 import logging
 import tempfile
 import time
@@ -11,6 +12,7 @@ import pytest
 import qcfractal.interface as ptl
 from qcfractal import QueueManager, testing
 from qcfractal.queue import build_queue_adapter
+from qcfractal.queue.executor_adapter import DaskAdapter, ExecutorAdapter, _encode_task
 from qcfractal.testing import (
     adapter_client_fixture,
     build_adapter_clients,
@@ -28,6 +30,71 @@ def test_adapter_client_active_task_slots(adapter_client_fixture):
         pytest.xfail("Active task slot counting is not yet available.")
 
 
+def test_adapter_completion_callback(adapter_client_fixture):
+
+    adapter = build_queue_adapter(adapter_client_fixture)
+    if not isinstance(adapter, (ExecutorAdapter, DaskAdapter)):
+        pytest.skip("Adapter does not signal task completion.")
+
+    notified = []
+    adapter.completion_callback = notified.append
+
+    tasks = [{"id": f"sqrt-{x}", "spec": {"function": "math.sqrt", "args": [x], "kwargs": {}}} for x in (4, 9)]
+    adapter.submit_tasks(tasks)
+    adapter.await_results()
+
+    # Finished tasks are pulled from the completed queue rather than by polling
+    timeout = time.time() + 10
+    while len(notified) < 2 and time.time() < timeout:
+        time.sleep(0.05)
+    assert sorted(notified) == [1, 2]
+
+    assert adapter.acquire_complete() == {"sqrt-4": 2.0, "sqrt-9": 3.0}
+    assert adapter.acquire_complete() == {}
+    assert adapter.task_count() == 0
+
+
+@testing.using_rdkit
+def test_adapter_task_overhead():
+
+    from multiprocessing import Pool
+
+    from qcfractal.cli.qcfractal_manager import _initialize_warm_process_pool
+
+    with Pool(processes=1, initializer=_initialize_warm_process_pool, initargs=(["rdkit"],)) as pool:
+        adapter = build_queue_adapter(pool)
+        task = {
+            "id": "hooh",
+            "spec": {
+                "function": "qcengine.compute",
+                "args": [
+                    {
+                        "molecule": json.loads(ptl.data.get_molecule("hooh.json").json()),
+                        "driver": "energy",
+                        "model": {"method": "UFF"},
+                        "keywords": {},
+                    },
+                    "rdkit",
+                ],
+                "kwargs": {},
+            },
+        }
+
+        # Plain tasks, as sent by the server, are handed to the worker as msgpack
+        assert isinstance(_encode_task(task["spec"]["function"], task["spec"]["args"], task["spec"]["kwargs"]), bytes)
+
+        adapter.submit_tasks([task])
+        adapter.await_results()
+        result = adapter.acquire_complete()["hooh"]
+
+    # The worker time is split into the computation and its overhead
+    assert adapter.total_task_time > 0
+    assert 0 <= adapter.total_task_overhead <= adapter.total_task_time
+    if result.success:
+        assert adapter.total_task_overhead < adapter.total_task_time
+        assert adapter.task_overheads["hooh"] == adapter.total_task_overhead
+
+
 @testing.using_rdkit
 def test_adapter_single(managed_compute_server):
     client, server, manager = managed_compute_server
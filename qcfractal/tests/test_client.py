@@ -160,3 +160,70 @@ def test_custom_queries(test_server, encoding):
 
     assert ret.meta.success
     assert ret.meta.n_found == 0
+
+
+def test_client_record_cache(test_server, tmp_path):
+
+    client = ptl.FractalClient(test_server, cache_dir=str(tmp_path))
+
+    mols = [ptl.Molecule(symbols=["He", "He"], geometry=[0, 0, 0, 0, 0, x]) for x in np.random.rand(3) + 3]
+    mol_ids = client.add_molecules(mols)
+    kw_ids = client.add_keywords([ptl.models.KeywordSet(values={"cache": str(tmp_path)})])
+
+    records = []
+    for status, mol_id in [("COMPLETE", mol_ids[0]), ("INCOMPLETE", mol_ids[1])]:
+        records.append(
+            ptl.models.ResultRecord(
+                molecule=mol_id,
+                method="cache",
+                basis="b1",
+                program="p1",
+                driver="energy",
+                status=status,
+                return_result=1.0,
+                hash_index=f"cache-{status}-{tmp_path}",
+            )
+        )
+    result_ids = test_server.storage.add_results(records)["data"]
+
+    # The first pull stores molecules, keywords and COMPLETE records only
+    assert [m.id for m in client.query_molecules(id=mol_ids[:2])] == mol_ids[:2]
+    assert len(client.query_keywords(kw_ids)) == 1
+    assert len(client.query_results(id=result_ids)) == 2
+    assert len(client.record_cache) == 4
+
+    # Only the missing ids are pulled, in the requested order
+    cache = client.record_cache.get(client.address, "molecule", mol_ids)
+    assert set(cache) == set(mol_ids[:2])
+    ret = client.query_molecules(id=mol_ids[::-1], full_return=True)
+    assert [m.id for m in ret.data] == mol_ids[::-1]
+    assert ret.meta.n_found == 3
+
+    # A new session with the same cache does not contact the server for cached objects
+    client2 = ptl.FractalClient(test_server, cache_dir=str(tmp_path))
+    client2._mock_network_error = True
+    mol = client2.query_molecules(id=[mol_ids[0]])[0]
+    assert mol.compare(mols[0])
+    assert client2.query_keywords(kw_ids)[0].values == {"cache": str(tmp_path)}
+    record = client2.query_results(id=[result_ids[0]])[0]
+    assert record.return_result == 1.0
+    assert record.client is client2
+
+    with pytest.raises(Exception):
+        client2.query_results(id=[result_ids[1]])
+
+    # Other queries still go to the server
+    with pytest.raises(Exception):
+        client2.query_molecules(molecular_formula="He2")
+
+    # The least recently used objects are evicted beyond the size bound
+    mols = client.query_molecules(id=mol_ids)
+    cache = ptl.record_cache.RecordCache(tmp_path / "small", max_size=1)
+    cache.put(client.address, "molecule", {m.id: m for m in mols[:2]})
+    assert len(cache) == 0
+    cache.max_size = 10 ** 6
+    cache.put(client.address, "molecule", {m.id: m for m in mols[:2]})
+    cache.get(client.address, "molecule", [mols[0].id])
+    cache.max_size = cache.size() - 1
+    cache.put(client.address, "molecule", {m.id: m for m in mols[2:]})
+    assert set(cache.get(client.address, "molecule", [m.id for m in mols])) == {mols[2].id}
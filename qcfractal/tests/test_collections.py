@@ -1,8 +1,10 @@
 """
 Tests the server collection compute capabilities.
 """
+import gzip
 import itertools
 import pathlib
+import shutil
 from contextlib import contextmanager
 from typing import List
 
@@ -10,9 +12,11 @@ import numpy as np
 import pandas as pd
 import pytest
 import qcelemental as qcel
+import requests
 from qcelemental.models import Molecule, ProtoModel
 
 import qcfractal.interface as ptl
+from qcfractal.interface.collections.dataset_view import download_view
 from qcengine.testing import is_program_new_enough
 from qcfractal import testing
 from qcfractal.testing import df_compare, fractal_compute_server, live_fractal_or_skip
@@ -1123,6 +1127,153 @@ def test_d3_dataset_view_identical(reactiondataset_dftd3_fixture_fixture):
     assert_view_identical(ds)
 
 
+def test_arrowview_identical(contributed_dataset_fixture, fractal_compute_server, tmp_path):
+    client, ds = contributed_dataset_fixture
+    ds = client.get_collection("Dataset", ds.name)
+
+    ds._disable_view = True
+    path = tmp_path / "view.arrow"
+    ptl.collections.ArrowView(path).write(ds)
+    ds.set_view(path)
+    assert isinstance(ds._view, ptl.collections.ArrowView)
+    assert_view_identical(ds)
+
+    # Views converted from the HDF5 view of the server are identical to the HDF5 view
+    hdf5_view = ptl.collections.HDF5View(fractal_compute_server.view_handler.view_path(ds.data.id))
+    converted = ptl.collections.ArrowView(tmp_path / "converted.arrow")
+    converted.write_view(hdf5_view)
+    assert converted.list_values().equals(hdf5_view.list_values())
+    assert df_compare(converted.get_entries(), hdf5_view.get_entries())
+
+    ds = client.get_collection("Dataset", ds.name)
+    ds._disable_view = False
+    ds._view = converted
+    assert_view_identical(ds)
+
+    ds.to_file(tmp_path / "to_file.arrow", "arrow")
+    assert ptl.collections.ArrowView(tmp_path / "to_file.arrow").hash() == ptl.collections.ArrowView(path).hash()
+
+    # The server prefers an Arrow view of a collection to its HDF5 view
+    handler = fractal_compute_server.view_handler
+    arrow_path = handler.view_path(ds.data.id).with_suffix(".arrow")
+    converted.close()
+    shutil.copy(tmp_path / "converted.arrow", arrow_path)
+    try:
+        assert handler.view_path(ds.data.id) == arrow_path
+        remote = ptl.collections.RemoteView(client, ds.data.id)
+        assert remote.list_values().equals(hdf5_view.list_values())
+    finally:
+        arrow_path.unlink()
+    hdf5_view.close()
+
+
+def test_hdf5view_update(fractal_compute_server, tmp_path):
+    client = ptl.FractalClient(fractal_compute_server)
+
+    def contributed(name, driver, values, index):
+        details = {"driver": driver, "program": "fake_program", "basis": "fake_basis", "method": name}
+        return {
+            "name": name,
+            "theory_level": "pseudo-random values",
+            "values": values,
+            "index": index,
+            "theory_level_details": details,
+            "units": "hartree",
+        }
+
+    ds = ptl.collections.Dataset("ds_view_update", client)
+    ds.add_entry("He1", ptl.Molecule.from_data("He -1 0 0\n--\nHe 0 0 1"))
+    ds.add_entry("He", ptl.Molecule.from_data("He -1.1 0 0"))
+    ds.save()
+    ds.add_contributed_values(contributed("Fake Energy", "energy", [1.0, 2.0], ["He1", "He"]))
+    ds.add_contributed_values(contributed("Fake Gradient", "gradient", [np.ones(6), np.ones(3)], ["He1", "He"]))
+    ds.save()
+
+    view = ptl.collections.HDF5View(tmp_path / "update.hdf5")
+    view.write(ds)
+
+    # One new entry with a new molecule, values of the new entry for existing columns, and one new column
+    ds = client.get_collection("Dataset", "ds_view_update")
+    ds.add_entry("Ne", ptl.Molecule.from_data("Ne 0 0 0"))
+    ds.save()
+    ds.add_contributed_values(
+        contributed("Fake Energy", "energy", [1.0, 2.0, 3.0], ["He1", "He", "Ne"]), overwrite=True
+    )
+    ds.add_contributed_values(
+        contributed("Fake Gradient", "gradient", [np.ones(6), np.ones(3), np.zeros(3)], ["He1", "He", "Ne"]),
+        overwrite=True,
+    )
+    ds.add_contributed_values(contributed("Fake FF Energy", "energy", [4.0, 5.0, 6.0], ["He1", "He", "Ne"]))
+    ds.save()
+
+    checksum = view.update(ds)
+    assert checksum == view.hash()
+
+    expected = ptl.collections.HDF5View(tmp_path / "full.hdf5")
+    expected.write(ds)
+
+    assert df_compare(view.list_values(), expected.list_values())
+    assert df_compare(view.get_entries(), expected.get_entries())
+
+    queries = [{"name": name, "driver": "energy", "native": False} for name in ["Fake Energy", "Fake FF Energy"]]
+    queries.append({"name": "Fake Gradient", "driver": "gradient", "native": False})
+    assert df_compare(view.get_values(queries)[0], expected.get_values(queries)[0])
+
+    molecules = view.get_molecules(list(view.get_entries()["molecule_id"]))
+    assert [mol.get_hash() for mol in molecules] == [mol.get_hash() for mol in ds.get_molecules()["molecule"]]
+
+
+def test_remote_view_etag(contributed_dataset_fixture, fractal_compute_server):
+    client, ds = contributed_dataset_fixture
+    if not isinstance(ds._view, ptl.collections.RemoteView):
+        pytest.skip("Requires a remote view")
+
+    view = ptl.collections.RemoteView(client, ds.data.id)
+    values = view.list_values()
+    etag = next(iter(view._responses.values())).meta.etag
+    assert etag is not None
+
+    # Unchanged responses are not sent again, and are served from the cache of the server otherwise
+    name = f"collection/{ds.data.id}/list"
+    payload = {"meta": {}, "data": {}}
+    assert client._automodel_request(name, "get", payload, full_return=True, etag=etag) is None
+    response = client._automodel_request(name, "get", payload, full_return=True, etag='"stale"')
+    assert response.meta.etag == etag
+    assert response.data == fractal_compute_server.view_handler._response_cache[etag]["data"]
+
+    assert view.list_values().equals(values)
+
+
+def test_hdf5view_read_rows(tmp_path):
+    h5py = pytest.importorskip("h5py")
+
+    view = ptl.collections.HDF5View(tmp_path / "rows.hdf5")
+    view._vlen_chunk_rows = 3
+    with view._write_file() as f:
+        fixed = f.create_dataset("fixed", data=np.arange(20, dtype=np.float64))
+        vlen = f.create_dataset("vlen", shape=(20,), dtype=h5py.vlen_dtype(np.dtype("float64")))
+        for i in range(20):
+            vlen[i] = np.full(i % 4, i, dtype=np.float64)
+
+    with view._read_file() as f:
+        # Dense, sparse and repeated rows, in any order
+        for indexes in [[3, 1, 2, 2], [19, 0, 7], []]:
+            assert list(view._read_rows(f["fixed"], indexes)) == indexes
+
+            rows = view._read_rows(f["vlen"], indexes)
+            assert len(rows) == len(indexes)
+            for i, row in zip(indexes, rows):
+                assert np.array_equal(row, np.full(i % 4, i, dtype=np.float64))
+
+        # The handle is kept open between reads
+        handle = f
+    with view._read_file() as f:
+        assert f is handle
+
+    view.close()
+    assert not handle
+
+
 @pytest.mark.slow
 def test_qm3_view_identical(qm3_fixture):
     client, ds = qm3_fixture
@@ -1192,6 +1343,66 @@ def test_view_download_mock(gradient_dataset_fixture, tmp_path_factory):
                 ds.download(verify=True)
 
 
+def test_view_download_ranges(gradient_dataset_fixture, tmp_path):
+    try:
+        import requests_mock
+    except ImportError:
+        pytest.skip("Missing request_mock")
+
+    client, ds = gradient_dataset_fixture
+    path = tmp_path / "view.hdf5"
+    ds.to_file(path, "hdf5")
+    content = path.read_bytes()
+    checksum = ptl.collections.HDF5View(path).hash()
+    body = gzip.compress(content)
+
+    requested = []
+
+    def send_range(request, context):
+        start, end = request.headers["Range"][len("bytes=") :].split("-")
+        start, end = int(start), int(end or len(body) - 1)
+        requested.append(start)
+        if fail_after is not None and start > fail_after:
+            raise requests.exceptions.ConnectionError("Dropped connection")
+        context.status_code = 206
+        context.headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+        return body[start : end + 1]
+
+    fake_url = "https://qcarchiveviews.com/gradient_ds_ranges.h5.gz"
+    ds.data.__dict__["view_url_hdf5"] = fake_url
+    ds.data.__dict__["view_metadata"] = {"blake2b_checksum": checksum}
+    cache_dir = tmp_path / "cache"
+
+    with requests_mock.Mocker(real_http=True) as m:
+        m.get(fake_url, content=send_range)
+
+        # Byte ranges beyond the first are dropped, and the download is resumed without fetching the first again
+        fail_after = 0
+        with pytest.raises(requests.exceptions.ConnectionError):
+            download_view(fake_url, tmp_path / "resumed.hdf5", n_connections=3, progress_bar=False)
+        assert (tmp_path / "resumed.hdf5.part.json").is_file()
+
+        fail_after = None
+        requested.clear()
+        assert download_view(fake_url, tmp_path / "resumed.hdf5", n_connections=3, progress_bar=False) == checksum
+        assert 0 not in requested and len(requested) == 2
+        assert (tmp_path / "resumed.hdf5").read_bytes() == content
+        assert not (tmp_path / "resumed.hdf5.part").exists()
+
+        # Gzipped views are decompressed, and views matching their checksum are cached
+        requested.clear()
+        ds.download(local_path=tmp_path / "local.hdf5", n_connections=3, progress_bar=False, cache_dir=cache_dir)
+        assert sorted(requested) == [0, -(-len(body) // 3), 2 * -(-len(body) // 3)]
+        assert (tmp_path / "local.hdf5").read_bytes() == content
+        assert (cache_dir / f"{checksum}.view").read_bytes() == content
+
+        requested.clear()
+        ds.download(progress_bar=False, cache_dir=cache_dir)
+        assert requested == []
+        assert ds._view._path == cache_dir / f"{checksum}.view"
+        ds.get_entries()
+
+
 def test_gradient_dataset_plaintextview_write(gradient_dataset_fixture, tmpdir):
     _, ds = gradient_dataset_fixture
     ds.to_file(tmpdir / "test.tar.gz", "plaintext")
@@ -1462,6 +1673,33 @@ def test_get_collection_no_records(ds_class, fractal_compute_server):
     assert ds.data.records is None
 
 
+def test_dataset_value_cache():
+    from qcfractal.interface.collections.dataset import _ValueCache
+
+    cache = _ValueCache()
+    cache.update(pd.DataFrame({"energy": [1.0, np.nan]}, index=["a", "b"]))
+    assert cache.contains("energy", ["a"])
+    assert not cache.contains("energy", ["a", "b"])
+    assert not cache.contains("energy", ["c"])
+    assert not cache.contains("gradient", ["a"])
+
+    # New entries are appended to the index, and missing values do not replace cached ones
+    gradients = pd.Series([np.ones((2, 3)), np.zeros((1, 3))], index=["c", "a"])
+    cache.update(pd.DataFrame({"energy": [np.nan, 3.0], "gradient": gradients}, index=["a", "c"]))
+    assert cache.contains("energy", ["a", "c"])
+    assert cache.contains("gradient", ["a", "c"])
+
+    frame = cache.frame(["c", "a", "b"], ["energy", "gradient"])
+    assert frame["energy"].dtype == np.float64
+    assert list(frame["energy"].iloc[:2]) == [3.0, 1.0]
+    assert np.isnan(frame.loc["b", "energy"])
+    assert frame.loc["c", "gradient"].shape == (2, 3)
+    assert list(cache.frame().index) == ["a", "b", "c"]
+
+    cache.scale("energy", 2.0)
+    assert cache.frame(["a"], ["energy"]).loc["a", "energy"] == 2.0
+
+
 def test_gradient_dataset_lazy_entries_values(gradient_dataset_fixture):
     client, ds = gradient_dataset_fixture
 
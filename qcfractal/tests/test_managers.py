@@ -6,10 +6,13 @@ import contextlib
 import datetime
 import logging
 import re
+import threading
 import time
+import urllib.request
 from multiprocessing import Pool
 
 import pytest
+from qcelemental.util import msgpackext_loads
 
 import qcfractal.interface as ptl
 from qcfractal import FractalServer, queue, testing
@@ -249,13 +252,14 @@ def test_queue_manager_server_delay(compute_adapter_fixture):
     # Try to push the changes through the network error
     manager.update()
     assert len(manager.list_current_tasks()) == 0
-    assert len(manager._stale_payload_tracking) == 1
+    assert len(manager.outbox) == 1
     assert manager.n_stale_jobs == 0
 
-    # Try again to push the tracked attempts into stale
+    # Try again to push the tracked attempts into stale, they are kept on disk
     manager.update()
     assert len(manager.list_current_tasks()) == 0
-    assert len(manager._stale_payload_tracking) == 0
+    assert manager.outbox.count_pending() == 0
+    assert manager.outbox.count_tasks(stale=True) == 1
     assert manager.n_stale_jobs == 1
     # Update again to push jobs to stale
     manager.update()
@@ -273,16 +277,432 @@ def test_queue_manager_server_delay(compute_adapter_fixture):
     client._mock_network_error = True
     manager.update()
     assert len(manager.list_current_tasks()) == 0
-    assert len(manager._stale_payload_tracking) == 1
+    assert len(manager.outbox) == 1
     assert manager.n_stale_jobs == 0
     # Stop mocking a network error
     client._mock_network_error = False
     manager.update()
     assert len(manager.list_current_tasks()) == 0
-    assert len(manager._stale_payload_tracking) == 0
+    assert len(manager.outbox) == 0
     assert manager.n_stale_jobs == 0
 
 
+@testing.using_rdkit
+def test_queue_manager_outbox_replay(compute_adapter_fixture, tmp_path):
+    """Tests that results journaled by a manager which died are posted by the next manager"""
+    client, server, adapter = compute_adapter_fixture
+    reset_server_database(server)
+
+    hooh = ptl.data.get_molecule("hooh.json")
+    ret = client.add_compute("rdkit", "UFF", "", "energy", None, [hooh], tag="other")
+
+    outbox_path = str(tmp_path / "outbox.sqlite")
+    manager = queue.QueueManager(client, adapter, queue_tag="other", outbox_path=outbox_path)
+    manager.update()
+    manager.queue_adapter.await_results()
+
+    # Results are journaled as soon as they are harvested
+    assert manager.harvest() == 1
+    assert len(manager.outbox) == 1
+
+    # They stay journaled while the server is unreachable, even once given up on
+    client._mock_network_error = True
+    manager.server_error_retries = 0
+    manager.update(new_tasks=False)
+    client._mock_network_error = False
+    assert len(manager.outbox) == 1
+    assert manager.outbox.count_tasks(stale=True) == 1
+
+    # A new manager on the same outbox posts them under the name of the first
+    manager.outbox.close()
+    manager = queue.QueueManager(client, adapter, queue_tag="other", outbox_path=outbox_path)
+    assert manager.outbox.count_pending() == 1
+    manager.update(new_tasks=False)
+    assert len(manager.outbox) == 0
+    assert client.query_results(id=ret.ids)[0].status != "INCOMPLETE"
+
+    assert manager.shutdown()["nshutdown"] == 0
+
+
+@testing.using_rdkit
+def test_queue_manager_batched_upload(compute_adapter_fixture):
+    """Tests that a failed upload batch is retried without re-sending acknowledged batches"""
+    client, server, adapter = compute_adapter_fixture
+    reset_server_database(server)
+
+    base_molecule = ptl.data.get_molecule("butane.json")
+    molecules = [base_molecule.copy(update={"geometry": base_molecule.geometry + 0.1 * i}) for i in range(3)]
+    ret = client.add_compute("rdkit", "UFF", "", "energy", None, molecules, tag="other")
+
+    manager = queue.QueueManager(client, adapter, queue_tag="other", upload_batch_size=1)
+
+    # Fail the second post
+    posted = []
+    post_update = manager._post_update
+
+    def failing_post_update(payload_data, *args, **kwargs):
+        if len(posted) == 1:
+            posted.append(None)
+            raise IOError("Mock network error")
+        posted.append(list(msgpackext_loads(payload_data)))
+        return post_update(payload_data, *args, **kwargs)
+
+    manager._post_update = failing_post_update
+
+    manager.update()
+    manager.queue_adapter.await_results()
+    manager.update(new_tasks=False)
+
+    # The batch after the failure is not attempted, both are kept as a single stale update
+    assert len(posted) == 2
+    assert len(manager.outbox) == 2
+    assert manager.outbox.count_failed_groups() == 1
+
+    manager.update(new_tasks=False)
+    assert len(manager.outbox) == 0
+    sent = [x for batch in posted if batch is not None for x in batch]
+    assert sorted(sent) == sorted(ret.ids)
+    assert "INCOMPLETE" not in {x.status for x in client.query_results(id=ret.ids)}
+
+    assert manager.shutdown()["nshutdown"] == 0
+
+
+@testing.using_rdkit
+def test_queue_manager_upload_undecoded(compute_adapter_fixture, monkeypatch):
+    """Tests that journaled results are posted and counted without decoding them, whatever the client encoding"""
+    client, server, adapter = compute_adapter_fixture
+    reset_server_database(server)
+
+    json_client = ptl.FractalClient(server, username=CLIENT_USERNAME)
+    json_client._set_encoding("json")
+
+    ret = client.add_compute("rdkit", "UFF", "", "energy", None, [ptl.data.get_molecule("butane.json")], tag="other")
+    manager = queue.QueueManager(json_client, adapter, queue_tag="other", cores_per_task=1)
+
+    def no_loads(*args, **kwargs):
+        raise AssertionError("Journaled results were decoded")
+
+    monkeypatch.setattr(queue.managers, "msgpackext_loads", no_loads)
+
+    manager.update()
+    manager.queue_adapter.await_results()
+    manager.update(new_tasks=False)
+
+    assert manager.statistics.total_completed_tasks == 1
+    assert len(manager.outbox) == 0
+    assert len(manager._result_summaries) == 0
+    assert json_client._request_counter[("queue_manager", "post")] == 1
+    assert client.query_results(id=ret.ids)[0].status == "COMPLETE"
+
+    assert manager.shutdown()["nshutdown"] == 0
+
+
+@testing.using_rdkit
+def test_queue_manager_prefetch(compute_adapter_fixture):
+    """Tests that tasks are prefetched beyond open slots and returned when their lease expires"""
+    client, server, adapter = compute_adapter_fixture
+    reset_server_database(server)
+
+    base_molecule = ptl.data.get_molecule("butane.json")
+    molecules = [base_molecule.copy(update={"geometry": base_molecule.geometry + 0.1 * i}) for i in range(4)]
+    client.add_compute("rdkit", "UFF", "", "energy", None, molecules, tag="other")
+
+    manager = queue.QueueManager(client, adapter, queue_tag="other", max_tasks=1, prefetch_limit=5)
+
+    # Nothing is prefetched until a completion rate is observed
+    manager.statistics.completion_rate = 10.0
+    manager.update()
+    assert len(manager.list_current_tasks()) == 1
+    assert len(manager._prefetch_buffer) == 3
+
+    # Open slots are filled even while a full outbox holds complete tasks in the adapter
+    manager.upload_queue_size = 0
+    manager.max_tasks = 2
+    assert manager.harvest() == 0
+    assert len(manager.list_current_tasks()) == 2
+    assert len(manager._prefetch_buffer) == 2
+    manager.upload_queue_size = 10
+    manager.max_tasks = 1
+
+    # Prefetched tasks are handed over as soon as slots free up
+    manager.queue_adapter.await_results()
+    assert manager.harvest() == 2
+    assert len(manager.list_current_tasks()) == 1
+    assert len(manager._prefetch_buffer) == 1
+
+    # Expired leases are returned to the server
+    manager.prefetch_lease = 0
+    assert manager._return_expired_prefetch() == 1
+    assert len(manager._prefetch_buffer) == 0
+    assert server.storage.queue_count_tasks(status="WAITING") == 1
+
+    # Harvested results are posted on the next update
+    manager.queue_adapter.await_results()
+    manager.update(new_tasks=False)
+    assert manager.statistics.total_completed_tasks == 3
+
+    assert manager.shutdown()["nshutdown"] == 0
+
+
+@testing.using_rdkit
+def test_queue_manager_shutdown_prefetch(compute_adapter_fixture):
+    """Tests that prefetched tasks are returned to the server rather than submitted on shutdown"""
+    client, server, adapter = compute_adapter_fixture
+    reset_server_database(server)
+
+    base_molecule = ptl.data.get_molecule("butane.json")
+    molecules = [base_molecule.copy(update={"geometry": base_molecule.geometry + 0.1 * i}) for i in range(4)]
+    client.add_compute("rdkit", "UFF", "", "energy", None, molecules, tag="other")
+
+    manager = queue.QueueManager(client, adapter, queue_tag="other", max_tasks=1, prefetch_limit=5)
+    manager.statistics.completion_rate = 10.0
+    manager.update()
+    assert len(manager._prefetch_buffer) == 3
+
+    # The complete task is uploaded, the slot it frees is left empty
+    manager.queue_adapter.await_results()
+    assert manager.shutdown()["nshutdown"] == 3
+    assert len(manager.list_current_tasks()) == 0
+    assert len(manager._prefetch_buffer) == 0
+
+    assert server.storage.queue_count_tasks(status="WAITING") == 3
+    assert manager.statistics.total_completed_tasks == 1
+
+
+@testing.using_rdkit
+def test_queue_manager_resource_packing(compute_adapter_fixture):
+    """Tests that tasks are packed onto the core budget by their expected resources"""
+    client, server, adapter = compute_adapter_fixture
+    reset_server_database(server)
+
+    base_molecule = ptl.data.get_molecule("butane.json")
+    molecules = [base_molecule.copy(update={"geometry": base_molecule.geometry + 0.1 * i}) for i in range(4)]
+    client.add_compute("rdkit", "UFF", "", "energy", None, molecules[:2], tag="other", resources={"ncores": 3})
+    client.add_compute("rdkit", "UFF", "", "energy", None, molecules[2:], tag="other")
+
+    # Tasks without resources given are estimated by the server
+    tasks = client.query_tasks(tag="other")
+    assert sorted(task.resources.ncores for task in tasks) == [1, 1, 3, 3]
+
+    manager = queue.QueueManager(client, adapter, queue_tag="other", max_tasks=4, cores_per_task=1, total_cores=4)
+
+    # One large and one small task fill the four cores, the others wait for the cores to free up
+    manager.update()
+    assert len(manager.list_current_tasks()) == 2
+    assert len(manager._prefetch_buffer) == 2
+    assert sorted(x[0] for x in manager._allocations.values()) == [1, 3]
+
+    manager.queue_adapter.await_results()
+    assert manager.harvest() == 2
+    assert len(manager.list_current_tasks()) == 2
+    assert len(manager._prefetch_buffer) == 0
+
+    manager.queue_adapter.await_results()
+    assert manager.harvest() == 2
+    assert len(manager._allocations) == 0
+
+    # Core usage is accounted with the cores of each task
+    manager.update(new_tasks=False)
+    assert manager.statistics.total_completed_tasks == 4
+    assert manager.statistics.total_worker_walltime > 0
+    assert manager.statistics.max_concurrent_cores == 4
+    assert len(manager._task_cores) == 0
+
+    assert manager.shutdown()["nshutdown"] == 0
+
+
+@testing.using_rdkit
+def test_queue_manager_adaptive_update(compute_adapter_fixture):
+    """Tests that the interval between checks for new tasks follows the work on the server"""
+    client, server, adapter = compute_adapter_fixture
+    reset_server_database(server)
+
+    manager = queue.QueueManager(
+        client,
+        adapter,
+        queue_tag="other",
+        max_tasks=1,
+        update_frequency=2,
+        min_update_frequency=0.5,
+        max_update_frequency=5,
+    )
+
+    # Checks which find nothing back off exponentially
+    manager.update()
+    assert manager.update_interval == 4
+    manager.update()
+    assert manager.update_interval == 5
+
+    # Work left on the server is picked up quickly
+    base_molecule = ptl.data.get_molecule("butane.json")
+    molecules = [base_molecule.copy(update={"geometry": base_molecule.geometry + 0.1 * i}) for i in range(2)]
+    client.add_compute("rdkit", "UFF", "", "energy", None, molecules, tag="other")
+    manager.update()
+    assert manager.update_interval == 0.5
+
+    manager.queue_adapter.await_results()
+    manager.update()
+    assert manager.update_interval == 2
+
+    # The server may ask idle managers to wait longer
+    server.objects["manager_idle_backoff"] = 30
+    try:
+        manager.queue_adapter.await_results()
+        manager.update()
+        assert manager.update_interval == 30
+    finally:
+        server.objects["manager_idle_backoff"] = 0
+
+    assert manager.shutdown()["nshutdown"] == 0
+
+
+@testing.using_rdkit
+def test_queue_manager_long_poll(compute_adapter_fixture):
+    """Tests that a check for new tasks is held by the server until tasks are submitted"""
+    client, server, adapter = compute_adapter_fixture
+    reset_server_database(server)
+
+    manager = queue.QueueManager(client, adapter, queue_tag="other", max_tasks=1, long_poll=1)
+
+    # Nothing is submitted, the check is answered once the wait is over
+    start = time.time()
+    assert manager._acquire_tasks()
+    assert time.time() - start >= 1
+    assert len(manager._prefetch_buffer) == 0
+
+    # A submission answers the held check right away
+    manager.long_poll = 30
+    acquire = threading.Thread(target=manager._acquire_tasks)
+    start = time.time()
+    acquire.start()
+    time.sleep(0.5)
+    client.add_compute("rdkit", "UFF", "", "energy", None, [ptl.data.get_molecule("butane.json")], tag="other")
+    acquire.join(timeout=30)
+    assert time.time() - start < 10
+    assert len(manager._prefetch_buffer) == 1
+
+    manager.long_poll = 0
+    manager.update()
+    manager.queue_adapter.await_results()
+    manager.update(new_tasks=False)
+    assert manager.statistics.total_completed_tasks == 1
+
+    assert manager.shutdown()["nshutdown"] == 0
+
+
+@testing.using_rdkit
+def test_queue_manager_long_poll_stop(compute_adapter_fixture):
+    """Tests that stopping a manager is not held up by a check for new tasks held by the server"""
+    client, server, adapter = compute_adapter_fixture
+    reset_server_database(server)
+
+    manager = queue.QueueManager(client, adapter, queue_tag="other", max_tasks=1, long_poll=30)
+
+    thread = threading.Thread(target=manager.start)
+    thread.start()
+
+    # Wait until the check for new tasks is held by the server
+    acquire = manager._loop_threads["acquire"]
+    time.sleep(1)
+    assert acquire.is_alive()
+
+    # Stops as `stop` does, without closing the adapter shared with other tests
+    start = time.time()
+    manager._stop_loops()
+    thread.join(timeout=30)
+    assert time.time() - start < 10
+    assert not acquire.is_alive()
+
+    # Tasks submitted afterwards are not taken by the stopped manager
+    client.add_compute("rdkit", "UFF", "", "energy", None, [ptl.data.get_molecule("butane.json")], tag="other")
+    assert manager.update() is True
+    assert len(manager._prefetch_buffer) == 0
+    assert manager.active == 0
+    assert server.storage.queue_count_tasks(status="WAITING") == 1
+
+
+@testing.using_rdkit
+def test_queue_manager_metrics(compute_adapter_fixture):
+    """Tests that the manager serves the latency of each stage and its statistics"""
+    client, server, adapter = compute_adapter_fixture
+    reset_server_database(server)
+
+    manager = queue.QueueManager(client, adapter, queue_tag="other", metrics_port=0)
+    client.add_compute("rdkit", "UFF", "", "energy", None, [ptl.data.get_molecule("butane.json")], tag="other")
+
+    manager.update()
+    manager.queue_adapter.await_results()
+    manager.update(new_tasks=False)
+    assert manager.statistics.total_completed_tasks == 1
+
+    for stage in ["submit", "complete", "upload"]:
+        assert manager.metrics.stage_seconds.count(stage=stage) == 1
+    assert manager.metrics.task_wall_seconds.count(program="rdkit") == 1
+    assert manager.metrics.uploads.value(status="sent") == 1
+    assert manager.metrics.upload_bytes.value() > 0
+
+    with urllib.request.urlopen(f"http://localhost:{manager.metrics_server.port}/metrics") as response:
+        metrics = response.read().decode()
+
+    assert 'qcfractal_manager_stage_seconds_count{stage="upload"} 1' in metrics
+    assert 'qcfractal_manager_task_wall_seconds_bucket{program="rdkit",le="+Inf"} 1' in metrics
+    assert "qcfractal_manager_total_completed_tasks 1" in metrics
+    assert "qcfractal_manager_outbox_batches 0" in metrics
+
+    assert manager.shutdown()["nshutdown"] == 0
+    manager.metrics_server.close()
+
+
+@testing.using_rdkit
+def test_queue_manager_stage_loops(compute_adapter_fixture, caplog):
+    """Tests that a stalled upload does not block the acquisition of new tasks"""
+    client, server, adapter = compute_adapter_fixture
+    reset_server_database(server)
+
+    base_molecule = ptl.data.get_molecule("butane.json")
+    molecules = [base_molecule.copy(update={"geometry": base_molecule.geometry + 0.1 * i}) for i in range(2)]
+    ret = client.add_compute("rdkit", "UFF", "", "energy", None, molecules, tag="other")
+
+    manager = queue.QueueManager(client, adapter, queue_tag="other", max_tasks=1, update_frequency=0.2)
+
+    # Hold every upload until released
+    upload_gate = threading.Event()
+    post_update = manager._post_update
+
+    def held_post_update(*args, **kwargs):
+        upload_gate.wait()
+        return post_update(*args, **kwargs)
+
+    manager._post_update = held_post_update
+
+    with caplog_handler_at_level(caplog, logging.INFO):
+        thread = threading.Thread(target=manager.start)
+        thread.start()
+
+        try:
+            # The second task is acquired while the first result is still waiting on its upload
+            timeout = time.time() + 30
+            while server.storage.queue_count_tasks(status="WAITING") > 0 and time.time() < timeout:
+                time.sleep(0.1)
+            assert server.storage.queue_count_tasks(status="WAITING") == 0
+            assert manager.statistics.total_completed_tasks == 0
+
+            upload_gate.set()
+            while manager.statistics.total_completed_tasks < 2 and time.time() < timeout:
+                time.sleep(0.1)
+            assert manager.statistics.total_completed_tasks == 2
+        finally:
+            upload_gate.set()
+            manager._join_loops()
+            thread.join()
+
+        assert "Stage Queues: Running=" in caplog.text
+
+    assert manager.shutdown()["nshutdown"] == 0
+    # Both results were posted
+    assert "INCOMPLETE" not in {x.status for x in client.query_results(id=ret.ids)}
+
+
 def test_queue_manager_heartbeat(compute_adapter_fixture):
     """Tests to ensure tasks are returned to queue when the manager shuts down"""
 
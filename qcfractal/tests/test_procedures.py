@@ -10,6 +10,7 @@ from qcelemental.util import parse_version
 import qcengine as qcng
 import qcfractal.interface as ptl
 from qcfractal import testing
+from qcfractal.procedures.procedures_util import estimate_task_resources
 from qcfractal.testing import fractal_compute_server
 
 
@@ -212,3 +213,28 @@ def test_procedure_optimization_protocols(fractal_compute_server):
 
     assert len(proc.trajectory) == 1
     assert len(proc.energies) > 1
+
+
+def test_estimate_task_resources():
+
+    water = ptl.data.get_molecule("water_dimer_minima.psimol")
+    butane = ptl.data.get_molecule("butane.json")
+
+    # Force fields and methods without a basis take a single core
+    assert estimate_task_resources(butane, "UFF", None).ncores == 1
+    assert estimate_task_resources(butane, "gfn2-xtb", "def2-svp").ncores == 1
+
+    # Larger molecules, bases and correlated methods need more
+    small = estimate_task_resources(water, "HF", "sto-3g")
+    large = estimate_task_resources(butane, "HF", "sto-3g")
+    assert small.ncores <= large.ncores and small.memory < large.memory
+
+    hf = estimate_task_resources(butane, "HF", "cc-pVTZ")
+    assert hf.memory > large.memory
+    for method in ["ccsd(t)", "DF-MP2", "dlpno-ccsd(t)"]:
+        assert estimate_task_resources(butane, method, "cc-pVTZ").ncores > hf.ncores
+
+    # Estimates are capped
+    carbon_chain = ptl.Molecule(symbols=["C"] * 40, geometry=np.arange(120) * 2.0)
+    assert estimate_task_resources(carbon_chain, "ccsd(t)", "aug-cc-pv5z").ncores == 16
+    assert estimate_task_resources(carbon_chain, "ccsd(t)", "aug-cc-pv5z").memory == 64.0
@@ -3,16 +3,21 @@ Tests the DQM Server class
 """
 
 import json
+import math
 import os
 import threading
+from types import SimpleNamespace
 
 import pytest
 import requests
 
 import qcfractal.interface as ptl
+from qcfractal.interface.models.task_models import PriorityEnum
 from qcfractal import FractalServer, FractalSnowflake, FractalSnowflakeHandler
+from qcfractal.storage_sockets.view import StorageClient, ViewBuilder
 from qcfractal.testing import (
     await_true,
+    df_compare,
     find_open_port,
     pristine_loop,
     test_server,
@@ -133,6 +138,148 @@ def test_bad_view_endpoints(test_server):
     assert requests.get(addr + "collection/S22").status_code == 404
 
 
+def test_service_admission_adaptive(test_server):
+
+    storage = test_server.storage
+    storage.manager_update(name="admission_manager", status="ACTIVE", active_tasks=3)
+
+    test_server.service_admission = "adaptive"
+    try:
+        # max_active_services remains an upper bound
+        assert test_server.service_admission_slots(test_server.max_active_services + 1) == 0
+
+        capacity = storage.get_manager_capacity()
+        waiting = storage.queue_count_tasks(status="WAITING")
+        assert waiting < test_server.admission_low_watermark * capacity["active_tasks"]
+
+        # A single service is started while the tasks a service submits are unknown
+        test_server._service_task_estimate = None
+        assert test_server.service_admission_slots(0) == 1
+
+        # Services are admitted by the tasks recently started services submitted
+        test_server._record_service_tasks(4)
+        test_server._record_service_tasks(2)
+        assert test_server._service_task_estimate == 3.0
+
+        admitted = test_server.service_admission_slots(0)
+        high = test_server.admission_high_watermark * capacity["active_tasks"]
+        assert admitted == min(test_server.max_active_services, math.ceil((high - waiting) / 3))
+
+        decision = test_server.update_server_log()["service_admission"]
+        assert decision["decision"] == "admit"
+        assert decision["admitted"] == admitted
+        assert decision["active_tasks"] == capacity["active_tasks"]
+
+        # Lots of waiting tasks per task slot stop new services from being started
+        test_server.admission_low_watermark = 0
+        test_server.admission_high_watermark = 0
+        assert test_server.service_admission_slots(0) == 0
+        assert test_server._admission_decision["decision"] == "throttle"
+    finally:
+        test_server._service_task_estimate = None
+        test_server.service_admission = "fixed"
+        test_server.admission_low_watermark = 1
+        test_server.admission_high_watermark = 4
+        storage.manager_update(name="admission_manager", status="INACTIVE")
+
+
+def test_service_admission_no_capacity(test_server):
+
+    assert test_server.storage.get_manager_capacity()["active_tasks"] == 0
+
+    test_server.service_admission = "adaptive"
+    try:
+        # Without reporting managers services are still started, one at a time
+        assert test_server.service_admission_slots(0) == 1
+        assert test_server._admission_decision["decision"] == "no_capacity"
+        assert test_server._admission_decision["admitted"] == 1
+
+        assert test_server.service_admission_slots(test_server.max_active_services) == 0
+    finally:
+        test_server.service_admission = "fixed"
+
+
+def test_update_task_priorities(test_server):
+
+    storage = test_server.storage
+    client = ptl.FractalClient(test_server)
+
+    base_molecule = ptl.data.get_molecule("hooh.json")
+    molecules = [base_molecule.copy(update={"geometry": base_molecule.geometry + 0.013 * (i + 1)}) for i in range(2)]
+    ret = client.add_compute("rdkit", "UFF", "", "energy", None, molecules, tag="priority_test")
+    assert len(ret.submitted) == 2
+
+    # A service waiting on the second task only, which gates its next iteration
+    service = SimpleNamespace(
+        task_manager=SimpleNamespace(required_tasks={"gate": ret.ids[1]}), task_priority=PriorityEnum.NORMAL
+    )
+    assert test_server.update_task_priorities([service]) == 1
+    assert test_server.update_task_priorities([service]) == 0
+
+    # The boosted task is handed out first, while its submitted priority is kept
+    storage.manager_update("priority_manager")
+    tasks = storage.queue_get_next(
+        "priority_manager", ["rdkit"], [], limit=2, tag="priority_test", effective_priority=True
+    )
+    assert [x.base_result for x in tasks] == [ret.ids[1], ret.ids[0]]
+    assert {x.priority for x in tasks} == {PriorityEnum.NORMAL}
+
+
+def test_update_views(test_server):
+
+    client = ptl.FractalClient(test_server)
+
+    def contributed(name, values):
+        return {
+            "name": name,
+            "theory_level": "pseudo-random values",
+            "values": values,
+            "index": ["He1", "He2"],
+            "theory_level_details": {"driver": "energy", "program": "fake", "basis": "fake", "method": name},
+            "units": "hartree",
+        }
+
+    ds = ptl.collections.Dataset("ds_update_views", client)
+    ds.add_entry("He1", ptl.Molecule.from_data("He -1 0 0\n--\nHe 0 0 1"))
+    ds.add_entry("He2", ptl.Molecule.from_data("He -1.1 0 0\n--\nHe 0 0 1.1"))
+    ds.save()
+    ds.add_contributed_values(contributed("Fake Energy", [1.0, 2.0]))
+    ds.save()
+
+    view_handler = test_server.view_handler
+    storage_client = StorageClient(test_server.storage, test_server.objects["public_information"], "local")
+    builder = ViewBuilder(test_server.storage, view_handler, storage_client, max_builds=2, time_budget=0)
+    try:
+        # Views are written for collections without one, and only written again when their collection changes
+        assert builder.update() >= 1
+        assert builder.stale_collections() == []
+        assert builder.update() == 0
+
+        ds = client.get_collection("Dataset", "ds_update_views")
+        assert ds.data.view_available
+        assert ds.data.view_metadata["blake2b_checksum"] == view_handler._view_hash(ds.data.id)
+        assert isinstance(ds._view, ptl.collections.RemoteView)
+        ds._disable_view = True
+        expected = ds.get_values(native=False, force=True)
+        ds._disable_view = False
+        assert df_compare(ds.get_values(native=False, force=True), expected)
+
+        ds.add_contributed_values(contributed("Fake FF Energy", [3.0, 4.0]))
+        ds.save()
+        assert [col_id for col_id, _ in builder.stale_collections()] == [ds.data.id]
+        assert builder.update() == 1
+
+        # Clients are served the new view
+        ds = client.get_collection("Dataset", "ds_update_views")
+        assert set(ds.list_values(native=False)["name"]) == {"Fake Energy", "Fake FF Energy"}
+        ds._disable_view = True
+        expected = ds.get_values(native=False, force=True)
+        ds._disable_view = False
+        assert df_compare(ds.get_values(native=False, force=True), expected)
+    finally:
+        builder.close()
+
+
 @pytest.mark.slow
 def test_snowflakehandler_restart():
 
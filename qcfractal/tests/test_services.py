@@ -3,14 +3,86 @@ Tests the on-node procedures compute capabilities.
 """
 
 import copy
+import json
+import random
+from types import SimpleNamespace
 
+import numpy as np
 import pytest
 
 import qcfractal.interface as ptl
-from qcfractal.interface.models import GridOptimizationInput, TorsionDriveInput
+from qcfractal.interface.models import GridOptimizationInput, GridOptimizationRecord, TorsionDriveInput
+from qcfractal.services.gridoptimization_service import GridOptimizationService
+from qcfractal.services.service_util import expand_ndimensional_grid, mark_ndimensional_grid
 from qcfractal.testing import fractal_compute_server, recursive_dict_merge, using_geometric, using_rdkit
 
 
+def _reference_expand_ndimensional_grid(dimensions, seeds, complete):
+    """Loop based reference implementation of expand_ndimensional_grid"""
+
+    compute = set()
+    connections = []
+
+    for d in range(len(dimensions)):
+        for seed in seeds:
+            for disp in [-1, 1]:
+                new_dim = seed[d] + disp
+                if (new_dim >= dimensions[d]) or (new_dim < 0):
+                    continue
+
+                new = list(seed)
+                new[d] = new_dim
+                new = tuple(new)
+
+                if (new in compute) or (new in complete):
+                    continue
+
+                compute |= {new}
+                connections.append((seed, new))
+
+    return connections
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_expand_ndimensional_grid_reference(seed):
+
+    rng = random.Random(seed)
+
+    dimensions = tuple(rng.randint(1, 6) for _ in range(rng.randint(1, 4)))
+    points = [tuple(rng.randrange(n) for n in dimensions) for _ in range(rng.randint(1, 40))]
+
+    complete = set(rng.sample(points, rng.randint(0, len(points))))
+    seeds = set(rng.sample(points, rng.randint(0, len(points))))
+
+    ret = expand_ndimensional_grid(dimensions, seeds, complete)
+    assert ret == _reference_expand_ndimensional_grid(dimensions, seeds, complete)
+
+    # Boolean completion grids are equivalent to sets of points
+    grid = mark_ndimensional_grid(np.zeros(dimensions, dtype=bool), complete)
+    assert set(zip(*np.nonzero(grid))) == complete
+    assert expand_ndimensional_grid(dimensions, seeds, grid) == ret
+
+    # Python ints rather than NumPy scalars
+    for connection in ret:
+        assert all(type(x) is int for point in connection for x in point)
+
+    # New points are unique, in the grid, not complete and neighbors of a seed
+    new_points = [new for _, new in ret]
+    assert len(new_points) == len(set(new_points))
+    for old, new in ret:
+        assert old in seeds
+        assert new not in complete
+        assert all(0 <= x < n for x, n in zip(new, dimensions))
+        assert sum(abs(x - y) for x, y in zip(old, new)) == 1
+
+
+def test_expand_ndimensional_grid_empty():
+
+    assert expand_ndimensional_grid((3, 3), set(), set()) == []
+    assert expand_ndimensional_grid((1,), {(0,)}, set()) == []
+    assert expand_ndimensional_grid((3,), {(1,)}, {(0,), (2,)}) == []
+
+
 @pytest.fixture(scope="module")
 def torsiondrive_fixture(fractal_compute_server):
 
@@ -60,6 +132,33 @@ def torsiondrive_fixture(fractal_compute_server):
     yield spin_up_test, client
 
 
+def test_service_adaptive_admission(fractal_compute_server, torsiondrive_fixture):
+
+    hooh = ptl.data.get_molecule("hooh.json")
+    hooh.geometry[0] += 0.00047
+
+    spin_up_test, client = torsiondrive_fixture
+
+    fractal_compute_server.service_admission = "adaptive"
+    fractal_compute_server._service_task_estimate = None
+    try:
+        ret = spin_up_test(run_service=False, initial_molecule=[hooh])
+
+        # Nothing is known about the tasks of a service yet, so a single one is started to measure them
+        fractal_compute_server.update_services()
+        assert fractal_compute_server._admission_decision["admitted"] == 1
+        assert client.query_procedures(id=ret.ids)[0].status == "RUNNING"
+
+        # The tasks submitted by the new service are known to service admission
+        assert fractal_compute_server._service_task_estimate is not None
+
+        fractal_compute_server.await_services()
+        assert client.query_procedures(id=ret.ids)[0].status == "COMPLETE"
+    finally:
+        fractal_compute_server.service_admission = "fixed"
+        fractal_compute_server._service_task_estimate = None
+
+
 def test_service_torsiondrive_service_incomplete(fractal_compute_server, torsiondrive_fixture):
     hooh = ptl.data.get_molecule("hooh.json")
     hooh.geometry[0] += 0.00031
@@ -472,6 +571,119 @@ def test_service_gridoptimization_single_noopt(fractal_compute_server):
     assert pytest.approx(mol.measure([1, 2])) == initial_distance
 
 
+@using_geometric
+@using_rdkit
+def test_service_gridoptimization_wavefront(fractal_compute_server):
+
+    client = ptl.FractalClient(fractal_compute_server)
+
+    # Add a HOOH
+    hooh = ptl.data.get_molecule("hooh.json")
+    mol_ret = client.add_molecules([hooh])
+
+    def build_service(wavefront):
+        return GridOptimizationInput(
+            **{
+                "keywords": {
+                    "preoptimization": False,
+                    "wavefront": wavefront,
+                    "scans": [
+                        {"type": "distance", "indices": [1, 2], "steps": [-0.1, 0.0, 0.1], "step_type": "relative"},
+                        {"type": "dihedral", "indices": [0, 1, 2, 3], "steps": [-90, 0], "step_type": "absolute"},
+                    ],
+                },
+                "optimization_spec": {"program": "geometric", "keywords": {"coordsys": "tric"}},
+                "qc_spec": {"driver": "gradient", "method": "UFF", "basis": "", "keywords": None, "program": "rdkit"},
+                "initial_molecule": mol_ret[0],
+            }
+        )  # yapf: disable
+
+    ret = client.add_service([build_service(False), build_service(True)])
+    assert len(set(ret.ids)) == 2
+
+    fractal_compute_server.await_services(max_iter=10)
+    records = {x.id: x for x in client.query_procedures(id=ret.ids)}
+    layered, wavefront = records[ret.ids[0]], records[ret.ids[1]]
+
+    assert wavefront.keywords.wavefront is True
+    assert wavefront.status == "COMPLETE"
+    assert wavefront.detailed_status()["complete_tasks"] == 6
+
+    # All tasks finish together here, so every point is seeded from the same neighbor as the layered algorithm
+    # and the underlying optimizations are deduplicated
+    assert wavefront.starting_grid == layered.starting_grid
+    assert wavefront.grid_optimizations == layered.grid_optimizations
+
+    wavefront_energies = wavefront.get_final_energies()
+    for key, energy in layered.get_final_energies().items():
+        assert pytest.approx(energy, abs=1.0e-8) == wavefront_energies[key]
+
+
+def test_service_gridoptimization_wavefront_staged():
+    """Tests that a grid point finishing ahead of its layer seeds its neighbors before the layer completes"""
+
+    class StagedTaskManager:
+        def __init__(self):
+            self.required_tasks = {}
+            self.finished = {}
+
+        def finish(self, *points):
+            for point in points:
+                key = json.dumps(point)
+                self.finished[key] = {"energies": [-1.0], "id": "opt" + key, "final_molecule": "mol" + key}
+
+        def pop_complete_tasks(self):
+            for key in self.finished:
+                del self.required_tasks[key]
+            ret, self.finished = self.finished, {}
+            return ret
+
+    submitted = []
+
+    def submit_optimization_tasks(task_dict, append=False):
+        assert append is True
+        submitted.append(task_dict)
+        service.task_manager.required_tasks.update({k: "task" + k for k in task_dict})
+
+    # A 3x3 grid started from its center, whose second layer is running
+    service = SimpleNamespace(
+        task_manager=StagedTaskManager(),
+        final_energies={},
+        grid_optimizations={},
+        dimensions=(3, 3),
+        seeds=set(),
+        complete=mark_ndimensional_grid(np.zeros((3, 3), dtype=bool), {(1, 1)}),
+        output=SimpleNamespace(serialize_key=GridOptimizationRecord.serialize_key),
+        status="RUNNING",
+        submit_optimization_tasks=submit_optimization_tasks,
+        update_output=lambda: None,
+    )
+    submit_optimization_tasks({json.dumps(x): "mol" for x in [(0, 1), (2, 1), (1, 0), (1, 2)]}, append=True)
+    submitted.clear()
+
+    # Only one point of the layer is done, its open neighbors are seeded from it right away
+    service.task_manager.finish((0, 1))
+    assert GridOptimizationService._iterate_wavefront(service) is False
+    assert submitted == [{"[0, 0]": "mol[0, 1]", "[0, 2]": "mol[0, 1]"}]
+    assert set(service.task_manager.required_tasks) == {"[2, 1]", "[1, 0]", "[1, 2]", "[0, 0]", "[0, 2]"}
+    assert service.final_energies == {"[0, 1]": -1.0}
+
+    # Nothing new completed, nothing is submitted
+    assert GridOptimizationService._iterate_wavefront(service) is False
+    assert len(submitted) == 1
+
+    # Points reached by a running point are not seeded again
+    service.task_manager.finish((1, 0), (1, 2), (0, 0), (0, 2))
+    assert GridOptimizationService._iterate_wavefront(service) is False
+    assert submitted[-1] == {"[2, 0]": "mol[1, 0]", "[2, 2]": "mol[1, 2]"}
+
+    service.task_manager.finish((2, 1), (2, 0), (2, 2))
+    assert GridOptimizationService._iterate_wavefront(service) is True
+    assert service.status == "COMPLETE"
+    assert len(submitted) == 2
+    assert service.complete.all()
+
+
 @pytest.mark.skip
 def test_query_time(fractal_compute_server):
 
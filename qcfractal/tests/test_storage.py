@@ -4,7 +4,7 @@ Tests the database wrappers
 All tests should be atomic, that is create and cleanup their data
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from time import time
 
 import numpy as np
@@ -14,6 +14,7 @@ import sqlalchemy
 import qcfractal.interface as ptl
 from qcfractal.interface.models.task_models import TaskStatusEnum
 from qcfractal.services.services import TorsionDriveService
+from qcfractal.storage_sockets.models import TaskQueueORM
 from qcfractal.testing import sqlalchemy_socket_fixture as storage_socket
 
 bad_id1 = "99999000"
@@ -110,6 +111,54 @@ def test_molecules_get(storage_socket):
     assert ret == 1
 
 
+def test_molecules_get_cached(storage_socket):
+
+    water = ptl.data.get_molecule("water_dimer_minima.psimol")
+    water2 = ptl.data.get_molecule("water_dimer_stretch.psimol")
+
+    mol_ids = storage_socket.add_molecules([water, water2])["data"]
+    cache = storage_socket.molecule_cache
+    before = cache.stats()
+
+    # First pull misses, duplicates are only counted once
+    ret = storage_socket.get_cached_molecules([mol_ids[0], mol_ids[1], mol_ids[0], bad_id1])
+    assert ret.keys() == set(mol_ids)
+    ret[mol_ids[0]].compare(water)
+    assert cache.stats()["misses"] == before["misses"] + 3
+
+    # Second pull hits
+    ret = storage_socket.get_cached_molecules(mol_ids)
+    ret[mol_ids[1]].compare(water2)
+    assert cache.stats()["hits"] == before["hits"] + 2
+
+    # Molecules given by id, as services submit the molecules of their previous iteration, are read from the cache
+    ret = storage_socket.get_add_molecules_mixed([mol_ids[1], mol_ids[0]])["data"]
+    assert [x.id for x in ret] == [mol_ids[1], mol_ids[0]]
+    assert cache.stats()["hits"] == before["hits"] + 4
+
+    # Deleting evicts
+    assert storage_socket.del_molecules(id=mol_ids) == 2
+    assert storage_socket.get_cached_molecules(mol_ids) == {}
+
+
+def test_molecule_cache_bound():
+
+    from qcfractal.storage_sockets.storage_utils import MoleculeCache
+
+    cache = MoleculeCache(maxsize=2)
+    mols = [ptl.Molecule(symbols=["He"], geometry=[0, 0, x], id=str(x)) for x in range(3)]
+
+    cache.put(mols[:2])
+    cache.get(["0"])
+    cache.put(mols[2:])
+
+    # The least recently used molecule is evicted
+    found, missing = cache.get(["0", "1", "2"])
+    assert found.keys() == {"0", "2"}
+    assert missing == ["1"]
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 3, "misses": 1}
+
+
 def test_molecules_duplicate_insert(storage_socket):
     water = ptl.data.get_molecule("water_dimer_minima.psimol")
     water2 = ptl.data.get_molecule("water_dimer_stretch.psimol")
@@ -819,6 +868,132 @@ def test_queue_submit_many_order(storage_results):
     # Todo: test more scenarios
 
 
+def test_queue_boost_and_age_priority(storage_results):
+
+    results = storage_results.get_results()["data"]
+
+    task_template = {
+        "spec": {"function": "qcengine.compute_procedure", "args": [{"json_blob": "data"}], "kwargs": {}},
+        "tag": None,
+        "program": "P1",
+        "procedure": "P1",
+        "parser": "",
+    }
+
+    priorities = ["normal", "low", "low"]
+    tasks = [
+        ptl.models.TaskRecord(**task_template, priority=priorities[i], base_result=results[i]["id"]) for i in range(3)
+    ]
+    ret = storage_results.queue_submit(tasks)
+    assert ret["meta"]["n_inserted"] == 3
+
+    base_results = [results[i]["id"] for i in range(3)]
+    assert storage_results.queue_count_tasks(base_result=base_results) == 3
+    assert storage_results.queue_count_tasks(base_result=base_results[:2], status="WAITING") == 2
+
+    # Boost the last submitted task ahead of the others
+    assert storage_results.queue_boost_priority([base_results[2]], 2) == 1
+    assert storage_results.queue_boost_priority([base_results[2]], 1) == 0
+
+    storage_results.manager_update("test_manager")
+    r = storage_results.queue_get_next("test_manager", ["p1"], ["p1"], limit=1, effective_priority=True)
+    assert r[0].base_result == base_results[2]
+    assert r[0].priority == 0
+
+    # Running tasks are not boosted
+    assert storage_results.queue_boost_priority([base_results[2]], 2) == 0
+    assert storage_results.queue_count_tasks(base_result=base_results, status="RUNNING") == 1
+
+    # A task which waited three aging periods is handed out ahead of a higher priority task
+    with storage_results.session_scope() as session:
+        session.query(TaskQueueORM).filter(TaskQueueORM.base_result_id == int(base_results[1])).update(
+            {"created_on": datetime.utcnow() - timedelta(hours=3)}, synchronize_session=False
+        )
+
+    # Only tasks which reached a new level are aged
+    assert storage_results.queue_age_priority(3600) == 1
+    assert storage_results.queue_age_priority(3600) == 0
+    r = storage_results.queue_get_next("test_manager", ["p1"], ["p1"], limit=1, effective_priority=True)
+    assert r[0].base_result == base_results[1]
+    assert r[0].priority == 0
+
+    tasks = storage_results.queue_get_next("test_manager", ["p1"], ["p1"])
+    assert [x.priority for x in tasks] == [1]
+
+    # The counts show the submitted priorities next to the boosts
+    counts = storage_results.custom_query("task", "counts")["data"]
+    assert {(x["priority"], x["priority_boost"], x["status"]): x["count"] for x in counts} == {
+        (1, 0, "running"): 1,
+        (0, 0, "running"): 1,
+        (0, 2, "running"): 1,
+    }
+    assert all(x["oldest"] is not None for x in counts)
+
+
+def test_queue_get_next_large(storage_results):
+    """Tests that a large queue is handed out by effective priority through its index"""
+
+    results = storage_results.get_results()["data"]
+
+    task_template = {
+        "spec": {"function": "qcengine.compute_procedure", "args": [{"json_blob": "data"}], "kwargs": {}},
+        "tag": None,
+        "program": "P1",
+        "procedure": "P1",
+        "parser": "",
+    }
+
+    priorities = ["normal", "high", "normal", "high", "normal", "low"]
+    tasks = [
+        ptl.models.TaskRecord(**task_template, priority=p, base_result=x["id"]) for p, x in zip(priorities, results)
+    ]
+    storage_results.queue_submit(tasks)
+
+    # Many newer low priority tasks
+    now = datetime.utcnow()
+    filler = [
+        {
+            **task_template,
+            "program": "p1",
+            "procedure": "p1",
+            "priority": 0,
+            "effective_priority": 0,
+            "created_on": now + timedelta(milliseconds=i),
+        }
+        for i in range(20000)
+    ]
+
+    try:
+        with storage_results.session_scope() as session:
+            session.bulk_insert_mappings(TaskQueueORM, filler)
+            session.query(TaskQueueORM).filter(TaskQueueORM.base_result_id == int(results[5]["id"])).update(
+                {"created_on": now - timedelta(hours=3)}, synchronize_session=False
+            )
+            session.execute("ANALYZE task_queue")
+
+        assert storage_results.queue_age_priority(3600) == 1
+
+        # The order is read from the index rather than sorting the queue
+        with storage_results.session_scope() as session:
+            query = (
+                session.query(TaskQueueORM)
+                .filter(*storage_results._queue_waiting_filters(["p1"], ["p1"])[0])
+                .order_by(*storage_results._queue_order_by(effective_priority=True))
+                .limit(6)
+            )
+            sql = query.statement.compile(session.bind, compile_kwargs={"literal_binds": True})
+            plan = "\n".join(x[0] for x in session.execute(f"EXPLAIN {sql}"))
+        assert "ix_task_effective_sort" in plan
+
+        storage_results.manager_update("test_manager")
+        r = storage_results.queue_get_next("test_manager", ["p1"], ["p1"], limit=6, effective_priority=True)
+        assert [x.base_result for x in r] == [results[i]["id"] for i in [5, 1, 3, 0, 2, 4]]
+
+    finally:
+        with storage_results.session_scope() as session:
+            session.query(TaskQueueORM).filter(TaskQueueORM.base_result_id == None).delete()
+
+
 # User testing
 
 
@@ -910,6 +1085,21 @@ def test_manager(storage_socket):
     assert len(ret["data"]) == 1
 
 
+def test_manager_capacity(storage_socket):
+
+    before = storage_socket.get_manager_capacity()
+
+    assert storage_socket.manager_update(name="capacity_manager", status="ACTIVE", active_tasks=4)
+    assert storage_socket.manager_update(name="capacity_manager", completed=3, failures=1)
+    assert storage_socket.manager_update(name="capacity_manager2", status="INACTIVE", active_tasks=8)
+    assert storage_socket.manager_update(name="capacity_manager2", completed=2)
+
+    ret = storage_socket.get_manager_capacity()
+    assert ret["active_managers"] == before["active_managers"] + 1
+    assert ret["active_tasks"] == before["active_tasks"] + 4
+    assert ret["completed"] == before["completed"] + 6
+
+
 def test_procedure_sql(storage_results):
 
     mol_ids = [int(mol.id) for mol in storage_results.get_molecules()["data"]]
@@ -1292,7 +1482,7 @@ def test_server_log(storage_results):
     molecules = [ptl.data.get_molecule(mol_name) for mol_name in mol_names]
     inserted = storage_results.add_molecules(molecules)
 
-    ret = storage_results.log_server_stats()
+    ret = storage_results.log_server_stats(service_admission={"decision": "hold", "admitted": 0})
     assert ret["db_table_size"] >= 1000
     assert ret["db_total_size"] >= 1000
 
@@ -1307,6 +1497,8 @@ def test_server_log(storage_results):
 
     ret = storage_results.get_server_stats_log(before=now)
     assert len(ret["data"]) >= 1
+    assert ret["data"][0]["service_admission"] == {"decision": "hold", "admitted": 0}
+    assert ret["data"][0]["molecule_cache"].keys() == {"size", "maxsize", "hits", "misses"}
 
     # Make sure we are sorting correctly
     storage_results.log_server_stats()
@@ -360,6 +360,15 @@ class CollectionHandler(APIHandler):
                 self.logger.info("GET: Collections - view request made, but server does not have a view_handler.")
                 return
 
+            # Clients revalidate their copy of a response without it being read or sent again
+            etag = self.view_handler.etag(collection_id, view_function, body.data.dict())
+            if etag is not None:
+                self.set_header("Etag", etag)
+                if self.check_etag_header():
+                    self.set_status(304)
+                    self.logger.info(f"GET: Collections - {collection_id} view {view_function} not modified.")
+                    return
+
             result = self.view_handler.handle_request(collection_id, view_function, body.data.dict())
             response = response_model(**result)
 